@@ -5,8 +5,8 @@ from django.contrib.auth.models import Group
 from .models import User
 from django.utils.translation import gettext_lazy as _
 from django import forms
-from django.db.models import Q
 from core.models import LearningCenter
+from core.mixins import RoleScopedAdminMixin
 
 
 class UserAdminForm(forms.ModelForm):
@@ -52,7 +52,7 @@ class UserAdminForm(forms.ModelForm):
         return cleaned_data
 
 
-class AdminUserAdmin(BaseUserAdmin):
+class AdminUserAdmin(RoleScopedAdminMixin, BaseUserAdmin):
     form = UserAdminForm
     
     # Asosiy fieldsets
@@ -133,22 +133,6 @@ class AdminUserAdmin(BaseUserAdmin):
                     kwargs["queryset"] = LearningCenter.objects.none()
         return super().formfield_for_foreignkey(db_field, request, **kwargs)
 
-    # 1. Faqat superadmin va admin User modelini ko'rishi mumkin
-    def get_queryset(self, request):
-        qs = super().get_queryset(request)
-        if not request.user.is_authenticated:
-            return qs.none()
-        
-        if request.user.role == "superadmin":
-            return qs
-        elif request.user.role == "admin":
-            # Admin: faqat o'zi qo'shgan teacherlarni va superadmin qo'shgan teacherlarni ko'radi
-            return qs.filter(
-                Q(role="teacher") & 
-                (Q(created_by=request.user) | Q(created_by__role="superadmin"))
-            )
-        return qs.none()
-
     # 2. Faqat superadmin va admin User modeliga kirish huquqiga ega
     def has_module_permission(self, request):
         return request.user.is_authenticated and request.user.role in ["superadmin", "admin"]
@@ -0,0 +1,125 @@
+# account/authentication.py
+"""
+Claim'larga asoslangan JWT autentifikatsiya.
+
+Token olishda foydalanuvchining role, center_id, is_active, is_staff va
+is_superuser qiymatlari token ichiga yoziladi (ClaimsRefreshToken, access
+token ularni refresh token'dan ko'chiradi). ClaimsJWTAuthentication har bir
+so'rovda User qatorini o'qimaydi: foydalanuvchi shu claim'lardan yig'iladi.
+
+Bloklash va rol/markaz o'zgarishi uchun foydalanuvchi holati qisqa muddatli
+keshda saqlanadi (AUTH_STATE_CACHE_TIMEOUT) va User saqlanganda/o'chirilganda
+tozalanadi. Holat token claim'lariga mos kelmasa token rad etiladi - klient
+/api/token/refresh/ orqali yangi claim'li token oladi. Qora ro'yxat
+(account.blacklist) alohida 'tokens' keshida; u o'qilmasa token rad etiladi.
+"""
+from django.conf import settings
+from django.core.cache import cache
+from django.db import DEFAULT_DB_ALIAS, transaction
+from django.utils.translation import gettext_lazy as _
+from rest_framework_simplejwt.authentication import JWTAuthentication
+from rest_framework_simplejwt.exceptions import AuthenticationFailed, TokenError
+from rest_framework_simplejwt.settings import api_settings
+from rest_framework_simplejwt.tokens import RefreshToken
+
+from .blacklist import blacklist_token, is_token_revoked
+from .models import ClaimsUser, User
+
+# Token'ga yoziladigan va keshdagi holat bilan solishtiriladigan maydonlar
+CLAIM_FIELDS = ('role', 'center_id', 'is_active', 'is_staff', 'is_superuser')
+
+AUTH_STATE_KEY = 'auth:user:{}'
+
+
+# ========== Foydalanuvchi holati ==========
+
+def get_auth_state(user_id):
+    """{maydon: qiymat} (CLAIM_FIELDS) yoki foydalanuvchi yo'q bo'lsa None"""
+    state = cache.get(AUTH_STATE_KEY.format(user_id))
+    if state is None:
+        state = load_auth_state(user_id)
+    return state or None
+
+
+def load_auth_state(user_id):
+    state = User.objects.filter(pk=user_id).values(*CLAIM_FIELDS).first() or {}
+    cache.set(AUTH_STATE_KEY.format(user_id), state, getattr(settings, 'AUTH_STATE_CACHE_TIMEOUT', 60))
+    return state
+
+
+def invalidate_auth_state(user_id):
+    key = AUTH_STATE_KEY.format(user_id)
+    transaction.on_commit(lambda: cache.delete(key))
+
+
+# ========== Token ==========
+
+class ClaimsRefreshToken(RefreshToken):
+    """Foydalanuvchi claim'lari yozilgan refresh token (access token ularni ko'chiradi)"""
+
+    @classmethod
+    def for_user(cls, user):
+        token = super().for_user(user)
+        token.set_claims({field: getattr(user, field) for field in CLAIM_FIELDS})
+        return token
+
+    def set_claims(self, state):
+        for field in CLAIM_FIELDS:
+            self[field] = state[field]
+
+    # token_blacklist ilovasi o'rniga keshdagi qora ro'yxat: rotatsiyada
+    # TokenRefreshSerializer eski token'ning blacklist() metodini chaqiradi
+    def verify(self):
+        super().verify()
+        if is_token_revoked(self.payload):
+            raise TokenError(_("Token is blacklisted"))
+
+    def blacklist(self):
+        blacklist_token(self.payload)
+
+
+# ========== Autentifikatsiya ==========
+
+def claims_user(validated_token):
+    """
+    Token claim'laridan ClaimsUser obyekti (bazaga so'rovsiz).
+
+    ClaimsUser - User'ning proxy modeli: FK'ga berish (created_by=request.user),
+    filtrlar va taqqoslash odatdagidek ishlaydi, qolgan maydonlar kerak
+    bo'lganda yuklanadi.
+    """
+    claims = {field: validated_token[field] for field in CLAIM_FIELDS}
+    claims['id'] = User._meta.pk.to_python(validated_token[api_settings.USER_ID_CLAIM])
+    # from_db qiymatlarni modeldagi maydonlar tartibida kutadi
+    field_names = [field.attname for field in User._meta.concrete_fields if field.attname in claims]
+    return ClaimsUser.from_db(DEFAULT_DB_ALIAS, field_names, [claims[name] for name in field_names])
+
+
+class ClaimsJWTAuthentication(JWTAuthentication):
+    """
+    JWTAuthentication o'rnini bosuvchi klass: foydalanuvchi token claim'laridan,
+    holat esa keshdan tekshiriladi. Claim'siz (eski) tokenlar uchun odatdagi
+    bazadan o'qish ishlaydi.
+    """
+
+    def get_user(self, validated_token):
+        try:
+            revoked = is_token_revoked(validated_token.payload)
+        except TokenError as exc:
+            raise AuthenticationFailed(str(exc), code="token_state_unavailable")
+        if revoked:
+            raise AuthenticationFailed(_("Token is blacklisted"), code="token_revoked")
+
+        if any(field not in validated_token for field in CLAIM_FIELDS):
+            return super().get_user(validated_token)
+
+        state = get_auth_state(validated_token.get(api_settings.USER_ID_CLAIM))
+        if state is None:
+            raise AuthenticationFailed(_("User not found"), code="user_not_found")
+        if not state['is_active']:
+            raise AuthenticationFailed(_("User is inactive"), code="user_inactive")
+        if any(validated_token[field] != state[field] for field in CLAIM_FIELDS):
+            raise AuthenticationFailed(
+                _("User role or center has changed, refresh the token."), code="token_stale"
+            )
+        return claims_user(validated_token)
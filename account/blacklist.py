@@ -0,0 +1,84 @@
+# account/blacklist.py
+"""
+Redis'dagi JWT qora ro'yxati.
+
+rest_framework_simplejwt.token_blacklist ilovasi har bir /api/token/refresh/
+so'rovida OutstandingToken va BlacklistedToken jadvallariga yozadi. Bu yerda
+ikkala yozuv ham 'tokens' kesh alias'idagi kalitlar:
+
+- jwt:blacklist:<jti> - bitta token, token muddati tugaguncha saqlanadi
+- jwt:revoked:<user_id> - shu vaqtdan (unix soniya) oldin berilgan barcha
+  tokenlar bekor; refresh token muddati davomida saqlanadi
+
+Tekshiruv bitta get_many bilan bajariladi, bazaga murojaat yo'q. 'tokens'
+alias'i xatolarni yashirmaydi: Redis ishlamasa o'qish va yozish TokenError
+beradi va token rad etiladi (fail closed).
+"""
+import logging
+import time
+
+from django.core.cache import caches
+from django.utils.translation import gettext_lazy as _
+from rest_framework_simplejwt.exceptions import TokenError
+from rest_framework_simplejwt.settings import api_settings
+
+logger = logging.getLogger(__name__)
+
+TOKEN_CACHE_ALIAS = 'tokens'
+
+BLACKLIST_KEY = 'jwt:blacklist:{}'
+REVOKED_KEY = 'jwt:revoked:{}'
+
+
+def token_keys(payload):
+    """Token uchun tekshiriladigan kalitlar: (jti kaliti, foydalanuvchi kaliti)"""
+    return (
+        BLACKLIST_KEY.format(payload[api_settings.JTI_CLAIM]),
+        REVOKED_KEY.format(payload.get(api_settings.USER_ID_CLAIM)),
+    )
+
+
+def is_revoked(payload, values):
+    """values - token_keys() bo'yicha get_many natijasi"""
+    blacklist_key, revoked_key = token_keys(payload)
+    if values.get(blacklist_key):
+        return True
+    revoked_before = values.get(revoked_key)
+    return revoked_before is not None and payload.get('iat', 0) < revoked_before
+
+
+def is_token_revoked(payload):
+    try:
+        values = caches[TOKEN_CACHE_ALIAS].get_many(token_keys(payload))
+    except Exception as exc:
+        logger.exception("JWT qora ro'yxatini o'qib bo'lmadi")
+        raise TokenError(_("Token revocation state is unavailable")) from exc
+    return is_revoked(payload, values)
+
+
+def blacklist_token(payload):
+    """Tokenni muddati tugaguncha qora ro'yxatga qo'shish"""
+    timeout = payload['exp'] - int(time.time())
+    if timeout > 0:
+        _set(BLACKLIST_KEY.format(payload[api_settings.JTI_CLAIM]), 1, timeout)
+
+
+def revoke_user_tokens(user_id):
+    """
+    Foydalanuvchiga shu paytgacha berilgan barcha access/refresh tokenlarni bekor qilish.
+
+    iat butun soniya, shuning uchun chegara ham yaxlitlanmaydi (pastga
+    kesiladi): qayta faollashtirilgandan keyin shu soniyada berilgan token
+    rad etilmaydi. Bekor qilishdan oldin shu soniyada berilgan token
+    foydalanuvchi holati (is_active) tekshiruvida rad etiladi.
+    """
+    timeout = int(api_settings.REFRESH_TOKEN_LIFETIME.total_seconds())
+    _set(REVOKED_KEY.format(user_id), int(time.time()), timeout)
+
+
+def _set(key, value, timeout):
+    try:
+        caches[TOKEN_CACHE_ALIAS].set(key, value, timeout)
+    except Exception as exc:
+        logger.exception("JWT qora ro'yxatiga yozib bo'lmadi")
+        raise TokenError(_("Token revocation state is unavailable")) from exc
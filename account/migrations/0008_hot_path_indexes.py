@@ -0,0 +1,19 @@
+# Generated by Django 5.2.8 on 2026-10-16 22:42
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('account', '0007_user_created_by'),
+        ('auth', '0012_alter_user_first_name_max_length'),
+        ('core', '0008_hot_path_indexes'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='user',
+            index=models.Index(fields=['role', 'center', 'is_active'], name='user_role_center_active_idx'),
+        ),
+    ]
@@ -78,6 +78,12 @@ class User(AbstractUser):
 
     objects = UserManager()
 
+    class Meta(AbstractUser.Meta):
+        indexes = [
+            # Rol va markaz bo'yicha o'qituvchi/admin ro'yxatlari
+            models.Index(fields=['role', 'center', 'is_active'], name='user_role_center_active_idx'),
+        ]
+
     def __str__(self):
         return f"{self.phone_number} - {self.role}"
 
@@ -98,4 +104,23 @@ class User(AbstractUser):
             self.teacher_email = None
             self.teacher_phone_number = None
         
-        super().save(*args, **kwargs)
\ No newline at end of file
+        super().save(*args, **kwargs)
+
+class ClaimsUser(User):
+    """
+    JWT claim'laridan yig'ilgan foydalanuvchi (account.authentication.claims_user).
+
+    Faqat claim maydonlari yuklangan; qolgan maydonlardan biri birinchi marta
+    o'qilganda (masalan created_by_info serializer'ida) hammasi bitta so'rovda
+    olinadi. User signallari sender=User bilan ulangan, shuning uchun bu
+    obyekt saqlanmaydi - o'zgartirish uchun User'ni bazadan oling.
+    """
+
+    class Meta:
+        proxy = True
+
+    def refresh_from_db(self, using=None, fields=None, from_queryset=None):
+        deferred = self.get_deferred_fields()
+        if fields is not None and deferred and set(fields) <= deferred:
+            fields = list(deferred)
+        super().refresh_from_db(using=using, fields=fields, from_queryset=from_queryset)
@@ -1,5 +1,9 @@
 # account/serializers.py
 from rest_framework import serializers
+from rest_framework_simplejwt.exceptions import AuthenticationFailed
+from rest_framework_simplejwt.serializers import TokenObtainPairSerializer, TokenRefreshSerializer
+from rest_framework_simplejwt.settings import api_settings
+from .authentication import ClaimsRefreshToken, get_auth_state
 from .models import User
 from core.models import LearningCenter
 
@@ -179,4 +183,37 @@ class ChangePasswordSerializer(serializers.Serializer):
         if data['old_password'] == data['new_password']:
             raise serializers.ValidationError({"new_password": "Yangi parol eski paroldan farqli bo'lishi kerak"})
         
-        return data
\ No newline at end of file
+        return data
+
+
+# ========== JWT ==========
+
+class ClaimsTokenObtainPairSerializer(TokenObtainPairSerializer):
+    """Token juftligi role, center_id va is_active claim'lari bilan"""
+    token_class = ClaimsRefreshToken
+
+
+class ClaimsTokenRefreshSerializer(TokenRefreshSerializer):
+    """Yangilashda claim'lar foydalanuvchining joriy holatidan qayta yoziladi"""
+    token_class = ClaimsRefreshToken
+
+    # TokenRefreshSerializer.validate foydalanuvchini bazadan o'qiydi; bu yerda
+    # faollik keshdagi holatdan tekshiriladi, rotatsiya esa xuddi o'sha tartibda
+    def validate(self, attrs):
+        refresh = self.token_class(attrs['refresh'])
+        state = get_auth_state(refresh.payload.get(api_settings.USER_ID_CLAIM))
+        if state is None or not state['is_active']:
+            raise AuthenticationFailed(self.error_messages['no_active_account'], 'no_active_account')
+
+        refresh.set_claims(state)
+        data = {'access': str(refresh.access_token)}
+
+        if api_settings.ROTATE_REFRESH_TOKENS:
+            if api_settings.BLACKLIST_AFTER_ROTATION:
+                refresh.blacklist()
+            refresh.set_jti()
+            refresh.set_exp()
+            refresh.set_iat()
+            data['refresh'] = str(refresh)
+
+        return data
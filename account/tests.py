@@ -1,3 +1,133 @@
-from django.test import TestCase
+# account/tests.py
+"""JWT: claim'lardan foydalanuvchi, bazasiz refresh, tokenlarni bekor qilish"""
+from unittest import mock
 
-# Create your tests here.
+from django.core.cache import caches
+
+from account.authentication import ClaimsRefreshToken, claims_user, get_auth_state
+from account.blacklist import TOKEN_CACHE_ALIAS, revoke_user_tokens
+from account.models import User
+from core.tests.base import APITestBase
+
+REFRESH_URL = '/api/token/refresh/'
+ME_URL = '/api/users/me/'
+
+
+class ClaimsUserTests(APITestBase):
+
+    def test_claims_user_loads_deferred_fields_once(self):
+        token = ClaimsRefreshToken.for_user(self.teacher).access_token
+
+        user = claims_user(token)
+
+        with self.assertNumQueries(0):
+            self.assertEqual((user.pk, user.role, user.center_id), (self.teacher.pk, "teacher", self.center.pk))
+        with self.assertNumQueries(1):
+            self.assertEqual((user.first_name, user.phone_number), ("Olim", "+998900000004"))
+            self.assertEqual(user.created_by_id, self.admin.pk)
+        self.assertEqual(user, self.teacher)
+        self.assertIsInstance(user, User)
+
+
+class TokenRefreshTests(APITestBase):
+
+    def test_refresh_does_not_query_database(self):
+        refresh = ClaimsRefreshToken.for_user(self.teacher)
+        get_auth_state(self.teacher.pk)
+
+        with self.assertNumQueries(0):
+            response = self.client.post(REFRESH_URL, {'refresh': str(refresh)})
+
+        self.assertEqual(response.status_code, 200)
+        self.assertNotEqual(response.data['refresh'], str(refresh))
+        self.assertEqual(ClaimsRefreshToken(response.data['refresh'])['role'], "teacher")
+
+    def test_rotated_token_cannot_be_reused(self):
+        refresh = str(ClaimsRefreshToken.for_user(self.teacher))
+        self.client.post(REFRESH_URL, {'refresh': refresh})
+
+        response = self.client.post(REFRESH_URL, {'refresh': refresh})
+
+        self.assertEqual(response.status_code, 401)
+
+    def test_refresh_picks_up_new_role(self):
+        refresh = ClaimsRefreshToken.for_user(self.teacher)
+        with self.captureOnCommitCallbacks(execute=True):
+            self.teacher.role = "admin_mini"
+            self.teacher.save()
+
+        response = self.client.post(REFRESH_URL, {'refresh': str(refresh)})
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(ClaimsRefreshToken(response.data['refresh'])['role'], "admin_mini")
+
+    def test_inactive_user_cannot_refresh(self):
+        refresh = ClaimsRefreshToken.for_user(self.teacher)
+        with self.captureOnCommitCallbacks(execute=True):
+            self.teacher.is_active = False
+            self.teacher.save()
+
+        response = self.client.post(REFRESH_URL, {'refresh': str(refresh)})
+
+        self.assertEqual(response.status_code, 401)
+
+
+class TokenRevocationTests(APITestBase):
+
+    def setUp(self):
+        super().setUp()
+        self.refresh = ClaimsRefreshToken.for_user(self.teacher)
+
+    def toggle_active(self, is_active):
+        self.authenticate(self.admin)
+        with self.captureOnCommitCallbacks(execute=True):
+            response = self.client.post(f'/api/users/{self.teacher.pk}/toggle_active/', {'is_active': is_active})
+        self.client.credentials()
+        return response
+
+    def test_blocked_user_tokens_rejected(self):
+        self.assertEqual(self.toggle_active(False).status_code, 200)
+
+        self.client.credentials(HTTP_AUTHORIZATION=f'Bearer {self.refresh.access_token}')
+        self.assertEqual(self.client.get(ME_URL).status_code, 401)
+        self.client.credentials()
+        self.assertEqual(self.client.post(REFRESH_URL, {'refresh': str(self.refresh)}).status_code, 401)
+
+    def test_reactivated_user_token_accepted_in_same_second(self):
+        self.toggle_active(False)
+        self.toggle_active(True)
+
+        self.authenticate(self.teacher)
+
+        self.assertEqual(self.client.get(ME_URL).status_code, 200)
+
+    def test_old_tokens_stay_revoked_after_reactivation(self):
+        with mock.patch('account.blacklist.time.time', return_value=self.refresh['iat'] + 1):
+            revoke_user_tokens(self.teacher.pk)
+
+        self.client.credentials(HTTP_AUTHORIZATION=f'Bearer {self.refresh.access_token}')
+        self.assertEqual(self.client.get(ME_URL).status_code, 401)
+
+    # ========== Redis ishlamasa ==========
+
+    def test_unreadable_blacklist_rejects_token(self):
+        self.authenticate(self.teacher)
+
+        with mock.patch.object(caches[TOKEN_CACHE_ALIAS], 'get_many', side_effect=ConnectionError):
+            response = self.client.get(ME_URL)
+
+        self.assertEqual(response.status_code, 401)
+
+    def test_unwritable_blacklist_rejects_refresh(self):
+        with mock.patch.object(caches[TOKEN_CACHE_ALIAS], 'set', side_effect=ConnectionError):
+            response = self.client.post(REFRESH_URL, {'refresh': str(self.refresh)})
+
+        self.assertEqual(response.status_code, 401)
+        self.assertEqual(self.client.post(REFRESH_URL, {'refresh': str(self.refresh)}).status_code, 200)
+
+    def test_block_rolled_back_when_tokens_not_revoked(self):
+        with mock.patch.object(caches[TOKEN_CACHE_ALIAS], 'set', side_effect=ConnectionError):
+            response = self.toggle_active(False)
+
+        self.assertEqual(response.status_code, 503)
+        self.assertTrue(User.objects.get(pk=self.teacher.pk).is_active)
@@ -3,23 +3,31 @@ from rest_framework import viewsets, status, permissions, filters
 from rest_framework.decorators import action
 from rest_framework.response import Response
 from django_filters.rest_framework import DjangoFilterBackend
-from django.db.models import Q
 from django.contrib.auth import update_session_auth_hash
+from django.db import transaction
+from rest_framework_simplejwt import views as jwt_views
+from rest_framework_simplejwt.exceptions import TokenError
 
+from .blacklist import revoke_user_tokens
 from .models import User
+from core.mixins import RoleScopedQuerysetMixin, SingleObjectMixin
+from core.permissions import UPDATE_ACTIONS, ObjectRule, ObjectRulesPermission, created_teacher
 from .serializers import (
     UserSerializer, UserCreateSerializer, 
     UserUpdateSerializer, ChangePasswordSerializer
 )
 
 
-class UserViewSet(viewsets.ModelViewSet):
+class UserViewSet(RoleScopedQuerysetMixin, SingleObjectMixin, viewsets.ModelViewSet):
     queryset = User.objects.all()
     filter_backends = [DjangoFilterBackend, filters.SearchFilter, filters.OrderingFilter]
     filterset_fields = ['role', 'center', 'is_active']
     search_fields = ['phone_number', 'first_name', 'last_name', 'subject']
     ordering_fields = ['id', 'phone_number', 'date_joined']
     ordering = ['-id']
+    object_rules = [
+        ObjectRule(["admin"], [created_teacher], "You can only update teachers created by you.", UPDATE_ACTIONS),
+    ]
     
     def get_serializer_class(self):
         if self.action == 'create':
@@ -32,7 +40,7 @@ class UserViewSet(viewsets.ModelViewSet):
     
     def get_permissions(self):
         if self.action in ['create', 'destroy', 'update', 'partial_update']:
-            return [permissions.IsAuthenticated()]
+            return [permissions.IsAuthenticated(), ObjectRulesPermission()]
         elif self.action in ['list', 'retrieve']:
             return [permissions.IsAuthenticated()]
         return [permissions.AllowAny()]
@@ -52,8 +60,8 @@ class UserViewSet(viewsets.ModelViewSet):
         
         if request.user.role == "admin":
             request.data['role'] = 'teacher'
-            if not request.data.get('center') and request.user.center:
-                request.data['center'] = request.user.center.id
+            if not request.data.get('center') and request.user.center_id:
+                request.data['center'] = request.user.center_id
         
         serializer = self.get_serializer(data=request.data)
         serializer.is_valid(raise_exception=True)
@@ -66,32 +74,6 @@ class UserViewSet(viewsets.ModelViewSet):
             headers=headers
         )
     
-    def update(self, request, *args, **kwargs):
-        instance = self.get_object()
-        user = request.user
-        
-        if user.role == "admin":
-            if instance.role != "teacher" or instance.created_by != user:
-                return Response(
-                    {"detail": "You can only update teachers created by you."},
-                    status=status.HTTP_403_FORBIDDEN
-                )
-        
-        return super().update(request, *args, **kwargs)
-    
-    def partial_update(self, request, *args, **kwargs):
-        instance = self.get_object()
-        user = request.user
-        
-        if user.role == "admin":
-            if instance.role != "teacher" or instance.created_by != user:
-                return Response(
-                    {"detail": "You can only update teachers created by you."},
-                    status=status.HTTP_403_FORBIDDEN
-                )
-        
-        return super().partial_update(request, *args, **kwargs)
-    
     def destroy(self, request, *args, **kwargs):
         if request.user.role != "superadmin":
             return Response(
@@ -101,26 +83,6 @@ class UserViewSet(viewsets.ModelViewSet):
         
         return super().destroy(request, *args, **kwargs)
     
-    def get_queryset(self):
-        user = self.request.user
-        
-        if not user.is_authenticated:
-            return User.objects.none()
-        
-        if user.role == "superadmin":
-            return User.objects.all()
-        
-        elif user.role == "admin":
-            return User.objects.filter(
-                Q(role="teacher") & 
-                (Q(created_by=user) | Q(created_by__role="superadmin"))
-            )
-        
-        elif user.role in ["admin_mini", "teacher"]:
-            return User.objects.filter(id=user.id)
-        
-        return User.objects.none()
-    
     @action(detail=True, methods=['post'])
     def change_password(self, request, pk=None):
         user = self.get_object()
@@ -199,7 +161,27 @@ class UserViewSet(viewsets.ModelViewSet):
             )
         
         user.is_active = is_active
-        user.save()
+        try:
+            with transaction.atomic():
+                user.save()
+                if not user.is_active:
+                    # Bloklangan foydalanuvchining barcha tokenlari (refresh ham) bekor qilinadi
+                    revoke_user_tokens(user.pk)
+        except TokenError:
+            return Response(
+                {"detail": "Tokens could not be revoked, try again later."},
+                status=status.HTTP_503_SERVICE_UNAVAILABLE
+            )
         
         serializer = UserSerializer(user, context={'request': request})
-        return Response(serializer.data)
\ No newline at end of file
+        return Response(serializer.data)
+
+
+# ========== JWT ==========
+
+class TokenObtainPairView(jwt_views.TokenObtainPairView):
+    throttle_scope = 'token'
+
+
+class TokenRefreshView(jwt_views.TokenRefreshView):
+    throttle_scope = 'token'
@@ -14,6 +14,19 @@ app.conf.beat_schedule = {
     'create-weekly-attendance': {
         'task': 'core.tasks.create_weekly_attendance',
         'schedule': crontab(hour=0, minute=0, day_of_week=1),  # Har dushanba 00:00
+        'kwargs': {'parallel': True},  # Markazlar bo'yicha workerlarga taqsimlanadi
+    },
+    'mark-overdue-payments': {
+        'task': 'core.tasks.mark_overdue_payments',
+        'schedule': crontab(hour=0, minute=5),  # Har kuni 00:05
+    },
+    'reconcile-student-stats': {
+        'task': 'core.tasks.reconcile_student_stats',
+        'schedule': crontab(hour=0, minute=30),  # Har kuni 00:30
+    },
+    'archive-old-attendance': {
+        'task': 'core.tasks.archive_old_attendance',
+        'schedule': crontab(hour=2, minute=0, day_of_month=1),  # Har oyning 1-kuni 02:00
     },
 }
 
@@ -67,6 +67,7 @@ MIDDLEWARE = [
     'django.contrib.auth.middleware.AuthenticationMiddleware',
     'django.contrib.messages.middleware.MessageMiddleware',
     'django.middleware.clickjacking.XFrameOptionsMiddleware',
+    'core.middleware.RateLimitHeadersMiddleware',
 ]
 
 ROOT_URLCONF = 'config.urls'
@@ -197,6 +198,50 @@ CELERY_TASK_SERIALIZER = 'json'
 CELERY_RESULT_SERIALIZER = 'json'
 CELERY_TIMEZONE = 'Asia/Tashkent'
 
+# Kesh sozlamalari
+CACHES = {
+    'default': {
+        'BACKEND': 'django_redis.cache.RedisCache',
+        'LOCATION': 'redis://localhost:6379/1',
+        'OPTIONS': {
+            'CLIENT_CLASS': 'django_redis.client.DefaultClient',
+            # Redis ishlamay qolsa so'rovlar keshsiz davom etadi
+            'IGNORE_EXCEPTIONS': True,
+        },
+        'KEY_PREFIX': 'teachers',
+    },
+    # JWT qora ro'yxati va bekor qilish belgilari (account.blacklist). Bu
+    # kesh emas, holat: IGNORE_EXCEPTIONS yo'q - Redis ishlamasa token rad
+    # etiladi (401). Redis'da maxmemory-policy noeviction va persistence
+    # (AOF) yoqilgan bo'lishi kerak, aks holda bekor qilingan token kalit
+    # o'chirilishi bilan yana ishlay boshlaydi (README, docker-compose.yml).
+    # Standart: asosiy Redis'ning 2-bazasi
+    'tokens': {
+        'BACKEND': 'django_redis.cache.RedisCache',
+        'LOCATION': os.environ.get('TOKEN_REDIS_URL', 'redis://localhost:6379/2'),
+        'OPTIONS': {
+            'CLIENT_CLASS': 'django_redis.client.DefaultClient',
+        },
+        'KEY_PREFIX': 'teachers',
+    },
+}
+
+# Dashboard statistikasi keshda necha soniya turadi
+DASHBOARD_CACHE_TIMEOUT = 60
+
+# Shuncha kundan eski davomatlar oylik bit maskali arxivga ko'chiriladi
+# (core.tasks.archive_old_attendance). None - arxivlash o'chirilgan
+ATTENDANCE_ARCHIVE_AFTER_DAYS = None
+
+# ?search= uchun qidiruv indeksi (core.search): 'auto' - SQLite'da FTS5,
+# PostgreSQL'da tsvector + pg_trgm; None - odatdagi LIKE SearchFilter
+SEARCH_BACKEND = 'auto'
+
+# JWT foydalanuvchi holati (faollik, rol, markaz) keshda saqlanadigan vaqt
+# (soniya). Bloklangan foydalanuvchi token'i ko'pi bilan shuncha vaqt o'tib,
+# odatda esa User saqlanishi bilan darhol rad etiladi
+AUTH_STATE_CACHE_TIMEOUT = 60
+
 # Loyiha nomi
 PROJECT_NAME = "Learning Center Management"
 
@@ -317,7 +362,7 @@ JAZZMIN_UI_TWEAKS = {
 # Django REST Framework settings
 REST_FRAMEWORK = {
     'DEFAULT_AUTHENTICATION_CLASSES': (
-        'rest_framework_simplejwt.authentication.JWTAuthentication',
+        'account.authentication.ClaimsJWTAuthentication',
         'rest_framework.authentication.SessionAuthentication',
     ),
     'DEFAULT_PERMISSION_CLASSES': (
@@ -330,13 +375,22 @@ REST_FRAMEWORK = {
     ),
     'DEFAULT_PAGINATION_CLASS': 'rest_framework.pagination.PageNumberPagination',
     'PAGE_SIZE': 20,
+    # Redis'dagi umumiy sliding window hisoblagichlari (core.throttling)
     'DEFAULT_THROTTLE_CLASSES': [
-        'rest_framework.throttling.AnonRateThrottle',
-        'rest_framework.throttling.UserRateThrottle'
+        'core.throttling.AnonSlidingRateThrottle',
+        'core.throttling.UserSlidingRateThrottle',
+        'core.throttling.ScopedSlidingRateThrottle',
+        'core.throttling.SearchSlidingRateThrottle',
     ],
     'DEFAULT_THROTTLE_RATES': {
         'anon': '100/day',
-        'user': '1000/day'
+        'user': '1000/day',
+        # /api/token/ va /api/token/refresh/
+        'token': '20/min',
+        # ?search= bilan ro'yxatlar
+        'search': '60/min',
+        # Og'ir hisobotlar (dashboard statistikasi, davomat arxivi)
+        'reports': '30/min',
     },
     'DEFAULT_RENDERER_CLASSES': [
         'rest_framework.renderers.JSONRenderer',
@@ -374,6 +428,10 @@ SIMPLE_JWT = {
     'AUTH_TOKEN_CLASSES': ('rest_framework_simplejwt.tokens.AccessToken',),
     'TOKEN_TYPE_CLAIM': 'token_type',
 
+    # Token'ga role, center_id va is_active claim'lari yoziladi (account.authentication)
+    'TOKEN_OBTAIN_SERIALIZER': 'account.serializers.ClaimsTokenObtainPairSerializer',
+    'TOKEN_REFRESH_SERIALIZER': 'account.serializers.ClaimsTokenRefreshSerializer',
+
     'JTI_CLAIM': 'jti',
 
     'SLIDING_TOKEN_REFRESH_EXP_CLAIM': 'refresh_exp',
@@ -451,4 +509,4 @@ if DEBUG:
     SECURE_HSTS_INCLUDE_SUBDOMAINS = False
     SECURE_HSTS_PRELOAD = False
     SESSION_COOKIE_SECURE = False
-    CSRF_COOKIE_SECURE = False
\ No newline at end of file
+    CSRF_COOKIE_SECURE = False
@@ -0,0 +1,19 @@
+# config/settings_test.py
+"""
+Test sozlamalari: Redis va Celery broker'siz.
+
+`python manage.py test` shu modulni standart tanlaydi; boshqa runner'lar
+uchun DJANGO_SETTINGS_MODULE=config.settings_test yoki --settings bilan.
+"""
+from .settings import *  # noqa: F401,F403
+from .settings import CACHES
+
+# Lokal xotira keshi (har bir alias alohida)
+CACHES = {
+    alias: {'BACKEND': 'django.core.cache.backends.locmem.LocMemCache', 'LOCATION': alias}
+    for alias in CACHES
+}
+
+# Task'lar shu jarayonda bajariladi
+CELERY_TASK_ALWAYS_EAGER = True
+CELERY_TASK_EAGER_PROPAGATES = True
@@ -8,29 +8,20 @@ from django.core.exceptions import PermissionDenied
 from django.utils.html import format_html
 from django.contrib import messages
 from .models import Attendance, Student, Grade, Payment, News, LearningCenter, Parent, Homework
+from .homeworks import assign_homeworks
+from .mixins import RoleScopedAdminMixin
+from .scoping import superadmin_ids
 from account.models import User
 
 
 # --- LearningCenter ---
 @admin.register(LearningCenter)
-class LearningCenterAdmin(admin.ModelAdmin):
+class LearningCenterAdmin(RoleScopedAdminMixin, admin.ModelAdmin):
     list_display = ("id", "name", "phone_number", "director", "created_by", "is_active")
     search_fields = ("name", "director")
     readonly_fields = ("created_by",)
     list_filter = ("is_active",)
 
-    def get_queryset(self, request):
-        qs = super().get_queryset(request)
-        if not request.user.is_authenticated:
-            return qs.none()
-        
-        u = request.user
-        if u.role == "superadmin":
-            return qs
-        if u.role == "admin":
-            return qs
-        return qs.none()
-
     def has_view_permission(self, request, obj=None):
         if not request.user.is_authenticated:
             return False
@@ -72,7 +63,7 @@ class LearningCenterAdmin(admin.ModelAdmin):
 
 # --- Parent ---
 @admin.register(Parent)
-class ParentAdmin(admin.ModelAdmin):
+class ParentAdmin(RoleScopedAdminMixin, admin.ModelAdmin):
     list_display = ("id", "first_name", "last_name", "phone_number", "center", "created_by", "is_active")
     search_fields = ("first_name", "last_name", "phone_number")
     readonly_fields = ("created_by",)
@@ -90,24 +81,12 @@ class ParentAdmin(admin.ModelAdmin):
             elif request.user.role == "admin":
                 # Admin: superadmin qo'shgan markazlar + o'z markazi
                 kwargs["queryset"] = LearningCenter.objects.filter(
-                    Q(created_by__role="superadmin") | Q(id=request.user.center.id)
+                    Q(created_by__in=superadmin_ids()) | Q(id=request.user.center.id)
                 )
             else:
                 kwargs["queryset"] = LearningCenter.objects.none()
         return super().formfield_for_foreignkey(db_field, request, **kwargs)
 
-    def get_queryset(self, request):
-        qs = super().get_queryset(request)
-        if not request.user.is_authenticated:
-            return qs.none()
-        
-        u = request.user
-        if u.role == "superadmin":
-            return qs
-        if u.role == "admin":
-            return qs.filter(created_by__role="superadmin") | qs.filter(created_by=u)
-        return qs.none()
-
     def has_view_permission(self, request, obj=None):
         if not request.user.is_authenticated:
             return False
@@ -161,7 +140,7 @@ class ParentAdmin(admin.ModelAdmin):
 
 # --- Student ---
 @admin.register(Student)
-class StudentAdmin(admin.ModelAdmin):
+class StudentAdmin(RoleScopedAdminMixin, admin.ModelAdmin):
     list_display = ("id", "first_name", "last_name", "subject", "teacher", "center", "created_by", "is_active")
     search_fields = ("first_name", "last_name", "phone_number")
     list_filter = ("center", "subject", "teacher", "is_active")
@@ -181,7 +160,7 @@ class StudentAdmin(admin.ModelAdmin):
                 kwargs["queryset"] = User.objects.filter(
                     role="teacher",
                 ).filter(
-                    Q(created_by__role="superadmin") | Q(center=request.user.center)
+                    Q(created_by__in=superadmin_ids()) | Q(center=request.user.center)
                 )
             elif request.user.role == "teacher":
                 kwargs["queryset"] = User.objects.filter(id=request.user.id)
@@ -194,7 +173,7 @@ class StudentAdmin(admin.ModelAdmin):
             elif request.user.role == "admin":
                 # Admin: superadmin qo'shgan markazlar + o'z markazi
                 kwargs["queryset"] = LearningCenter.objects.filter(
-                    Q(created_by__role="superadmin") | Q(id=request.user.center.id)
+                    Q(created_by__in=superadmin_ids()) | Q(id=request.user.center.id)
                 )
             elif request.user.role == "teacher":
                 if request.user.center:
@@ -210,7 +189,7 @@ class StudentAdmin(admin.ModelAdmin):
             elif request.user.role == "admin":
                 # Admin: superadmin qo'shgan ota-onalar + o'zi qo'shgan ota-onalar
                 kwargs["queryset"] = Parent.objects.filter(
-                    Q(created_by__role="superadmin") | Q(created_by=request.user)
+                    Q(created_by__in=superadmin_ids()) | Q(created_by=request.user)
                 )
             elif request.user.role == "teacher":
                 if request.user.center:
@@ -222,25 +201,6 @@ class StudentAdmin(admin.ModelAdmin):
         
         return super().formfield_for_foreignkey(db_field, request, **kwargs)
 
-    def get_queryset(self, request):
-        qs = super().get_queryset(request)
-        if not request.user.is_authenticated:
-            return qs.none()
-        
-        u = request.user
-        if u.role == "superadmin":
-            return qs
-        elif u.role in ["admin", "admin_mini"]:
-            # Admin: superadmin qo'shganlar + o'zi qo'shganlar + o'z markazidagilar
-            return qs.filter(
-                Q(created_by__role="superadmin") | 
-                Q(created_by=u) |
-                Q(center=u.center)
-            )
-        elif u.role == "teacher":
-            return qs.filter(teacher=u)
-        return qs.none()
-
     def has_view_permission(self, request, obj=None):
         if not request.user.is_authenticated:
             return False
@@ -307,12 +267,12 @@ class StudentAdmin(admin.ModelAdmin):
 
 # --- Attendance ---
 @admin.register(Attendance)
-class AttendanceAdmin(admin.ModelAdmin):
+class AttendanceAdmin(RoleScopedAdminMixin, admin.ModelAdmin):
     list_display = (
         'id',
         'student', 
         'teacher', 
-        'created_at_date',
+        'lesson_date',
         'lesson_1',
         'lesson_2', 
         'lesson_3',
@@ -320,35 +280,13 @@ class AttendanceAdmin(admin.ModelAdmin):
     
     list_editable = ('lesson_1', 'lesson_2', 'lesson_3')
     
-    list_filter = ('teacher', 'created_at', 'student__center')
+    list_filter = ('teacher', 'lesson_date', 'student__center')
     search_fields = ('student__first_name', 'student__last_name', 'teacher__first_name', 'teacher__last_name')
+    date_hierarchy = 'lesson_date'
     
     readonly_fields = ('created_at', 'created_by')
     
     actions = ['delete_selected_attendance']
-    
-    def created_at_date(self, obj):
-        return obj.created_at.date()
-    created_at_date.short_description = "Sana"
-
-    def get_queryset(self, request):
-        qs = super().get_queryset(request)
-        if not request.user.is_authenticated:
-            return qs.none()
-        
-        user = request.user
-        if hasattr(user, 'role'):
-            if user.role == "superadmin":
-                return qs
-            elif user.role in ["admin", "admin_mini"]:
-                # Admin: o'z markazidagi barcha davomatlar + superadmin qo'shganlar
-                return qs.filter(
-                    Q(student__center=user.center) |
-                    Q(created_by__role="superadmin")
-                )
-            elif user.role == "teacher":
-                return qs.filter(teacher=user)
-        return qs.none()
 
     def has_module_permission(self, request):
         """App ni admin panelda ko'rish uchun ruxsat"""
@@ -477,12 +415,12 @@ class GradeAdminForm(forms.ModelForm):
                 elif user.role in ["admin", "admin_mini"]:
                     # Admin: o'z markazidagi barcha o'quvchilar + superadmin qo'shganlar
                     self.fields['student'].queryset = Student.objects.filter(
-                        Q(center=user.center) | Q(created_by__role="superadmin"),
+                        Q(center=user.center) | Q(created_by__in=superadmin_ids()),
                         is_active=True
                     )
 
 @admin.register(Grade)
-class GradeAdmin(admin.ModelAdmin):
+class GradeAdmin(RoleScopedAdminMixin, admin.ModelAdmin):
     form = GradeAdminForm
     list_display = ("id", "student", "teacher", "subject", "score", "date", "created_by")
     readonly_fields = ("created_by", "teacher")
@@ -494,25 +432,6 @@ class GradeAdmin(admin.ModelAdmin):
         form.current_user = request.user
         return form
 
-    def get_queryset(self, request):
-        qs = super().get_queryset(request)
-        if not request.user.is_authenticated:
-            return qs.none()
-        
-        user = request.user
-        if hasattr(user, 'role'):
-            if user.role == "superadmin":
-                return qs
-            elif user.role in ["admin", "admin_mini"]:
-                # Admin: o'z markazidagi barcha baholar + superadmin qo'shganlar
-                return qs.filter(
-                    Q(student__center=user.center) |
-                    Q(created_by__role="superadmin")
-                )
-            elif user.role == "teacher":
-                return qs.filter(teacher=user)
-        return qs.none()
-
     def has_module_permission(self, request):
         if not request.user.is_authenticated:
             return False
@@ -587,7 +506,7 @@ class GradeAdmin(admin.ModelAdmin):
 
 # --- Payment ---
 @admin.register(Payment)
-class PaymentAdmin(admin.ModelAdmin):
+class PaymentAdmin(RoleScopedAdminMixin, admin.ModelAdmin):
     list_display = ("id", "student", "amount", "date", "deadline", "status", "created_by")
     search_fields = ("student__first_name", "student__last_name", "status")
     readonly_fields = ("created_by",)
@@ -605,7 +524,7 @@ class PaymentAdmin(admin.ModelAdmin):
             elif request.user.role in ["admin", "admin_mini"]:
                 # Admin: superadmin qo'shgan o'quvchilar + o'zi qo'shganlar + o'z markazidagilar
                 kwargs["queryset"] = Student.objects.filter(
-                    Q(created_by__role="superadmin") | 
+                    Q(created_by__in=superadmin_ids()) | 
                     Q(created_by=request.user) |
                     Q(center=request.user.center)
                 )
@@ -614,22 +533,6 @@ class PaymentAdmin(admin.ModelAdmin):
                 
         return super().formfield_for_foreignkey(db_field, request, **kwargs)
 
-    def get_queryset(self, request):
-        qs = super().get_queryset(request)
-        if not request.user.is_authenticated:
-            return qs.none()
-        
-        u = request.user
-        if u.role == "superadmin":
-            return qs
-        if u.role in ["admin", "admin_mini"]:
-            return qs.filter(
-                Q(created_by__role="superadmin") | 
-                Q(created_by=u) |
-                Q(student__center=u.center)
-            )
-        return qs.none()
-
     def has_view_permission(self, request, obj=None):
         if not request.user.is_authenticated:
             return False
@@ -683,7 +586,7 @@ class PaymentAdmin(admin.ModelAdmin):
 
 # --- News ---
 @admin.register(News)
-class NewsAdmin(admin.ModelAdmin):
+class NewsAdmin(RoleScopedAdminMixin, admin.ModelAdmin):
     list_display = ("id", "title", "center", "created_by", "created_at", "is_active")
     search_fields = ("title", "body")
     readonly_fields = ("created_at", "created_by")
@@ -701,24 +604,12 @@ class NewsAdmin(admin.ModelAdmin):
             elif request.user.role == "admin":
                 # Admin: superadmin qo'shgan markazlar + o'z markazi
                 kwargs["queryset"] = LearningCenter.objects.filter(
-                    Q(created_by__role="superadmin") | Q(id=request.user.center.id)
+                    Q(created_by__in=superadmin_ids()) | Q(id=request.user.center.id)
                 )
             else:
                 kwargs["queryset"] = LearningCenter.objects.none()
         return super().formfield_for_foreignkey(db_field, request, **kwargs)
 
-    def get_queryset(self, request):
-        qs = super().get_queryset(request)
-        if not request.user.is_authenticated:
-            return qs.none()
-        
-        u = request.user
-        if u.role == "superadmin":
-            return qs
-        if u.role == "admin":
-            return qs.filter(created_by__role="superadmin") | qs.filter(created_by=u)
-        return qs.none()
-
     def has_view_permission(self, request, obj=None):
         if not request.user.is_authenticated:
             return False
@@ -792,7 +683,7 @@ class HomeworkAdminForm(forms.ModelForm):
                     # Admin: superadmin qo'shgan teacherlar + o'z markazidagi teacherlar
                     self.fields['teacher'].queryset = User.objects.filter(
                         Q(role__in=["teacher", "admin_mini"]) &
-                        (Q(created_by__role="superadmin") | Q(center=user.center))
+                        (Q(created_by__in=superadmin_ids()) | Q(center=user.center))
                     )
                 elif user.role == "teacher":
                     self.fields['teacher'].queryset = User.objects.filter(id=user.id)
@@ -808,7 +699,7 @@ class HomeworkAdminForm(forms.ModelForm):
                 elif user.role in ["admin", "admin_mini"]:
                     # Admin: superadmin qo'shgan o'quvchilar + o'zi qo'shganlar + o'z markazidagilar
                     self.fields['students'].queryset = Student.objects.filter(
-                        (Q(created_by__role="superadmin") | 
+                        (Q(created_by__in=superadmin_ids()) | 
                          Q(created_by=user) |
                          Q(center=user.center)) &
                         Q(is_active=True)
@@ -836,7 +727,7 @@ class HomeworkAdminForm(forms.ModelForm):
                     self.fields['center'].queryset = LearningCenter.objects.none()
 
 @admin.register(Homework)
-class HomeworkAdmin(admin.ModelAdmin):
+class HomeworkAdmin(RoleScopedAdminMixin, admin.ModelAdmin):
     form = HomeworkAdminForm
     list_display = (
         'id',
@@ -867,6 +758,9 @@ class HomeworkAdmin(admin.ModelAdmin):
     readonly_fields = (
         'created_at',
         'created_by',
+        'file_size',
+        'file_content_type',
+        'file_checksum',
     )
     
     filter_horizontal = ('students',)
@@ -875,6 +769,9 @@ class HomeworkAdmin(admin.ModelAdmin):
         ('Asosiy maʼlumotlar', {
             'fields': ('title', 'description', 'due_date', 'homework_file')
         }),
+        ('Fayl maʼlumotlari', {
+            'fields': ('file_size', 'file_content_type', 'file_checksum')
+        }),
         ('Biriktirishlar', {
             'fields': ('teacher', 'students', 'center')
         }),
@@ -913,26 +810,6 @@ class HomeworkAdmin(admin.ModelAdmin):
         form.current_user = request.user
         return form
     
-    def get_queryset(self, request):
-        qs = super().get_queryset(request)
-        if not request.user.is_authenticated:
-            return qs.none()
-        
-        user = request.user
-        if hasattr(user, 'role'):
-            if user.role == "superadmin":
-                return qs
-            elif user.role in ["admin", "admin_mini"]:
-                # Admin: superadmin qo'shganlar + o'zi qo'shganlar + o'z markazidagilar
-                return qs.filter(
-                    Q(created_by__role="superadmin") | 
-                    Q(created_by=user) |
-                    Q(center=user.center)
-                )
-            elif user.role == "teacher":
-                return qs.filter(teacher=user)
-        return qs.none()
-    
     def has_module_permission(self, request):
         if not request.user.is_authenticated:
             return False
@@ -1044,27 +921,29 @@ class HomeworkAdmin(admin.ModelAdmin):
         """Tanlangan uy vazifalarini barcha o'quvchilarga biriktirish"""
         user = request.user
         
-        for homework in queryset:
-            if user.role == "superadmin":
-                students = Student.objects.filter(is_active=True)
-            elif user.role in ["admin", "admin_mini"]:
-                students = Student.objects.filter(
-                    center=user.center,
-                    is_active=True
-                )
-            elif user.role == "teacher":
-                students = Student.objects.filter(
-                    teacher=user,
-                    is_active=True
-                )
-            else:
-                continue
-            
-            homework.students.add(*students)
+        if user.role == "superadmin":
+            students = Student.objects.filter(is_active=True)
+        elif user.role in ["admin", "admin_mini"]:
+            students = Student.objects.filter(
+                center_id=user.center_id,
+                is_active=True
+            )
+        elif user.role == "teacher":
+            students = Student.objects.filter(
+                teacher=user,
+                is_active=True
+            )
+        else:
+            self.message_user(request, "Sizda bu amal uchun ruxsat yo'q", messages.ERROR)
+            return
+        
+        # Barcha tanlangan uy vazifalari bitta INSERT ... SELECT bilan
+        result = assign_homeworks(queryset, students)
         
         self.message_user(
             request,
-            f"{queryset.count()} ta uy vazifasi barcha o'quvchilarga biriktirildi",
+            f"{result['homeworks']} ta uy vazifasi barcha o'quvchilarga biriktirildi "
+            f"({result['assigned']} ta yangi biriktirish)",
             messages.SUCCESS
         )
     assign_to_all_students.short_description = "Barcha o'quvchilarga biriktirish"
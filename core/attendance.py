@@ -0,0 +1,386 @@
+# core/attendance.py
+"""
+Haftalik davomat generatori.
+
+Celery task (core.tasks.create_weekly_attendance) va
+create_weekly_attendance management command'i shu modulni chaqiradi.
+Parallel rejimda har bir markaz alohida shard sifatida
+generate_center_attendance orqali bajariladi.
+
+Takroriy davomatdan (student, teacher, lesson_date) unique constraint
+himoya qiladi: generatsiya INSERT ... ON CONFLICT DO NOTHING, qo'lda
+belgilash esa upsert_attendance orqali ON CONFLICT DO UPDATE bilan yoziladi.
+"""
+import logging
+import time
+from collections import Counter, defaultdict
+from datetime import date
+
+from django.db import transaction
+from django.db.models import Count
+from django.utils import timezone
+
+from .cache import invalidate_dashboard
+from .models import Attendance, Student
+from .stats import attendances_created, reconcile_student_stats
+from account.models import User
+
+logger = logging.getLogger(__name__)
+
+# bulk_create bitta INSERT'ga nechta qator yozishi
+ATTENDANCE_BATCH_SIZE = 1000
+
+LESSON_FIELDS = ['lesson_1', 'lesson_2', 'lesson_3']
+
+# /api/attendances/bulk/ bitta so'rovda qabul qiladigan eng ko'p o'quvchi
+ATTENDANCE_BULK_MAX_ITEMS = 200
+
+
+def attendance_idempotency_key(day, center_id):
+    """Bitta markaz (shard) uchun bir kunlik generatsiya kaliti"""
+    return f"weekly-attendance:{day}:{center_id if center_id is not None else 'none'}"
+
+
+def fetch_center_ids():
+    """Faol o'qituvchilar biriktirilgan markazlar (markazsizlar uchun None)"""
+    return sorted(
+        set(
+            User.objects.filter(role="teacher", is_active=True)
+            .values_list('center_id', flat=True)
+            .distinct()
+        ),
+        key=lambda center_id: center_id or 0,
+    )
+
+
+def fetch_pairs(teacher_id=None, center_id=None, centerless=False):
+    """
+    Barcha (teacher_id, student_id, center_id) uchliklarini bitta so'rovda olish.
+
+    O'qituvchi o'quvchining teacher'i yoki uni yaratgan bo'lishi mumkin,
+    center_id esa o'qituvchining markazi. centerless=True bo'lsa faqat
+    markazga biriktirilmagan o'qituvchilar olinadi.
+    """
+    by_teacher = Student.objects.filter(
+        is_active=True,
+        teacher__role="teacher",
+        teacher__is_active=True,
+    )
+    by_creator = Student.objects.filter(
+        is_active=True,
+        created_by__role="teacher",
+        created_by__is_active=True,
+    )
+
+    if teacher_id:
+        by_teacher = by_teacher.filter(teacher_id=teacher_id)
+        by_creator = by_creator.filter(created_by_id=teacher_id)
+
+    if center_id:
+        by_teacher = by_teacher.filter(teacher__center_id=center_id)
+        by_creator = by_creator.filter(created_by__center_id=center_id)
+    elif centerless:
+        by_teacher = by_teacher.filter(teacher__center__isnull=True)
+        by_creator = by_creator.filter(created_by__center__isnull=True)
+
+    return set(
+        by_teacher.values_list('teacher_id', 'id', 'teacher__center_id').union(
+            by_creator.values_list('created_by_id', 'id', 'created_by__center_id')
+        )
+    )
+
+
+def _teacher_counts(teacher_ids, day):
+    """{teacher_id: shu kundagi davomatlar soni} (bitta GROUP BY so'rov)"""
+    return dict(
+        Attendance.objects.filter(teacher_id__in=teacher_ids, lesson_date=day)
+        .values('teacher_id')
+        .annotate(rows=Count('id'))
+        .values_list('teacher_id', 'rows')
+    )
+
+
+def _generate_chunk(pairs, day, force, dry_run, batch_size):
+    """
+    Bitta bo'lak uchun yetishmagan davomatlarni yaratish.
+
+    Mavjud davomatlar bitta so'rov bilan tekshiriladi; yozish esa
+    ON CONFLICT DO NOTHING bilan bajariladi, shuning uchun parallel
+    generatsiya ham takror yaratmaydi. force=True bo'lsa juftliklar
+    tekshirilmaydi, faqat o'qituvchilar bo'yicha qatorlar soni olinadi.
+    Yaratilganlar soni yozishdan oldingi va keyingi sonlar farqidan
+    olinadi (o'tkazib yuborilgan konfliktlar hisoblanmaydi).
+    {teacher_id: {'created', 'skipped'}} qaytaradi.
+    """
+    pairs = {(teacher_id, student_id) for teacher_id, student_id, _ in pairs}
+    teacher_ids = {teacher_id for teacher_id, _ in pairs}
+    per_teacher = Counter(teacher_id for teacher_id, _ in pairs)
+
+    if force:
+        existing = set()
+        before = _teacher_counts(teacher_ids, day)
+    else:
+        existing = set(
+            Attendance.objects.filter(teacher_id__in=teacher_ids, lesson_date=day)
+            .values_list('teacher_id', 'student_id')
+        )
+        before = Counter(teacher_id for teacher_id, _ in existing)
+
+    missing = sorted(pairs - existing)
+
+    if dry_run:
+        created = Counter(teacher_id for teacher_id, _ in missing)
+    else:
+        Attendance.objects.bulk_create(
+            [
+                Attendance(
+                    student_id=student_id,
+                    teacher_id=teacher_id,
+                    lesson_1=False,
+                    lesson_2=False,
+                    lesson_3=False,
+                    lesson_date=day,
+                    created_by_id=teacher_id,
+                )
+                for teacher_id, student_id in missing
+            ],
+            batch_size=batch_size,
+            ignore_conflicts=True,
+        )
+        after = _teacher_counts(teacher_ids, day) if missing else before
+        created = Counter({
+            teacher_id: after.get(teacher_id, 0) - before.get(teacher_id, 0)
+            for teacher_id in teacher_ids
+        })
+
+        if missing:
+            # bulk_create post_save signalini yubormaydi. Qaysi qatorlar
+            # haqiqatan yozilgani noma'lum bo'lsa statistika qayta hisoblanadi
+            student_ids = [student_id for _, student_id in missing]
+            if sum(created.values()) == len(missing):
+                attendances_created(student_ids)
+            else:
+                reconcile_student_stats(set(student_ids))
+            invalidate_dashboard()
+
+    return {
+        teacher_id: {
+            'created': created.get(teacher_id, 0),
+            'skipped': per_teacher[teacher_id] - created.get(teacher_id, 0),
+        }
+        for teacher_id in teacher_ids
+    }
+
+
+def generate_attendance(teacher_id=None, center_id=None, force=False, dry_run=False,
+                        batch_size=ATTENDANCE_BATCH_SIZE, per_center=False):
+    """
+    Har bir o'qituvchi uchun o'quvchilariga bugungi davomatni yaratish.
+
+    force - mavjudlik tekshiruvisiz yozish (takrorlar baribir yaratilmaydi)
+    dry_run - hech narsa yozmasdan faqat hisoblash
+    per_center - har bir markazni alohida tranzaksiyada yozish; bitta markazdagi
+    xatolik qolganlarini to'xtatmaydi, qayta ishga tushirilganda esa allaqachon
+    yozilgan markazlar o'tkazib yuboriladi
+    """
+    started = time.monotonic()
+    today = timezone.localdate()
+
+    pairs = fetch_pairs(teacher_id=teacher_id, center_id=center_id)
+    fetched = time.monotonic()
+
+    if per_center:
+        chunks = defaultdict(set)
+        for pair in pairs:
+            chunks[pair[2]].add(pair)
+    else:
+        chunks = {None: pairs}
+
+    per_teacher = defaultdict(lambda: {'created': 0, 'skipped': 0})
+    per_center_result = {}
+    failed_centers = []
+
+    for chunk_center_id, chunk in sorted(chunks.items(), key=lambda item: item[0] or 0):
+        try:
+            with transaction.atomic():
+                counts = _generate_chunk(chunk, today, force, dry_run, batch_size)
+        except Exception as e:
+            if not per_center:
+                raise
+            logger.error(f"Markaz {chunk_center_id} uchun davomat yaratishda xatolik: {str(e)}")
+            failed_centers.append(chunk_center_id)
+            continue
+
+        for teacher_id, teacher_counts in counts.items():
+            per_teacher[teacher_id]['created'] += teacher_counts['created']
+            per_teacher[teacher_id]['skipped'] += teacher_counts['skipped']
+
+        if per_center:
+            per_center_result[str(chunk_center_id)] = {
+                'created': sum(v['created'] for v in counts.values()),
+                'skipped': sum(v['skipped'] for v in counts.values()),
+            }
+
+    finished = time.monotonic()
+
+    result = {
+        'date': today.isoformat(),
+        'dry_run': dry_run,
+        'created': sum(v['created'] for v in per_teacher.values()),
+        'skipped': sum(v['skipped'] for v in per_teacher.values()),
+        'teachers': {str(k): v for k, v in sorted(per_teacher.items())},
+        'timings': {
+            'fetch_pairs': round(fetched - started, 4),
+            'generate': round(finished - fetched, 4),
+            'total': round(finished - started, 4),
+        },
+    }
+
+    if per_center:
+        result['centers'] = per_center_result
+        result['failed_centers'] = failed_centers
+
+    return result
+
+
+def generate_center_attendance(center_id, day=None, batch_size=ATTENDANCE_BATCH_SIZE):
+    """
+    Bitta markaz (shard) uchun davomat yaratish.
+
+    Parallel (Celery chord) rejimida ishlatiladi. Bir xil idempotency kalitli
+    shard qayta bajarilsa (retry) yoki parallel ishlasa ham unique constraint
+    tufayli takroriy davomat yaratilmaydi.
+    """
+    started = time.monotonic()
+    day = date.fromisoformat(day) if isinstance(day, str) else (day or timezone.localdate())
+    key = attendance_idempotency_key(day.isoformat(), center_id)
+
+    pairs = fetch_pairs(center_id=center_id, centerless=center_id is None)
+
+    with transaction.atomic():
+        per_teacher = _generate_chunk(pairs, day, False, False, batch_size)
+
+    return {
+        'key': key,
+        'center': center_id,
+        'date': day.isoformat(),
+        'created': sum(v['created'] for v in per_teacher.values()),
+        'skipped': sum(v['skipped'] for v in per_teacher.values()),
+        'teachers': {str(k): v for k, v in sorted(per_teacher.items())},
+        'timings': {'total': round(time.monotonic() - started, 4)},
+    }
+
+
+def merge_center_results(results):
+    """Shard natijalarini generate_attendance formatidagi bitta natijaga yig'ish"""
+    teachers = {}
+    centers = {}
+
+    for result in results:
+        teachers.update(result['teachers'])
+        centers[str(result['center'])] = {
+            'created': result['created'],
+            'skipped': result['skipped'],
+        }
+
+    return {
+        'date': results[0]['date'] if results else timezone.localdate().isoformat(),
+        'dry_run': False,
+        'created': sum(result['created'] for result in results),
+        'skipped': sum(result['skipped'] for result in results),
+        'teachers': dict(sorted(teachers.items(), key=lambda item: int(item[0]))),
+        'centers': centers,
+        'timings': {
+            'slowest_shard': max((result['timings']['total'] for result in results), default=0),
+            'total_shards': round(sum(result['timings']['total'] for result in results), 4),
+        },
+    }
+
+
+def upsert_attendance(student_id, teacher_id, lesson_date=None, created_by_id=None, **lessons):
+    """
+    Davomatni belgilash: (student, teacher, lesson_date) uchun qator bo'lmasa
+    yaratiladi, bo'lsa berilgan dars belgilari yangilanadi (ON CONFLICT DO UPDATE).
+
+    bulk_create signallarni yubormaydi, shuning uchun statistika va dashboard
+    keshi shu yerda yangilanadi. (attendance, created) qaytaradi.
+    """
+    attendance = Attendance(
+        student_id=student_id,
+        teacher_id=teacher_id,
+        lesson_date=lesson_date or timezone.localdate(),
+        created_by_id=created_by_id,
+        **lessons,
+    )
+    key = {'student_id': student_id, 'teacher_id': teacher_id, 'lesson_date': attendance.lesson_date}
+    update_fields = [field for field in LESSON_FIELDS if field in lessons]
+
+    with transaction.atomic():
+        # Faqat javob statusi uchun: yozishning o'zi ON CONFLICT bilan himoyalangan
+        created = not Attendance.objects.filter(**key).exists()
+        if update_fields:
+            Attendance.objects.bulk_create(
+                [attendance],
+                update_conflicts=True,
+                unique_fields=['student', 'teacher', 'lesson_date'],
+                update_fields=update_fields,
+            )
+        else:
+            Attendance.objects.bulk_create([attendance], ignore_conflicts=True)
+
+        attendance = Attendance.objects.select_related('student').get(**key)
+        reconcile_student_stats([student_id])
+    invalidate_dashboard(attendance.student.center_id)
+    return attendance, created
+
+
+def bulk_mark_attendance(rows, lesson_date, created_by_id=None):
+    """
+    Bir kun uchun butun sinf davomatini belgilash.
+
+    rows - {student_id, teacher_id, center_id, lesson_1..3} ro'yxati
+    (egalik oldindan tekshirilgan). Hammasi bitta INSERT ... ON CONFLICT
+    DO UPDATE bilan yoziladi, statistika va dashboard keshi bir marta
+    yangilanadi. Qisqa xulosa qaytaradi.
+    """
+    attendances = [
+        Attendance(
+            student_id=row['student_id'],
+            teacher_id=row['teacher_id'],
+            lesson_date=lesson_date,
+            created_by_id=created_by_id,
+            **{field: row[field] for field in LESSON_FIELDS},
+        )
+        for row in rows
+    ]
+
+    with transaction.atomic():
+        existing = set(
+            Attendance.objects.filter(
+                lesson_date=lesson_date,
+                student_id__in=[row['student_id'] for row in rows],
+            ).values_list('student_id', 'teacher_id')
+        )
+        Attendance.objects.bulk_create(
+            attendances,
+            update_conflicts=True,
+            unique_fields=['student', 'teacher', 'lesson_date'],
+            update_fields=LESSON_FIELDS,
+        )
+        # bulk_create signallarni yubormaydi
+        reconcile_student_stats([row['student_id'] for row in rows])
+
+    for center_id in {row['center_id'] for row in rows}:
+        invalidate_dashboard(center_id)
+
+    created = sum(1 for row in rows if (row['student_id'], row['teacher_id']) not in existing)
+    attended = [sum(row[field] for field in LESSON_FIELDS) for row in rows]
+    return {
+        'lesson_date': lesson_date,
+        'count': len(rows),
+        'created': created,
+        'updated': len(rows) - created,
+        'full': attended.count(len(LESSON_FIELDS)),
+        'absent': attended.count(0),
+        'partial': sum(1 for value in attended if 0 < value < len(LESSON_FIELDS)),
+    }
@@ -0,0 +1,188 @@
+# core/attendance_archive.py
+"""
+Davomat arxivi (AttendanceMonth).
+
+Eski Attendance qatorlari o'quvchi-o'qituvchi-oy bo'yicha bitta qatorga
+bit maskalar sifatida yig'iladi. archived_attendances adapteri maskalarni
+saqlanmagan Attendance obyektlariga qaytaradi, shuning uchun
+AttendanceSerializer arxivni ham o'zgarishsiz chiqaradi.
+
+StudentStats va 30 kunlik davomat foizi Attendance qatorlaridan
+hisoblanadi, shuning uchun ARCHIVE_MIN_AGE_DAYS'dan yangi davomatlar
+arxivlanmaydi.
+"""
+import logging
+from datetime import datetime, time as dt_time, timedelta
+
+from django.db import connection, transaction
+from django.utils import timezone
+
+from .cache import invalidate_dashboard
+from .models import Attendance, AttendanceMonth
+
+logger = logging.getLogger(__name__)
+
+ARCHIVE_BATCH_SIZE = 1000
+
+# 30 kunlik statistika oynasiga tegmaslik uchun
+ARCHIVE_MIN_AGE_DAYS = 31
+
+MASK_FIELDS = ['days_mask', 'lesson_1_mask', 'lesson_2_mask', 'lesson_3_mask']
+
+
+def month_start(day):
+    return day.replace(day=1)
+
+
+def next_month(day):
+    return (month_start(day) + timedelta(days=32)).replace(day=1)
+
+
+def window_mask(month, start, end):
+    """month oyining [start, end) oralig'iga tushadigan kunlar maskasi"""
+    first = max(start, month)
+    last = min(end, next_month(month))
+    if first >= last:
+        return 0
+    return ((1 << (last - first).days) - 1) << (first.day - 1)
+
+
+# ========== Konvertatsiya ==========
+
+def archive_attendance(before, batch_size=ARCHIVE_BATCH_SIZE, dry_run=False):
+    """
+    lesson_date < before bo'lgan davomatlarni AttendanceMonth'ga ko'chirish.
+
+    Har bir bo'lak alohida tranzaksiyada: oy qatorlari upsert qilinadi
+    (mavjud maskalar bilan OR), ko'chirilgan Attendance qatorlari o'chiriladi.
+    Qayta ishga tushirish xavfsiz. {'rows': ..., 'months': ...} qaytaradi.
+    """
+    latest = timezone.localdate() - timedelta(days=ARCHIVE_MIN_AGE_DAYS)
+    if before > latest:
+        raise ValueError(f"Faqat {latest} dan oldingi davomatlarni arxivlash mumkin")
+
+    queryset = Attendance.objects.filter(lesson_date__lt=before)
+
+    if dry_run:
+        rows = queryset.count()
+        months = queryset.values('student_id', 'teacher_id', 'lesson_date__year', 'lesson_date__month').distinct().count()
+        return {'rows': rows, 'months': months}
+
+    total_rows = 0
+    months = set()
+
+    while True:
+        with transaction.atomic():
+            batch = list(
+                queryset.order_by('id').values(
+                    'id', 'student_id', 'teacher_id', 'lesson_date',
+                    'lesson_1', 'lesson_2', 'lesson_3',
+                )[:batch_size]
+            )
+            if not batch:
+                break
+
+            months |= _merge_into_months(batch)
+
+            # Arxivlangan qatorlar 30 kunlik oynadan tashqarida: har bir qator uchun
+            # post_delete signali (statistika, kesh) kerak emas
+            _delete_rows([row['id'] for row in batch])
+            total_rows += len(batch)
+
+    if total_rows:
+        invalidate_dashboard()
+        logger.info(f"Davomat arxivlandi: {total_rows} ta qator, {len(months)} ta oy yozildi")
+
+    return {'rows': total_rows, 'months': len(months)}
+
+
+def _delete_rows(ids):
+    """Attendance qatorlarini signallarsiz, bitta DELETE bilan o'chirish"""
+    qn = connection.ops.quote_name
+    with connection.cursor() as cursor:
+        cursor.execute(
+            f"DELETE FROM {qn(Attendance._meta.db_table)} "
+            f"WHERE {qn(Attendance._meta.pk.column)} IN ({', '.join(['%s'] * len(ids))})",
+            ids,
+        )
+
+
+def _merge_into_months(rows):
+    """Davomat qatorlarini oy qatorlariga OR bilan qo'shish; yozilgan oy kalitlarini qaytaradi"""
+    keys = {(row['student_id'], row['teacher_id'], month_start(row['lesson_date'])) for row in rows}
+
+    existing = {
+        (month.student_id, month.teacher_id, month.month): month
+        for month in AttendanceMonth.objects.select_for_update().filter(
+            student_id__in={key[0] for key in keys},
+            month__in={key[2] for key in keys},
+        )
+    }
+    created = {}
+
+    for row in rows:
+        key = (row['student_id'], row['teacher_id'], month_start(row['lesson_date']))
+        month = existing.get(key) or created.get(key)
+        if month is None:
+            month = created[key] = AttendanceMonth(
+                student_id=key[0], teacher_id=key[1], month=key[2]
+            )
+        month.mark(row['lesson_date'], row['lesson_1'], row['lesson_2'], row['lesson_3'])
+
+    AttendanceMonth.objects.bulk_create(created.values())
+    touched = [month for key, month in existing.items() if key in keys]
+    if touched:
+        AttendanceMonth.objects.bulk_update(touched, MASK_FIELDS)
+
+    return keys
+
+
+# ========== Adapter ==========
+
+def archived_attendances(months):
+    """
+    AttendanceMonth qatorlarini kunlik (saqlanmagan) Attendance obyektlariga
+    aylantirish. Yangi kunlar birinchi, AttendanceSerializer bilan chiqariladi.
+    """
+    attendances = []
+
+    for month in months:
+        days_mask = month.days_mask
+        while days_mask:
+            bit = days_mask & -days_mask
+            days_mask ^= bit
+            lesson_date = month.month.replace(day=bit.bit_length())
+            attendances.append(Attendance(
+                student=month.student,
+                teacher=month.teacher,
+                lesson_date=lesson_date,
+                lesson_1=bool(month.lesson_1_mask & bit),
+                lesson_2=bool(month.lesson_2_mask & bit),
+                lesson_3=bool(month.lesson_3_mask & bit),
+                # Asl vaqt saqlanmaydi: dars kunining boshlanishi
+                created_at=timezone.make_aware(datetime.combine(lesson_date, dt_time.min)),
+            ))
+
+    attendances.sort(key=lambda attendance: attendance.lesson_date, reverse=True)
+    return attendances
+
+
+def archived_attendance_rate(months, start, end):
+    """
+    [start, end) oralig'idagi davomat foizi, faqat bit amallari bilan
+    (student_attendance_rate bilan bir xil formula: qatnashgan / kunlar * 3).
+    """
+    days = attended = 0
+
+    for month in months:
+        mask = window_mask(month.month, start, end) & month.days_mask
+        days += mask.bit_count()
+        attended += (
+            (month.lesson_1_mask & mask).bit_count()
+            + (month.lesson_2_mask & mask).bit_count()
+            + (month.lesson_3_mask & mask).bit_count()
+        )
+
+    if days:
+        return round(attended / (days * 3) * 100, 2)
+    return 0
@@ -0,0 +1,212 @@
+# core/billing.py
+"""
+Oylik hisob (to'lovlar) generatsiyasi.
+
+Markazning faol o'quvchilari (yoki berilgan qismi) uchun bir oyga
+Payment qatorlari yaratiladi. Takrordan (student, period) unique
+constraint himoya qiladi: yozish INSERT ... ON CONFLICT DO NOTHING, shuning
+uchun shu oy uchun qayta ishga tushirish faqat yangi o'quvchilarga hisob
+yozadi.
+
+Ish Celery task'da (core.tasks.run_monthly_billing) partiyalar bilan
+bajariladi, holati keshda saqlanadi va API orqali kuzatiladi
+(GET /api/payments/billing_run/?period=YYYY-MM&center=...).
+
+Muddati o'tgan 'pending' to'lovlar har kecha bitta UPDATE bilan 'overdue'
+holatiga o'tkaziladi (mark_overdue_payments, core.tasks.mark_overdue_payments).
+"""
+import logging
+import time
+
+from django.core.cache import cache
+from django.db import connection, transaction
+from django.db.models.constants import OnConflict
+from django.utils import timezone
+
+from .cache import invalidate_dashboard
+from .models import Payment, Student
+from .stats import payments_created, payments_overdue
+
+logger = logging.getLogger(__name__)
+
+# Bitta INSERT'ga nechta to'lov yoziladi
+BILLING_BATCH_SIZE = 1000
+
+# Holat yozuvi keshda qancha saqlanadi (soniya)
+BILLING_PROGRESS_TIMEOUT = 60 * 60 * 24
+
+# Tugagan ish ustidan qayta ishga tushirish qulfi (soniya)
+BILLING_CLAIM_TIMEOUT = 30
+
+PENDING, RUNNING, DONE, FAILED = 'pending', 'running', 'done', 'failed'
+
+
+# ========== Oylik hisob ==========
+
+def billing_run_id(center_id, period):
+    """Markaz va oy uchun ish kaliti: bir vaqtda bitta ish (Celery task_id ham shu)"""
+    return f"billing-run:{center_id}:{period:%Y-%m}"
+
+
+def get_billing_progress(run_id):
+    return cache.get(run_id)
+
+
+def set_billing_progress(run_id, **progress):
+    state = {**(cache.get(run_id) or {}), **progress, 'updated_at': int(time.time())}
+    cache.set(run_id, state, BILLING_PROGRESS_TIMEOUT)
+    return state
+
+
+def claim_billing_run(run_id):
+    """
+    Ishni atomar band qilish: yangi PENDING holat yoki (shu oy uchun ish
+    allaqachon navbatda yoki bajarilayotgan bo'lsa) None.
+
+    Birinchi ishga tushirish cache.add bilan band qilinadi. Tugagan ish
+    (done/failed) holati ustidan qayta ishga tushirishda qisqa muddatli
+    qulf olinadi va holat qulf ichida qayta o'qiladi - ikki parallel so'rov
+    bir xil task_id'ni ikki marta navbatga qo'ymaydi.
+    """
+    state = {
+        'status': PENDING, 'total': None, 'processed': 0, 'created': 0, 'skipped': 0, 'error': None,
+        'updated_at': int(time.time()),
+    }
+    if cache.add(run_id, state, BILLING_PROGRESS_TIMEOUT):
+        return state
+
+    claim_key = f"{run_id}:claim"
+    if not cache.add(claim_key, True, BILLING_CLAIM_TIMEOUT):
+        return None
+    try:
+        progress = cache.get(run_id)
+        if progress and progress['status'] in (PENDING, RUNNING):
+            return None
+        cache.set(run_id, state, BILLING_PROGRESS_TIMEOUT)
+        return state
+    finally:
+        cache.delete(claim_key)
+
+
+def billing_students(center_id, student_ids=None, teacher_id=None):
+    """Hisob yoziladigan o'quvchilar: markazning faol o'quvchilari, ixtiyoriy filtr bilan"""
+    queryset = Student.objects.filter(center_id=center_id, is_active=True)
+    if student_ids:
+        queryset = queryset.filter(pk__in=student_ids)
+    if teacher_id:
+        queryset = queryset.filter(teacher_id=teacher_id)
+    return queryset
+
+
+def generate_invoices(center_id, period, amount, deadline, date=None, student_ids=None, teacher_id=None,
+                      created_by_id=None, run_id=None, batch_size=BILLING_BATCH_SIZE):
+    """
+    Oy uchun hisoblarni partiyalar bilan yaratish.
+
+    Har bir partiya: shu oy uchun hisobi bor o'quvchilar bitta so'rovda
+    chiqarib tashlanadi, qolganlari bitta bulk_create bilan yoziladi
+    (parallel ish bilan to'qnashuv ON CONFLICT DO NOTHING bilan tashlab
+    yuboriladi va yaratilgan deb sanalmaydi).
+    {'total', 'processed', 'created', 'skipped'} qaytaradi.
+    """
+    run_id = run_id or billing_run_id(center_id, period)
+    queryset = billing_students(center_id, student_ids, teacher_id).order_by('pk')
+    total = queryset.count()
+    progress = set_billing_progress(
+        run_id, status=RUNNING, total=total, processed=0, created=0, skipped=0, error=None
+    )
+
+    last_pk = 0
+    while True:
+        batch = list(queryset.filter(pk__gt=last_pk).values_list('pk', flat=True)[:batch_size])
+        if not batch:
+            break
+        last_pk = batch[-1]
+
+        with transaction.atomic():
+            invoiced = set(
+                Payment.objects.filter(period=period, student_id__in=batch).values_list('student_id', flat=True)
+            )
+            inserted = _insert_invoices([
+                Payment(
+                    student_id=student_id, period=period, date=date or period, amount=amount,
+                    deadline=deadline, status='pending', created_by_id=created_by_id,
+                )
+                for student_id in batch
+                if student_id not in invoiced
+            ])
+            # INSERT signallarni yubormaydi
+            payments_created(inserted)
+
+        progress = set_billing_progress(
+            run_id,
+            processed=progress['processed'] + len(batch),
+            created=progress['created'] + len(inserted),
+            skipped=progress['skipped'] + len(batch) - len(inserted),
+        )
+        if len(batch) < batch_size:
+            break
+
+    invalidate_dashboard(center_id)
+    progress = set_billing_progress(run_id, status=DONE)
+    logger.info(
+        f"Oylik hisob ({run_id}): {progress['created']} ta yaratildi, "
+        f"{progress['skipped']} ta avval yozilgan"
+    )
+    return {key: progress[key] for key in ('total', 'processed', 'created', 'skipped')}
+
+
+def _insert_invoices(payments):
+    """
+    To'lovlarni bitta INSERT ... ON CONFLICT DO NOTHING RETURNING bilan yozish.
+
+    bulk_create(ignore_conflicts=True) qaysi qatorlar tashlab yuborilganini
+    aytmaydi; bu yerda haqiqatan yozilgan o'quvchilar id'lari qaytadi.
+    """
+    if not payments:
+        return []
+
+    opts = Payment._meta
+    qn = connection.ops.quote_name
+    fields = [field for field in opts.concrete_fields if not field.primary_key]
+    row_sql = f"({', '.join(['%s'] * len(fields))})"
+    sql = (
+        f"{connection.ops.insert_statement(on_conflict=OnConflict.IGNORE)} {qn(opts.db_table)} "
+        f"({', '.join(qn(field.column) for field in fields)}) "
+        f"VALUES {', '.join([row_sql] * len(payments))} "
+        f"{connection.ops.on_conflict_suffix_sql(fields, OnConflict.IGNORE, [], [])} "
+        f"RETURNING {qn(opts.get_field('student').column)}"
+    )
+    params = [
+        field.get_db_prep_save(getattr(payment, field.attname), connection)
+        for payment in payments
+        for field in fields
+    ]
+    with connection.cursor() as cursor:
+        cursor.execute(sql, params)
+        return [row[0] for row in cursor.fetchall()]
+
+
+# ========== Muddati o'tgan to'lovlar ==========
+
+def mark_overdue_payments(today=None):
+    """
+    Muddati o'tgan 'pending' to'lovlarni 'overdue' qilish (bitta UPDATE).
+
+    O'quvchi statistikasi va markaz dashboard'lari shu tranzaksiyada
+    yangilanadi (update() signal yubormaydi). O'tkazilganlar sonini qaytaradi.
+    """
+    today = today or timezone.localdate()
+    queryset = Payment.objects.filter(status='pending', deadline__lt=today)
+
+    with transaction.atomic():
+        rows = list(queryset.select_for_update(of=('self',)).values_list('student_id', 'student__center_id'))
+        if not rows:
+            return 0
+        updated = queryset.update(status='overdue')
+        payments_overdue([student_id for student_id, _ in rows])
+        for center_id in {center_id for _, center_id in rows}:
+            invalidate_dashboard(center_id)
+
+    logger.info(f"Muddati o'tgan to'lovlar: {updated} ta overdue qilindi ({today} gacha)")
+    return updated
@@ -0,0 +1,62 @@
+# core/cache.py
+"""
+Kesh versiyalari.
+
+Dashboard natijalari versiyali kalit bilan saqlanadi: ma'lumot o'zgarganda
+eski yozuvlarni o'chirish o'rniga tegishli versiya oshiriladi va keyingi
+so'rov yangi kalitga tushadi (eskilari TTL bilan o'zi o'chadi).
+
+- all: barcha dashboardlar (bulk operatsiyalar, markazi noma'lum o'zgarishlar)
+- global: superadmin dashboardi (istalgan markazdagi o'zgarish)
+- center:<id>: bitta markaz dashboardlari (admin, admin_mini, teacher)
+"""
+import time
+
+from django.core.cache import cache
+from django.db import transaction
+
+DASHBOARD_VERSION_ALL = 'dashboard:version:all'
+DASHBOARD_VERSION_GLOBAL = 'dashboard:version:global'
+
+
+def dashboard_center_version_key(center_id):
+    return f'dashboard:version:center:{center_id}'
+
+
+def _initial_version():
+    # Kalit Redis'dan o'chib ketgan bo'lsa ham avvalgi versiyalar bilan to'qnashmaydi
+    return int(time.time() * 1000)
+
+
+def get_version(key):
+    version = cache.get(key)
+    if version is None:
+        cache.add(key, _initial_version(), timeout=None)
+        version = cache.get(key)
+    return version or 0
+
+
+def bump_version(key):
+    try:
+        cache.incr(key)
+    except ValueError:
+        cache.set(key, _initial_version(), timeout=None)
+
+
+def invalidate_dashboard(center_id=None):
+    """
+    Markaz (yoki center_id berilmasa barcha) dashboard keshini eskirtirish.
+
+    Tranzaksiya ichida chaqirilsa versiya commit'dan keyin oshiriladi,
+    aks holda parallel so'rov eski ma'lumotni yangi kalitga yozib qo'yishi mumkin.
+    """
+    transaction.on_commit(lambda: _bump_dashboard(center_id))
+
+
+def _bump_dashboard(center_id):
+    if center_id is None:
+        bump_version(DASHBOARD_VERSION_ALL)
+        return
+
+    bump_version(dashboard_center_version_key(center_id))
+    bump_version(DASHBOARD_VERSION_GLOBAL)
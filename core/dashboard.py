@@ -0,0 +1,139 @@
+# core/dashboard.py
+"""
+Dashboard statistikasi.
+
+Har bir model uchun bitta so'rov: barcha ko'rsatkichlar shartli
+agregatsiya (Count(filter=Q(...))) orqali bir o'tishda hisoblanadi.
+Rollar orasidagi farq faqat ROLE_SCOPES'da e'lon qilinadi.
+
+Natijalar (rol, markaz, o'qituvchi) kaliti bilan Redis'da qisqa muddat
+keshlanadi; core.signals o'zgarishlarda markaz versiyasini oshiradi.
+"""
+from django.conf import settings
+from django.core.cache import cache
+from django.db.models import Avg, Count, Q
+from django.utils import timezone
+
+from .cache import (
+    DASHBOARD_VERSION_ALL, DASHBOARD_VERSION_GLOBAL,
+    dashboard_center_version_key, get_version,
+)
+from .models import Attendance, Grade, Homework, News, Payment, Student
+from account.models import User
+
+EMPTY_STATS = {
+    'total_students': 0,
+    'active_students': 0,
+    'total_teachers': 0,
+    'active_teachers': 0,
+    'total_homeworks': 0,
+    'active_homeworks': 0,
+    'upcoming_homeworks': 0,
+    'overdue_homeworks': 0,
+    'total_payments': 0,
+    'pending_payments': 0,
+    'total_news': 0,
+    'total_grades': 0,
+    'average_grade': 0,
+    'total_attendance': 0,
+    'today_attendance': 0,
+}
+
+# Rol -> scope turi. superadmin hamma narsani ko'radi, qolganlar o'z markazini,
+# teacher esa uy vazifasi, baho va davomatda faqat o'zinikini
+ROLE_SCOPES = {
+    'superadmin': 'global',
+    'admin': 'center',
+    'admin_mini': 'center',
+    'teacher': 'teacher',
+}
+
+
+def dashboard_spec(today):
+    """
+    (model, asosiy filtr, {scope: lookup}, {ko'rsatkich: agregat}) ro'yxati.
+
+    Scope lookup'i bo'lmasa 'teacher' scope 'center' lookup'iga tushadi.
+    """
+    return [
+        (Student, Q(), {'center': 'center_id'}, {
+            'total_students': Count('id'),
+            'active_students': Count('id', filter=Q(is_active=True)),
+        }),
+        (User, Q(role="teacher"), {'center': 'center_id'}, {
+            'total_teachers': Count('id'),
+            'active_teachers': Count('id', filter=Q(is_active=True)),
+        }),
+        (Homework, Q(), {'center': 'center_id', 'teacher': 'teacher_id'}, {
+            'total_homeworks': Count('id'),
+            'active_homeworks': Count('id', filter=Q(is_active=True)),
+            'upcoming_homeworks': Count('id', filter=Q(is_active=True, due_date__gte=today)),
+            'overdue_homeworks': Count('id', filter=Q(is_active=True, due_date__lt=today)),
+        }),
+        (Payment, Q(), {'center': 'student__center_id'}, {
+            'total_payments': Count('id'),
+            'pending_payments': Count('id', filter=Q(status='pending')),
+        }),
+        (News, Q(), {'center': 'center_id'}, {
+            'total_news': Count('id'),
+        }),
+        (Grade, Q(), {'center': 'student__center_id', 'teacher': 'teacher_id'}, {
+            'total_grades': Count('id'),
+            'average_grade': Avg('score'),
+        }),
+        (Attendance, Q(), {'center': 'student__center_id', 'teacher': 'teacher_id'}, {
+            'total_attendance': Count('id'),
+            'today_attendance': Count('id', filter=Q(lesson_date=today)),
+        }),
+    ]
+
+
+def compute_dashboard_stats(user):
+    """Foydalanuvchi roli bo'yicha dashboard statistikasini hisoblash"""
+    stats = dict(EMPTY_STATS)
+    scope = ROLE_SCOPES.get(user.role)
+
+    if scope is None or (scope != 'global' and not user.center_id):
+        return stats
+
+    scope_values = {'center': user.center_id, 'teacher': user.id}
+
+    for model, base_filter, lookups, aggregates in dashboard_spec(timezone.localdate()):
+        queryset = model.objects.filter(base_filter)
+
+        if scope != 'global':
+            lookup_scope = scope if scope in lookups else 'center'
+            queryset = queryset.filter(**{lookups[lookup_scope]: scope_values[lookup_scope]})
+
+        stats.update(queryset.aggregate(**aggregates))
+
+    stats['average_grade'] = round(stats['average_grade'], 2) if stats['average_grade'] else 0
+    return stats
+
+
+def dashboard_cache_key(user):
+    """(rol, markaz, o'qituvchi) va tegishli versiyalar bo'yicha kesh kaliti"""
+    scope = ROLE_SCOPES.get(user.role)
+    teacher_id = user.id if scope == 'teacher' else '-'
+
+    if scope == 'global':
+        scope_version = get_version(DASHBOARD_VERSION_GLOBAL)
+    else:
+        scope_version = get_version(dashboard_center_version_key(user.center_id))
+
+    return (
+        f"dashboard:stats:{user.role}:{user.center_id}:{teacher_id}:"
+        f"{get_version(DASHBOARD_VERSION_ALL)}:{scope_version}:{timezone.localdate()}"
+    )
+
+
+def get_dashboard_stats(user):
+    """Keshdan olish, bo'lmasa hisoblab qisqa TTL bilan saqlash"""
+    key = dashboard_cache_key(user)
+    stats = cache.get(key)
+
+    if stats is None:
+        stats = compute_dashboard_stats(user)
+        cache.set(key, stats, timeout=getattr(settings, 'DASHBOARD_CACHE_TIMEOUT', 60))
+
+    return stats
@@ -0,0 +1,74 @@
+# core/grades.py
+"""
+Baholarni ommaviy kiritish (imtihondan keyin butun sinf).
+
+Elementlar core.serializers.GradeBulkSerializer'da tekshiriladi: xato
+bo'lganlari javobda indeksi bilan qaytadi, to'g'rilari baribir saqlanadi.
+Bazaga murojaatlar elementlar soniga bog'liq emas: o'quvchilar va mavjud
+baholar bittadan so'rovda olinadi, yozish bulk_create/bulk_update bilan.
+
+Bir o'quvchiga bir kunda bir fandan o'qituvchi qo'ygan baho
+(student, teacher, subject, date) bo'yicha yangilanadi, yo'q bo'lsa yaratiladi.
+"""
+from django.db import transaction
+
+from .cache import invalidate_dashboard
+from .models import Grade
+from .stats import reconcile_student_stats
+
+# /api/grades/bulk/ bitta so'rovda qabul qiladigan eng ko'p baho
+GRADE_BULK_MAX_ITEMS = 200
+
+
+def bulk_upsert_grades(items, subject, date, user):
+    """
+    To'g'ri elementlarni bitta tranzaksiyada yozish.
+
+    Mavjud baholar tranzaksiya ichida (select_for_update bilan) o'qiladi:
+    parallel bulk so'rov shu qatorlarni yangilayotgan bo'lsa kutadi.
+
+    [{'index', 'student_id', 'id', 'status': 'created' | 'updated'}] qaytaradi.
+    """
+    if not items:
+        return []
+
+    with transaction.atomic():
+        existing = {
+            grade.student_id: grade
+            for grade in Grade.objects.select_for_update().filter(
+                student_id__in=[item['student_id'] for item in items],
+                teacher=user, subject=subject, date=date,
+            ).order_by('pk')
+        }
+
+        to_create, to_update, results = [], [], []
+        for item in items:
+            grade = existing.get(item['student_id'])
+            if grade is None:
+                grade = Grade(
+                    student_id=item['student_id'], teacher=user, subject=subject,
+                    date=date, created_by=user,
+                )
+                to_create.append(grade)
+            else:
+                to_update.append(grade)
+            grade.score, grade.comment = item['score'], item['comment']
+            results.append((item, grade))
+
+        Grade.objects.bulk_create(to_create)
+        Grade.objects.bulk_update(to_update, ['score', 'comment'])
+        # bulk operatsiyalar signal yubormaydi
+        reconcile_student_stats([item['student_id'] for item in items])
+        for center_id in {item['center_id'] for item in items}:
+            invalidate_dashboard(center_id)
+
+    created = {id(grade) for grade in to_create}
+    return [
+        {
+            'index': item['index'],
+            'student_id': item['student_id'],
+            'id': grade.pk,
+            'status': 'created' if id(grade) in created else 'updated',
+        }
+        for item, grade in results
+    ]
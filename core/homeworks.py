@@ -0,0 +1,74 @@
+# core/homeworks.py
+"""
+Uy vazifalarini o'quvchilarga ommaviy biriktirish.
+
+homework.students.add(*students) barcha Student obyektlarini yuklaydi,
+mavjud bog'lanishlarni o'qiydi va har bir uy vazifasi uchun alohida INSERT
+yuboradi. Bu yerda Homework.students jadvaliga bitta
+INSERT ... SELECT ... ON CONFLICT DO NOTHING yoziladi: o'quvchilar
+Python'ga yuklanmaydi, uy vazifalari soni so'rovlar soniga ta'sir qilmaydi.
+
+m2m_changed signali yuborilmaydi, shuning uchun StudentStats
+hisoblagichlari shu yerda yangilanadi (stats.homeworks_bulk_assigned).
+"""
+from django.db import connection, transaction
+from django.db.models import Count, Q
+from django.db.models.constants import OnConflict
+
+from .models import Homework
+from .stats import homeworks_bulk_assigned
+
+
+def assign_homeworks(homeworks, students):
+    """
+    homeworks'dagi har bir uy vazifasini students'dagi har bir o'quvchiga biriktirish.
+
+    Ikkalasi ham (ruxsat bo'yicha filtrlangan) queryset. Avval biriktirilganlar
+    o'tkazib yuboriladi. {'homeworks', 'students', 'assigned'} qaytaradi,
+    assigned - yangi bog'lanishlar soni.
+    """
+    homework_ids = dict(homeworks.order_by().values_list('pk', 'is_active'))
+    if not homework_ids:
+        return {'homeworks': 0, 'students': 0, 'assigned': 0}
+
+    student_ids = students.order_by().values('pk')
+    active_count = sum(1 for is_active in homework_ids.values() if is_active)
+    through = Homework.students.through
+
+    with transaction.atomic():
+        # Avval biriktirilganlar uchun hisoblagichlar qayta oshirilmaydi
+        already_assigned = list(
+            through.objects.filter(homework_id__in=homework_ids, student_id__in=student_ids)
+            .values('student_id')
+            .annotate(
+                active=Count('pk', filter=Q(homework__is_active=True)),
+                inactive=Count('pk', filter=Q(homework__is_active=False)),
+            )
+            .values_list('student_id', 'active', 'inactive')
+        )
+        assigned = _insert_assignments(list(homework_ids), student_ids)
+        homeworks_bulk_assigned(student_ids, active_count, len(homework_ids) - active_count, already_assigned)
+
+    return {'homeworks': len(homework_ids), 'students': students.count(), 'assigned': assigned}
+
+
+def _insert_assignments(homework_ids, student_ids):
+    """(uy vazifasi, o'quvchi) juftliklarini bitta INSERT ... SELECT bilan yozish"""
+    through = Homework.students.through
+    opts = through._meta
+    qn = connection.ops.quote_name
+
+    homework_pk = f"h.{qn(Homework._meta.pk.column)}"
+    student_pk = f"s.{qn(student_ids.model._meta.pk.column)}"
+    students_sql, students_params = student_ids.query.sql_with_params()
+    sql = (
+        f"{connection.ops.insert_statement(on_conflict=OnConflict.IGNORE)} {qn(opts.db_table)} "
+        f"({qn(opts.get_field('homework').column)}, {qn(opts.get_field('student').column)}) "
+        f"SELECT {homework_pk}, {student_pk} "
+        f"FROM {qn(Homework._meta.db_table)} h CROSS JOIN {qn(student_ids.model._meta.db_table)} s "
+        f"WHERE {homework_pk} IN ({', '.join(['%s'] * len(homework_ids))}) AND {student_pk} IN ({students_sql}) "
+        f"{connection.ops.on_conflict_suffix_sql([], OnConflict.IGNORE, [], [])}"
+    )
+    with connection.cursor() as cursor:
+        cursor.execute(sql, (*homework_ids, *students_params))
+        return cursor.rowcount
@@ -0,0 +1,72 @@
+# core/management/commands/archive_attendance.py
+from datetime import date, timedelta
+
+from django.core.management.base import BaseCommand, CommandError
+from django.utils import timezone
+from core.attendance_archive import (
+    ARCHIVE_BATCH_SIZE, ARCHIVE_MIN_AGE_DAYS, archive_attendance, month_start,
+)
+import logging
+
+logger = logging.getLogger(__name__)
+
+
+class Command(BaseCommand):
+    help = 'Eski davomatlarni oylik bit maskali arxivga (AttendanceMonth) ko\'chiradi'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--before',
+            type=date.fromisoformat,
+            help='Shu sanadan (YYYY-MM-DD) oldingi davomatlar arxivlanadi',
+        )
+        parser.add_argument(
+            '--older-than-days',
+            type=int,
+            default=90,
+            help='--before berilmasa: shuncha kundan eski to\'liq oylar arxivlanadi (standart: 90)',
+        )
+        parser.add_argument(
+            '--batch-size',
+            type=int,
+            default=ARCHIVE_BATCH_SIZE,
+            help=f'Bitta tranzaksiyadagi qatorlar soni (standart: {ARCHIVE_BATCH_SIZE})',
+        )
+        parser.add_argument(
+            '--dry-run',
+            action='store_true',
+            help='Hech narsa yozmasdan nechta qator arxivlanishini ko\'rsatish',
+        )
+
+    def handle(self, *args, **options):
+        before = options.get('before')
+        if before is None:
+            # Oy o'rtasidan kesilmasligi uchun oy boshiga tekislanadi
+            before = month_start(
+                timezone.localdate() - timedelta(days=max(options['older_than_days'], ARCHIVE_MIN_AGE_DAYS))
+            )
+
+        try:
+            result = archive_attendance(
+                before,
+                batch_size=options.get('batch_size'),
+                dry_run=options.get('dry_run'),
+            )
+        except ValueError as e:
+            raise CommandError(str(e))
+
+        if options.get('dry_run'):
+            self.stdout.write(
+                self.style.WARNING(
+                    f"Dry run: {before} dan oldingi {result['rows']} ta davomat "
+                    f"{result['months']} ta oy qatoriga yig'ilishi kerak edi (hech narsa yozilmadi)"
+                )
+            )
+            return
+
+        self.stdout.write(
+            self.style.SUCCESS(
+                f"Jami: {result['rows']} ta davomat {result['months']} ta oy qatoriga ko\'chirildi ({before} gacha)"
+            )
+        )
+        logger.info(f"Ruchnoy davomat arxivlandi: {result['rows']} ta qator")
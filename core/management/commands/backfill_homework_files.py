@@ -0,0 +1,67 @@
+# core/management/commands/backfill_homework_files.py
+from django.core.management.base import BaseCommand
+from core.models import Homework
+import logging
+
+logger = logging.getLogger(__name__)
+
+METADATA_FIELDS = ['file_size', 'file_content_type', 'file_checksum']
+
+
+class Command(BaseCommand):
+    help = 'Mavjud uy vazifasi fayllari uchun hajm, tur va checksum\'ni hisoblab saqlaydi'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--all',
+            action='store_true',
+            help='Metadata allaqachon mavjud bo\'lgan fayllarni ham qayta hisoblash',
+        )
+        parser.add_argument(
+            '--batch-size',
+            type=int,
+            default=200,
+            help='Bitta bulk_update so\'rovidagi qatorlar soni (standart: 200)',
+        )
+
+    def handle(self, *args, **options):
+        batch_size = options.get('batch_size')
+
+        homeworks = Homework.objects.exclude(homework_file='').exclude(homework_file__isnull=True)
+        if not options.get('all'):
+            homeworks = homeworks.filter(file_checksum='')
+
+        updated_count = 0
+        failed_count = 0
+        batch = []
+
+        for homework in homeworks.only('id', 'homework_file', *METADATA_FIELDS).iterator():
+            try:
+                homework.update_file_metadata()
+            except (OSError, ValueError) as e:
+                failed_count += 1
+                self.stdout.write(
+                    self.style.WARNING(f"Uy vazifasi #{homework.id}: faylni o\'qib bo\'lmadi ({str(e)})")
+                )
+                continue
+
+            batch.append(homework)
+            if len(batch) >= batch_size:
+                Homework.objects.bulk_update(batch, METADATA_FIELDS)
+                updated_count += len(batch)
+                batch = []
+
+        if batch:
+            Homework.objects.bulk_update(batch, METADATA_FIELDS)
+            updated_count += len(batch)
+
+        self.stdout.write(
+            self.style.SUCCESS(f"Jami: {updated_count} ta fayl metadata\'si saqlandi")
+        )
+
+        if failed_count > 0:
+            self.stdout.write(
+                self.style.WARNING(f"{failed_count} ta fayl topilmadi yoki o\'qib bo\'lmadi")
+            )
+
+        logger.info(f"Uy vazifasi fayllari metadata\'si to\'ldirildi: {updated_count} ta")
@@ -0,0 +1,137 @@
+# core/management/commands/benchmark_search.py
+import statistics
+import time
+
+from django.apps import apps
+from django.core.management.base import BaseCommand, CommandError
+from django.db import transaction
+from django.test import RequestFactory
+from rest_framework.filters import SearchFilter
+from rest_framework.request import Request
+
+from core.models import LearningCenter, News, Parent, Student
+from core.search import IndexedSearchFilter, get_search_backend, rebuild_search_index
+from core.views import NewsViewSet, ParentViewSet, StudentViewSet
+
+# (view, qidiruv so'zi) - frontend qidiruv maydoniga yoziladigan odatiy so'rovlar
+SEARCH_CASES = [
+    (StudentViewSet, 'Ali'),
+    (StudentViewSet, 'Karimov'),
+    (StudentViewSet, 'alisar kavaov'),
+    (StudentViewSet, '0012345'),
+    (ParentViewSet, 'Dilo'),
+    (ParentViewSet, '0014567'),
+    (NewsViewSet, 'imtihon'),
+    (NewsViewSet, "ta'til"),
+]
+
+# Ismlar bo'g'inlardan yig'iladi: har bir ism/familiya bazaning kichik qismida uchraydi
+SYLLABLES = ['ali', 'va', 'ka', 'rim', 'di', 'lo', 'sar', 'dor', 'ja', 'sur', 'no', 'bek', 'zod', 'ma', 'to', 'sha']
+
+
+def seed_name(number, suffix=''):
+    first = SYLLABLES[number % len(SYLLABLES)]
+    second = SYLLABLES[number // len(SYLLABLES) % len(SYLLABLES)]
+    return f"{first}{second}{suffix}".capitalize()
+
+
+NEWS_WORDS = ['imtihon', 'dars', 'jadval', "ta'til", 'to\'lov', 'yig\'ilish', 'olimpiada', 'natijalar']
+
+
+class Rollback(Exception):
+    pass
+
+
+class Command(BaseCommand):
+    help = 'Indekslangan qidiruvni odatdagi SearchFilter (LIKE) bilan solishtiradi'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--seed',
+            type=int,
+            default=0,
+            help='Sinov ma\'lumotlari: shuncha o\'quvchi/ota-ona yaratish (oxirida rollback qilinadi)',
+        )
+        parser.add_argument(
+            '--repeat',
+            type=int,
+            default=5,
+            help='Har bir so\'rov necha marta bajariladi (mediana olinadi)',
+        )
+
+    def handle(self, *args, **options):
+        backend = get_search_backend()
+        if backend is None:
+            raise CommandError("Qidiruv backend'i o'chirilgan yoki bu baza uchun mavjud emas")
+
+        try:
+            with transaction.atomic():
+                if options['seed']:
+                    self.seed(options['seed'])
+                    rebuild_search_index(apps.get_model, backend)
+                self.run(options['repeat'])
+                raise Rollback
+        except Rollback:
+            pass
+
+    def seed(self, count):
+        center = LearningCenter.objects.create(
+            name="Benchmark", address="-", phone_number="+998900000000",
+            email="bench@example.com", director="-",
+        )
+        Student.objects.bulk_create([
+            Student(
+                first_name=seed_name(i), last_name=seed_name(i // 7, 'ov'),
+                age=12, phone_number=f"+99890{i:07d}", address=f"Toshkent, {i}-uy",
+                subject="Matematika", center=center,
+            )
+            for i in range(count)
+        ], batch_size=1000)
+        Parent.objects.bulk_create([
+            Parent(
+                first_name=seed_name(i + 3), last_name=seed_name(i // 5, 'ova'),
+                phone_number=f"+99891{i:07d}", email=f"parent{i}@example.com", address="-",
+                workplace="-", relationship="ota", center=center,
+            )
+            for i in range(count)
+        ], batch_size=1000)
+        News.objects.bulk_create([
+            News(
+                title=f"{NEWS_WORDS[i % len(NEWS_WORDS)].capitalize()} haqida e'lon {i}",
+                body=' '.join(NEWS_WORDS[(i + j) % len(NEWS_WORDS)] for j in range(40)),
+                center=center,
+            )
+            for i in range(count // 10)
+        ], batch_size=1000)
+        self.stdout.write(self.style.SUCCESS(f"Sinov ma'lumotlari yaratildi: {count} o'quvchi, {count} ota-ona"))
+
+    def run(self, repeat):
+        factory = RequestFactory()
+        header = f"{'View':<16} {'So`rov':<12} {'LIKE ms':>9} {'Indeks ms':>10} {'LIKE':>6} {'Indeks':>7} {'x':>6}"
+        self.stdout.write(header)
+        self.stdout.write('-' * len(header))
+
+        for view_class, term in SEARCH_CASES:
+            request = Request(factory.get('/', {'search': term}))
+            view = view_class()
+            # OrderingFilter'dan keyingi holat: view'ning standart tartibi
+            queryset = view_class.queryset.model.objects.order_by(*view_class.ordering)
+
+            like_ms, like_count = self.measure(SearchFilter(), request, queryset, view, repeat)
+            indexed_ms, indexed_count = self.measure(IndexedSearchFilter(), request, queryset, view, repeat)
+
+            self.stdout.write(
+                f"{view_class.__name__[:16]:<16} {term:<12} {like_ms:>9.2f} {indexed_ms:>10.2f} "
+                f"{like_count:>6} {indexed_count:>7} {like_ms / indexed_ms if indexed_ms else 0:>6.1f}"
+            )
+
+    def measure(self, search_filter, request, queryset, view, repeat):
+        timings = []
+        for _ in range(repeat):
+            started = time.perf_counter()
+            # Frontend sahifasi: COUNT va birinchi 20 ta natija
+            filtered = search_filter.filter_queryset(request, queryset, view)
+            count = filtered.count()
+            list(filtered[:20])
+            timings.append((time.perf_counter() - started) * 1000)
+        return statistics.median(timings), count
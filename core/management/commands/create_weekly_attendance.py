@@ -1,8 +1,6 @@
 # core/management/commands/create_weekly_attendance.py
 from django.core.management.base import BaseCommand
-from django.utils import timezone
-from django.db.models import Q
-from core.models import Attendance, Student
+from core.attendance import ATTENDANCE_BATCH_SIZE, generate_attendance
 from account.models import User
 import logging
 
@@ -25,117 +23,126 @@ class Command(BaseCommand):
         parser.add_argument(
             '--force',
             action='store_true',
-            help='Agar allaqachon mavjud bo\'lsa ham yangi davomat yaratish',
+            help='Mavjud davomatlarni oldindan tekshirmaslik (takrorlar baribir yaratilmaydi)',
+        )
+        parser.add_argument(
+            '--dry-run',
+            action='store_true',
+            help='Hech narsa yozmasdan nechta davomat yaratilishini ko\'rsatish',
+        )
+        parser.add_argument(
+            '--batch-size',
+            type=int,
+            default=ATTENDANCE_BATCH_SIZE,
+            help=f'Bitta INSERT so\'rovidagi qatorlar soni (standart: {ATTENDANCE_BATCH_SIZE})',
+        )
+        parser.add_argument(
+            '--per-center',
+            action='store_true',
+            help='Har bir markazni alohida tranzaksiyada yozish (xatolikda qayta ishga tushirish mumkin)',
         )
 
     def handle(self, *args, **options):
         teacher_id = options.get('teacher_id')
         center_id = options.get('center_id')
         force = options.get('force')
-        
+        dry_run = options.get('dry_run')
+
         try:
             # O'qituvchilarni filtrlash
             teachers_query = User.objects.filter(role="teacher", is_active=True)
-            
+
             if teacher_id:
                 teachers_query = teachers_query.filter(id=teacher_id)
-                if not teachers_query.exists():
+
+            if center_id:
+                teachers_query = teachers_query.filter(center_id=center_id)
+
+            teachers = {
+                teacher.id: teacher
+                for teacher in teachers_query.only('id', 'first_name', 'last_name')
+            }
+
+            if not teachers:
+                if teacher_id:
                     self.stdout.write(
                         self.style.ERROR(f"ID {teacher_id} bo\'lgan faol o\'qituvchi topilmadi")
                     )
-                    return
-            
-            if center_id:
-                teachers_query = teachers_query.filter(center_id=center_id)
-            
-            teachers = teachers_query
-            
-            if not teachers.exists():
-                self.stdout.write(
-                    self.style.WARNING("Hech qanday faol o\'qituvchi topilmadi")
-                )
+                else:
+                    self.stdout.write(
+                        self.style.WARNING("Hech qanday faol o\'qituvchi topilmadi")
+                    )
                 return
-            
-            created_count = 0
-            skipped_count = 0
-            
-            for teacher in teachers:
-                # Har bir o'qituvchining o'quvchilarini olish
-                students = Student.objects.filter(
-                    Q(teacher=teacher) | Q(created_by=teacher),
-                    is_active=True
-                )
-                
-                if not students.exists():
+
+            result = generate_attendance(
+                teacher_id=teacher_id,
+                center_id=center_id,
+                force=force,
+                dry_run=dry_run,
+                batch_size=options.get('batch_size'),
+                per_center=options.get('per_center'),
+            )
+
+            verb = "yaratiladi" if dry_run else "yaratildi"
+
+            for teacher in teachers.values():
+                counts = result['teachers'].get(str(teacher.id))
+
+                if not counts:
                     self.stdout.write(
                         self.style.WARNING(f"O\'qituvchi {teacher.full_name} uchun o\'quvchilar topilmadi")
                     )
                     continue
-                
-                teacher_created_count = 0
-                teacher_skipped_count = 0
-                
-                for student in students:
-                    # Bu hafta uchun davomat allaqachon mavjudligini tekshirish
-                    today = timezone.now().date()
-                    
-                    if not force:
-                        existing_attendance = Attendance.objects.filter(
-                            student=student,
-                            teacher=teacher,
-                            created_at__date=today
-                        ).exists()
-                        
-                        if existing_attendance:
-                            teacher_skipped_count += 1
-                            skipped_count += 1
-                            continue
-                    
-                    # Yangi davomat yaratish
-                    Attendance.objects.create(
-                        student=student,
-                        teacher=teacher,
-                        lesson_1=False,
-                        lesson_2=False,
-                        lesson_3=False,
-                        created_by=teacher
-                    )
-                    teacher_created_count += 1
-                    created_count += 1
-                
-                if teacher_created_count > 0:
+
+                if counts['created'] > 0:
                     self.stdout.write(
                         self.style.SUCCESS(
-                            f"O\'qituvchi {teacher.full_name} uchun {teacher_created_count} ta davomat yaratildi"
+                            f"O\'qituvchi {teacher.full_name} uchun {counts['created']} ta davomat {verb}"
                         )
                     )
-                
-                if teacher_skipped_count > 0 and not force:
+
+                if counts['skipped'] > 0:
                     self.stdout.write(
                         self.style.WARNING(
-                            f"O\'qituvchi {teacher.full_name} uchun {teacher_skipped_count} ta davomat allaqachon mavjud (o\'tkazib yuborildi)"
+                            f"O\'qituvchi {teacher.full_name} uchun {counts['skipped']} ta davomat allaqachon mavjud (o\'tkazib yuborildi)"
                         )
                     )
-            
+
             # Natijalarni ko'rsatish
-            self.stdout.write(
-                self.style.SUCCESS(
-                    f"Jami: {created_count} ta yangi davomat yaratildi"
+            if dry_run:
+                self.stdout.write(
+                    self.style.WARNING(
+                        f"Dry run: {result['created']} ta davomat yaratilishi kerak edi (hech narsa yozilmadi)"
+                    )
                 )
-            )
-            
-            if skipped_count > 0 and not force:
+            else:
+                self.stdout.write(
+                    self.style.SUCCESS(
+                        f"Jami: {result['created']} ta yangi davomat yaratildi ({result['timings']['total']}s)"
+                    )
+                )
+
+            if result['skipped'] > 0:
                 self.stdout.write(
                     self.style.WARNING(
-                        f"{skipped_count} ta davomat allaqachon mavjud (o\'tkazib yuborildi)"
+                        f"{result['skipped']} ta davomat allaqachon mavjud (o\'tkazib yuborildi)"
                     )
                 )
-            
-            logger.info(f"Ruchnoy davomat yaratildi: {created_count} ta")
-            
+
+            if result.get('failed_centers'):
+                self.stdout.write(
+                    self.style.ERROR(
+                        f"Quyidagi markazlarda xatolik yuz berdi, qayta ishga tushiring: "
+                        f"{', '.join(str(c) for c in result['failed_centers'])}"
+                    )
+                )
+
+            if not dry_run:
+                logger.info(f"Ruchnoy davomat yaratildi: {result['created']} ta")
+
         except Exception as e:
             error_msg = f"Davomat yaratishda xatolik: {str(e)}"
             self.stdout.write(
                 self.style.ERROR(error_msg)
             )
-            logger.error(error_msg)
\ No newline at end of file
+            logger.error(error_msg)
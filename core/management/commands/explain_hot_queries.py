@@ -0,0 +1,285 @@
+# core/management/commands/explain_hot_queries.py
+import re
+import statistics
+import time
+from datetime import timedelta
+
+from django.core.management.base import BaseCommand
+from django.db import connection, transaction
+from django.db.models import Avg, Count, Q
+from django.utils import timezone
+
+from core.models import (
+    Attendance, Grade, Homework, LearningCenter, News, Payment, Student
+)
+from account.models import User
+
+# Meta.indexes orqali qo'shilgan "hot path" indekslari
+HOT_PATH_MODELS = [Student, Attendance, Grade, Payment, Homework, User]
+
+INDEX_PATTERNS = [
+    re.compile(r'USING (?:COVERING )?INDEX (\w+)'),        # SQLite
+    re.compile(r'Index (?:Only )?Scan(?: Backward)? using (\w+)'),  # PostgreSQL
+    re.compile(r'Bitmap Index Scan on (\w+)'),
+]
+
+
+class Rollback(Exception):
+    pass
+
+
+def hot_queries(center_id, teacher_id, student_id):
+    """Scoped ViewSet'lar va dashboard bajaradigan eng ko'p so'rovlar"""
+    today = timezone.localdate()
+    month_ago = timezone.now() - timedelta(days=30)
+
+    return [
+        ("Davomat: o'qituvchi, -created_at",
+         lambda: Attendance.objects.filter(teacher_id=teacher_id).order_by('-created_at')[:20]),
+        ("Davomat: o'quvchi, -created_at",
+         lambda: Attendance.objects.filter(student_id=student_id).order_by('-created_at')[:20]),
+        ("Davomat: o'qituvchi, bugun",
+         lambda: Attendance.objects.filter(teacher_id=teacher_id, lesson_date=today)),
+        ("Davomat: o'quvchi, 30 kun",
+         lambda: Attendance.objects.filter(student_id=student_id, created_at__gte=month_ago)),
+        ("Davomat: markaz, -created_at",
+         lambda: Attendance.objects.filter(student__center_id=center_id).order_by('-created_at')[:20]),
+        ("Baho: o'quvchi, -date",
+         lambda: Grade.objects.filter(student_id=student_id).order_by('-date')[:20]),
+        ("Baho: o'qituvchi, -date",
+         lambda: Grade.objects.filter(teacher_id=teacher_id).order_by('-date')[:20]),
+        ("Baho: o'qituvchi, o'rtacha",
+         lambda: Grade.objects.filter(teacher_id=teacher_id).values('teacher_id').annotate(avg=Avg('score'))),
+        ("To'lov: o'quvchi, muddati o'tgan",
+         lambda: Payment.objects.filter(student_id=student_id, status='overdue')),
+        ("To'lov: muddati o'tganlar (tungi task)",
+         lambda: Payment.objects.filter(status='pending', deadline__lt=today)),
+        ("To'lov: o'quvchi, -date",
+         lambda: Payment.objects.filter(student_id=student_id).order_by('-date')[:20]),
+        ("Uy vazifasi: markaz, faol",
+         lambda: Homework.objects.filter(center_id=center_id, is_active=True)[:20]),
+        ("Uy vazifasi: markaz, upcoming",
+         lambda: Homework.objects.filter(center_id=center_id, is_active=True, due_date__gte=today)),
+        ("Uy vazifasi: markaz, overdue",
+         lambda: Homework.objects.filter(center_id=center_id, is_active=True, due_date__lt=today)),
+        ("Uy vazifasi: markaz, barchasi",
+         lambda: Homework.objects.filter(center_id=center_id)[:20]),
+        ("O'quvchi: markaz, ro'yxat",
+         lambda: Student.objects.filter(center_id=center_id).order_by('last_name', 'first_name')[:20]),
+        ("O'quvchi: markaz, faollar soni",
+         lambda: Student.objects.filter(center_id=center_id).values('center_id').annotate(
+             total=Count('id'), active=Count('id', filter=Q(is_active=True)))),
+        ("O'quvchi: o'qituvchi, faol",
+         lambda: Student.objects.filter(teacher_id=teacher_id, is_active=True).order_by('last_name', 'first_name')),
+        ("O'quvchi: statistika (reconcile)",
+         lambda: Student.objects.filter(center_id=center_id).with_statistics()[:50]),
+        ("Foydalanuvchi: markaz o'qituvchilari",
+         lambda: User.objects.filter(role='teacher', center_id=center_id, is_active=True)),
+        ("Yangilik: markaz, -created_at",
+         lambda: News.objects.filter(center_id=center_id).order_by('-created_at')[:20]),
+    ]
+
+
+class Command(BaseCommand):
+    help = 'Eng ko\'p ishlatiladigan so\'rovlar uchun EXPLAIN va indeksli/indekssiz vaqtlarni ko\'rsatadi'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--seed-students',
+            type=int,
+            default=0,
+            help='Sinov ma\'lumotlari: shuncha o\'quvchi yaratish (oxirida rollback qilinadi)',
+        )
+        parser.add_argument(
+            '--days',
+            type=int,
+            default=60,
+            help='Har bir o\'quvchi uchun davomat/baho kunlari (standart: 60)',
+        )
+        parser.add_argument(
+            '--repeat',
+            type=int,
+            default=5,
+            help='Har bir so\'rov necha marta bajariladi (mediana olinadi)',
+        )
+        parser.add_argument(
+            '--explain',
+            action='store_true',
+            help='To\'liq EXPLAIN rejalarini ham chiqarish',
+        )
+
+    def handle(self, *args, **options):
+        try:
+            with transaction.atomic():
+                if options['seed_students']:
+                    self.seed(options['seed_students'], options['days'])
+                self.run(options['repeat'], options['explain'])
+                # Benchmark bazada hech narsa qoldirmaydi
+                raise Rollback
+        except Rollback:
+            pass
+
+    # ========== Sinov ma'lumotlari ==========
+
+    def seed(self, student_count, days):
+        started = time.monotonic()
+        center_count = max(1, student_count // 500)
+        teachers_per_center = 5
+        today = timezone.localdate()
+        now = timezone.now()
+
+        centers = LearningCenter.objects.bulk_create([
+            LearningCenter(
+                name=f"Benchmark {i}", address="-", phone_number="+998900000000",
+                email="bench@example.com", director="-",
+            )
+            for i in range(center_count)
+        ])
+        teachers = User.objects.bulk_create([
+            User(
+                phone_number=f"+99899{c:03d}{t:04d}", role='teacher', center=center,
+                first_name="Teacher", last_name=str(t), password='!',
+            )
+            for c, center in enumerate(centers)
+            for t in range(teachers_per_center)
+        ])
+        students = Student.objects.bulk_create([
+            Student(
+                first_name="Student", last_name=str(i), age=12, phone_number="+998900000001",
+                address="-", subject="Matematika", teacher=teachers[i % len(teachers)],
+                center=teachers[i % len(teachers)].center, is_active=i % 10 != 0,
+            )
+            for i in range(student_count)
+        ], batch_size=1000)
+
+        for day in range(days):
+            last_pk = Attendance.objects.order_by('-pk').values_list('pk', flat=True).first() or 0
+            Attendance.objects.bulk_create([
+                Attendance(
+                    student=student, teacher=student.teacher, created_by=student.teacher,
+                    lesson_1=day % 2 == 0, lesson_2=True, lesson_3=day % 3 == 0,
+                    lesson_date=today - timedelta(days=day),
+                )
+                for student in students
+            ], batch_size=1000)
+            # auto_now_add'ni chetlab o'tib kunlarga yoyish
+            Attendance.objects.filter(pk__gt=last_pk).update(created_at=now - timedelta(days=day))
+
+            if day % 7 == 0:
+                Grade.objects.bulk_create([
+                    Grade(
+                        student=student, teacher=student.teacher, subject="Matematika",
+                        score=50 + (student.pk + day) % 50, date=today - timedelta(days=day),
+                    )
+                    for student in students
+                ], batch_size=1000)
+
+        Payment.objects.bulk_create([
+            Payment(
+                student=student, date=today - timedelta(days=30 * month), amount=100,
+                deadline=today - timedelta(days=30 * month - 10),
+                status='paid' if month > 1 else ('overdue' if month else 'pending'),
+            )
+            for student in students
+            for month in range(6)
+        ], batch_size=1000)
+
+        homeworks = Homework.objects.bulk_create([
+            Homework(
+                title=f"Vazifa {i}", description="-", due_date=today + timedelta(days=i % 30 - 15),
+                teacher=teacher, center=teacher.center, is_active=i % 4 != 0,
+            )
+            for teacher in teachers
+            for i in range(days)
+        ], batch_size=1000)
+        Homework.students.through.objects.bulk_create([
+            Homework.students.through(homework_id=homework.pk, student_id=student.pk)
+            for homework in homeworks
+            for student in students
+            if student.teacher_id == homework.teacher_id
+        ], batch_size=1000)
+
+        News.objects.bulk_create([
+            News(title=f"Yangilik {i}", body="-", center=center)
+            for center in centers
+            for i in range(50)
+        ])
+
+        if connection.vendor in ('sqlite', 'postgresql'):
+            with connection.cursor() as cursor:
+                cursor.execute('ANALYZE')
+
+        self.stdout.write(
+            self.style.SUCCESS(
+                f"Sinov ma'lumotlari yaratildi: {len(centers)} markaz, {len(teachers)} o'qituvchi, "
+                f"{len(students)} o'quvchi, {Attendance.objects.count()} davomat "
+                f"({round(time.monotonic() - started, 1)}s)"
+            )
+        )
+
+    # ========== Benchmark ==========
+
+    def run(self, repeat, show_plans):
+        sample = (
+            Student.objects.filter(is_active=True, teacher__isnull=False)
+            .values('center_id', 'teacher_id', 'id')
+            .order_by('pk')
+            .first()
+        )
+        if not sample:
+            self.stdout.write(self.style.WARNING("Bazada o'quvchi yo'q, --seed-students bilan ishga tushiring"))
+            return
+
+        queries = hot_queries(sample['center_id'], sample['teacher_id'], sample['id'])
+
+        # "Oldin": hot path indekslarini savepoint ichida o'chirib o'lchash
+        try:
+            with transaction.atomic():
+                self.drop_hot_path_indexes()
+                before = [self.measure(build, repeat) for _, build in queries]
+                raise Rollback
+        except Rollback:
+            pass
+
+        after = [self.measure(build, repeat) for _, build in queries]
+
+        header = f"{'#':>2}  {'So`rov':<38} {'Indeks':<32} {'Oldin ms':>9} {'Keyin ms':>9} {'x':>6}"
+        self.stdout.write(header)
+        self.stdout.write('-' * len(header))
+
+        for number, ((label, build), before_ms, after_ms) in enumerate(zip(queries, before, after), 1):
+            plan = self.explain(build)
+            indexes = sorted({name for pattern in INDEX_PATTERNS for name in pattern.findall(plan)})
+            speedup = f"{before_ms / after_ms:.1f}" if after_ms else '-'
+            line = (
+                f"{number:>2}  {label:<38} {', '.join(indexes)[:32] or '-':<32} "
+                f"{before_ms:>9.2f} {after_ms:>9.2f} {speedup:>6}"
+            )
+            self.stdout.write(line)
+
+            if show_plans:
+                self.stdout.write(self.style.NOTICE(plan))
+
+        self.stdout.write(
+            self.style.SUCCESS(
+                f"Jami: oldin {sum(before):.2f} ms, keyin {sum(after):.2f} ms "
+                f"({connection.vendor}, mediana, {repeat} marta)"
+            )
+        )
+
+    def drop_hot_path_indexes(self):
+        with connection.cursor() as cursor:
+            for model in HOT_PATH_MODELS:
+                for index in model._meta.indexes:
+                    cursor.execute(f"DROP INDEX {connection.ops.quote_name(index.name)}")
+
+    def measure(self, build, repeat):
+        timings = []
+        for _ in range(repeat):
+            started = time.perf_counter()
+            list(build())
+            timings.append((time.perf_counter() - started) * 1000)
+        return statistics.median(timings)
+
+    def explain(self, build):
+        return build().explain()
@@ -0,0 +1,130 @@
+# core/management/commands/explain_scoping.py
+import statistics
+import time
+
+from django.core.management.base import BaseCommand
+from django.db import connection, transaction
+from django.db.models import Q
+
+from core.management.commands.explain_hot_queries import (
+    INDEX_PATTERNS, Rollback, Command as HotQueriesCommand
+)
+from core.models import Attendance, Grade, Homework, News, Parent, Payment, Student
+from core.scoping import scope_queryset, superadmin_ids
+from account.models import User
+
+SUPERADMIN_CREATED = Q(created_by__role="superadmin")
+
+# Scoping'dan oldingi admin filtrlari (User jadvaliga JOIN + OR)
+LEGACY_ADMIN_FILTERS = [
+    (Student, lambda user: SUPERADMIN_CREATED | Q(created_by=user) | Q(center=user.center)),
+    (Attendance, lambda user: Q(student__center=user.center) | SUPERADMIN_CREATED),
+    (Grade, lambda user: Q(student__center=user.center) | SUPERADMIN_CREATED),
+    (Payment, lambda user: SUPERADMIN_CREATED | Q(created_by=user) | Q(student__center=user.center)),
+    (Homework, lambda user: Q(created_by=user) | Q(center=user.center)),
+    (Parent, lambda user: SUPERADMIN_CREATED | Q(created_by=user)),
+    (News, lambda user: SUPERADMIN_CREATED | Q(created_by=user)),
+    (User, lambda user: Q(role="teacher") & (Q(created_by=user) | SUPERADMIN_CREATED)),
+]
+
+
+class Command(BaseCommand):
+    help = 'Admin roli uchun eski qo\'lda yozilgan filtrlar va core.scoping qoidalarini EXPLAIN va vaqt bo\'yicha solishtiradi'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--seed-students',
+            type=int,
+            default=0,
+            help='Sinov ma\'lumotlari: shuncha o\'quvchi yaratish (oxirida rollback qilinadi)',
+        )
+        parser.add_argument(
+            '--days',
+            type=int,
+            default=30,
+            help='Har bir o\'quvchi uchun davomat/baho kunlari (standart: 30)',
+        )
+        parser.add_argument(
+            '--repeat',
+            type=int,
+            default=5,
+            help='Har bir so\'rov necha marta bajariladi (mediana olinadi)',
+        )
+        parser.add_argument(
+            '--explain',
+            action='store_true',
+            help='To\'liq EXPLAIN rejalarini ham chiqarish',
+        )
+
+    def handle(self, *args, **options):
+        try:
+            with transaction.atomic():
+                if options['seed_students']:
+                    seeder = HotQueriesCommand(stdout=self.stdout, stderr=self.stderr)
+                    seeder.seed(options['seed_students'], options['days'])
+                    self.seed_admins()
+                self.run(options['repeat'], options['explain'])
+                raise Rollback
+        except Rollback:
+            pass
+
+    def seed_admins(self):
+        """Har bir markazga admin; yozuvlarning bir qismi superadmin/admin nomidan"""
+        superadmin = User.objects.create(phone_number="+998980000000", role="superadmin", password='!')
+        center_ids = User.objects.filter(role="teacher").order_by().values_list('center_id', flat=True).distinct()
+        User.objects.bulk_create([
+            User(phone_number=f"+99897{center_id:07d}", role="admin", center_id=center_id,
+                 created_by=superadmin, password='!')
+            for center_id in center_ids
+        ])
+
+        teacher_ids = User.objects.filter(role="teacher").order_by('pk').values_list('pk', flat=True)
+        User.objects.filter(pk__in=teacher_ids[::2]).update(created_by=superadmin)
+        for model in (Student, Payment, Homework, News):
+            model.objects.filter(pk__in=model.objects.order_by('pk').values_list('pk', flat=True)[::10]).update(
+                created_by=superadmin
+            )
+        if connection.vendor in ('sqlite', 'postgresql'):
+            with connection.cursor() as cursor:
+                cursor.execute('ANALYZE')
+
+    def run(self, repeat, show_plans):
+        admin = User.objects.filter(role="admin", center__isnull=False).select_related('center').order_by('pk').first()
+        if not admin:
+            self.stdout.write(self.style.WARNING("Bazada markazli admin yo'q, --seed-students bilan ishga tushiring"))
+            return
+
+        superadmin_ids()  # kesh isitiladi
+        header = f"{'Model':<11} {'Eski indekslar':<34} {'Yangi indekslar':<34} {'Eski ms':>8} {'Yangi ms':>9} {'x':>5}"
+        self.stdout.write(header)
+        self.stdout.write('-' * len(header))
+
+        for model, legacy_filter in LEGACY_ADMIN_FILTERS:
+            legacy = model.objects.filter(legacy_filter(admin))
+            scoped = scope_queryset(model.objects.all(), admin)
+
+            before_ms, before_plan = self.measure(legacy, repeat), legacy.explain()
+            after_ms, after_plan = self.measure(scoped, repeat), scoped.explain()
+            speedup = f"{before_ms / after_ms:.1f}" if after_ms else '-'
+
+            self.stdout.write(
+                f"{model.__name__:<11} {self.indexes(before_plan):<34} {self.indexes(after_plan):<34} "
+                f"{before_ms:>8.2f} {after_ms:>9.2f} {speedup:>5}"
+            )
+            if show_plans:
+                self.stdout.write(self.style.NOTICE(f"Eski:\n{before_plan}\nYangi:\n{after_plan}"))
+
+        self.stdout.write(self.style.SUCCESS(f"({connection.vendor}, COUNT + birinchi sahifa, mediana, {repeat} marta)"))
+
+    def indexes(self, plan):
+        names = sorted({name for pattern in INDEX_PATTERNS for name in pattern.findall(plan)})
+        return ', '.join(names)[:34] or '-'
+
+    def measure(self, queryset, repeat):
+        timings = []
+        for _ in range(repeat):
+            started = time.perf_counter()
+            queryset.count()
+            list(queryset.order_by('-pk')[:20])
+            timings.append((time.perf_counter() - started) * 1000)
+        return statistics.median(timings)
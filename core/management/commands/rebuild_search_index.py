@@ -0,0 +1,33 @@
+# core/management/commands/rebuild_search_index.py
+from django.apps import apps
+from django.core.management.base import BaseCommand, CommandError
+from django.db import transaction
+from core.search import SEARCH_DOCUMENTS, get_search_backend, rebuild_search_index
+import logging
+
+logger = logging.getLogger(__name__)
+
+
+class Command(BaseCommand):
+    help = 'Qidiruv indeksini (FTS5 / tsvector) barcha o\'quvchi, ota-ona va yangiliklar uchun qayta quradi'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--kind',
+            action='append',
+            choices=list(SEARCH_DOCUMENTS),
+            help='Faqat shu tur(lar) uchun (bir necha marta berish mumkin)',
+        )
+
+    def handle(self, *args, **options):
+        backend = get_search_backend()
+        if backend is None:
+            raise CommandError("Qidiruv backend'i o'chirilgan yoki bu baza uchun mavjud emas")
+
+        with transaction.atomic():
+            result = rebuild_search_index(apps.get_model, backend, kinds=options.get('kind'))
+
+        for kind, count in result.items():
+            self.stdout.write(self.style.SUCCESS(f"{kind}: {count} ta hujjat indekslandi"))
+
+        logger.info(f"Qidiruv indeksi qayta qurildi: {result}")
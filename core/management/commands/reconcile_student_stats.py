@@ -0,0 +1,41 @@
+# core/management/commands/reconcile_student_stats.py
+from django.core.management.base import BaseCommand
+from core.stats import STATS_BATCH_SIZE, reconcile_student_stats
+import logging
+
+logger = logging.getLogger(__name__)
+
+
+class Command(BaseCommand):
+    help = 'O\'quvchilar statistikasini (StudentStats) xom qatorlardan qayta hisoblab driftni tuzatadi'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--student-id',
+            type=int,
+            action='append',
+            help='Faqat shu o\'quvchi(lar) uchun (bir necha marta berish mumkin)',
+        )
+        parser.add_argument(
+            '--batch-size',
+            type=int,
+            default=STATS_BATCH_SIZE,
+            help=f'Bitta so\'rovda hisoblanadigan o\'quvchilar soni (standart: {STATS_BATCH_SIZE})',
+        )
+
+    def handle(self, *args, **options):
+        result = reconcile_student_stats(
+            student_ids=options.get('student_id'),
+            batch_size=options.get('batch_size'),
+        )
+
+        self.stdout.write(
+            self.style.SUCCESS(f"Jami: {result['checked']} ta o\'quvchi tekshirildi")
+        )
+
+        if result['drifted'] > 0:
+            self.stdout.write(
+                self.style.WARNING(f"{result['drifted']} ta o\'quvchi statistikasi yangilandi")
+            )
+
+        logger.info(f"O\'quvchi statistikasi qayta hisoblandi: {result['drifted']}/{result['checked']} ta")
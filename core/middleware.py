@@ -0,0 +1,18 @@
+# core/middleware.py
+class RateLimitHeadersMiddleware:
+    """
+    Throttle'lar (core.throttling) saqlagan eng kam qolgan limitni javobga
+    X-RateLimit-Limit / -Remaining / -Reset sarlavhalari sifatida qo'shadi.
+    """
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        response = self.get_response(request)
+        quota = getattr(request, 'throttle_quota', None)
+        if quota is not None:
+            response['X-RateLimit-Limit'] = quota['limit']
+            response['X-RateLimit-Remaining'] = quota['remaining']
+            response['X-RateLimit-Reset'] = quota['reset']
+        return response
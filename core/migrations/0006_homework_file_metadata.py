@@ -0,0 +1,28 @@
+# Generated by Django 5.2.8 on 2026-10-16 22:37
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0005_homework'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='homework',
+            name='file_checksum',
+            field=models.CharField(blank=True, max_length=64, verbose_name='Fayl checksum (SHA-256)'),
+        ),
+        migrations.AddField(
+            model_name='homework',
+            name='file_content_type',
+            field=models.CharField(blank=True, max_length=100, verbose_name='Fayl turi'),
+        ),
+        migrations.AddField(
+            model_name='homework',
+            name='file_size',
+            field=models.PositiveBigIntegerField(blank=True, null=True, verbose_name='Fayl hajmi (bayt)'),
+        ),
+    ]
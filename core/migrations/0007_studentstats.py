@@ -0,0 +1,34 @@
+# Generated by Django 5.2.8 on 2026-10-16 22:41
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0006_homework_file_metadata'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='StudentStats',
+            fields=[
+                ('student', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, primary_key=True, related_name='stats', serialize=False, to='core.student', verbose_name="O'quvchi")),
+                ('grade_sum', models.PositiveIntegerField(default=0, verbose_name="Baholar yig'indisi")),
+                ('grade_count', models.PositiveIntegerField(default=0, verbose_name='Baholar soni')),
+                ('attendance_days_30d', models.PositiveIntegerField(default=0, verbose_name='Davomat kunlari (30 kun)')),
+                ('attended_lessons_30d', models.PositiveIntegerField(default=0, verbose_name='Qatnashgan darslar (30 kun)')),
+                ('active_homework_count', models.PositiveIntegerField(default=0, verbose_name='Faol uy vazifalari')),
+                ('inactive_homework_count', models.PositiveIntegerField(default=0, verbose_name='Yakunlangan uy vazifalari')),
+                ('payment_count', models.PositiveIntegerField(default=0, verbose_name="To'lovlar soni")),
+                ('paid_payment_count', models.PositiveIntegerField(default=0, verbose_name="To'langan to'lovlar")),
+                ('overdue_payment_count', models.PositiveIntegerField(default=0, verbose_name="Muddati o'tgan to'lovlar")),
+                ('updated_at', models.DateTimeField(auto_now=True, verbose_name='Yangilangan sana')),
+            ],
+            options={
+                'verbose_name': "O'quvchi statistikasi",
+                'verbose_name_plural': "O'quvchilar statistikasi",
+            },
+        ),
+    ]
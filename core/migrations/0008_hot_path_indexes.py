@@ -0,0 +1,51 @@
+# Generated by Django 5.2.8 on 2026-10-16 22:42
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0007_studentstats'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='attendance',
+            index=models.Index(fields=['teacher', '-created_at'], name='attendance_teacher_created_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='attendance',
+            index=models.Index(fields=['student', '-created_at'], name='attendance_student_created_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='grade',
+            index=models.Index(fields=['student', '-date'], name='grade_student_date_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='grade',
+            index=models.Index(fields=['teacher', '-date'], name='grade_teacher_date_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='homework',
+            index=models.Index(fields=['center', 'is_active', '-due_date'], name='homework_center_active_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='homework',
+            index=models.Index(condition=models.Q(('is_active', True)), fields=['center', '-due_date', '-created_at'], name='homework_center_due_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='payment',
+            index=models.Index(fields=['student', 'deadline', 'status'], name='payment_student_deadline_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='student',
+            index=models.Index(fields=['center', 'is_active'], name='student_center_active_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='student',
+            index=models.Index(condition=models.Q(('is_active', True)), fields=['teacher', 'last_name', 'first_name'], name='student_teacher_active_idx'),
+        ),
+    ]
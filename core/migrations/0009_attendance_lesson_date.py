@@ -0,0 +1,63 @@
+# Generated by Django 5.2.8 on 2026-10-16 22:44
+
+from django.db import migrations, models
+from django.utils import timezone
+
+BATCH_SIZE = 1000
+
+
+def backfill_lesson_date(apps, schema_editor):
+    """
+    lesson_date'ni created_at'ning mahalliy sanasi bilan to'ldirish va
+    bir kundagi takroriy davomatlarni birlashtirish.
+
+    Takrorlardan eng kichik id'li qator qoladi, dars belgilari esa
+    OR bilan unga qo'shiladi.
+    """
+    Attendance = apps.get_model('core', 'Attendance')
+
+    batch = []
+    for attendance in Attendance.objects.filter(lesson_date__isnull=True).only('id', 'created_at').iterator(chunk_size=BATCH_SIZE):
+        attendance.lesson_date = timezone.localtime(attendance.created_at).date()
+        batch.append(attendance)
+        if len(batch) >= BATCH_SIZE:
+            Attendance.objects.bulk_update(batch, ['lesson_date'])
+            batch = []
+    if batch:
+        Attendance.objects.bulk_update(batch, ['lesson_date'])
+
+    duplicate_keys = (
+        Attendance.objects.values('student_id', 'teacher_id', 'lesson_date')
+        .annotate(rows=models.Count('id'))
+        .filter(rows__gt=1)
+        .values_list('student_id', 'teacher_id', 'lesson_date')
+    )
+
+    for student_id, teacher_id, lesson_date in list(duplicate_keys):
+        keeper, *duplicates = Attendance.objects.filter(
+            student_id=student_id, teacher_id=teacher_id, lesson_date=lesson_date
+        ).order_by('id')
+
+        for duplicate in duplicates:
+            keeper.lesson_1 = keeper.lesson_1 or duplicate.lesson_1
+            keeper.lesson_2 = keeper.lesson_2 or duplicate.lesson_2
+            keeper.lesson_3 = keeper.lesson_3 or duplicate.lesson_3
+
+        keeper.save(update_fields=['lesson_1', 'lesson_2', 'lesson_3'])
+        Attendance.objects.filter(id__in=[duplicate.id for duplicate in duplicates]).delete()
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0008_hot_path_indexes'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='attendance',
+            name='lesson_date',
+            field=models.DateField(null=True, verbose_name='Dars sanasi'),
+        ),
+        migrations.RunPython(backfill_lesson_date, migrations.RunPython.noop),
+    ]
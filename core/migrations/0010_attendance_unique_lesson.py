@@ -0,0 +1,29 @@
+# Generated by Django 5.2.8 on 2026-10-16 22:44
+
+import django.utils.timezone
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0009_attendance_lesson_date'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='attendance',
+            name='lesson_date',
+            field=models.DateField(default=django.utils.timezone.localdate, verbose_name='Dars sanasi'),
+        ),
+        migrations.AddIndex(
+            model_name='attendance',
+            index=models.Index(fields=['teacher', '-lesson_date'], name='attendance_teacher_lesson_idx'),
+        ),
+        migrations.AddConstraint(
+            model_name='attendance',
+            constraint=models.UniqueConstraint(fields=('student', 'teacher', 'lesson_date'), name='attendance_unique_lesson'),
+        ),
+    ]
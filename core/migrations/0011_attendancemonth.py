@@ -0,0 +1,35 @@
+# Generated by Django 5.2.8 on 2026-10-16 22:47
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0010_attendance_unique_lesson'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='AttendanceMonth',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('month', models.DateField(verbose_name='Oy (1-kun)')),
+                ('days_mask', models.PositiveIntegerField(default=0, verbose_name='Kunlar')),
+                ('lesson_1_mask', models.PositiveIntegerField(default=0, verbose_name='Dars 1')),
+                ('lesson_2_mask', models.PositiveIntegerField(default=0, verbose_name='Dars 2')),
+                ('lesson_3_mask', models.PositiveIntegerField(default=0, verbose_name='Dars 3')),
+                ('student', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='attendance_months', to='core.student', verbose_name="O'quvchi")),
+                ('teacher', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='attendance_months', to=settings.AUTH_USER_MODEL, verbose_name="O'qituvchi")),
+            ],
+            options={
+                'verbose_name': 'Davomat arxivi (oy)',
+                'verbose_name_plural': 'Davomat arxivi',
+                'indexes': [models.Index(fields=['student', '-month'], name='attendance_month_student_idx')],
+                'constraints': [models.UniqueConstraint(fields=('student', 'teacher', 'month'), name='attendance_month_unique')],
+            },
+        ),
+    ]
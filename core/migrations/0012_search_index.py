@@ -0,0 +1,92 @@
+# Generated by Django 5.2.8 on 2026-10-17 09:10
+
+import re
+
+from django.db import migrations
+
+# Migratsiya core.search'ga bog'liq emas: jadvallar va hujjat formati
+# shu yerda, shu holatida qotirilgan
+SEARCH_DOCUMENTS = {
+    'student': ('Student', ['first_name', 'last_name', 'address', 'subject'], ['phone_number']),
+    'parent': ('Parent', ['first_name', 'last_name', 'email', 'workplace'], ['phone_number']),
+    'news': ('News', ['title', 'body'], []),
+}
+
+SQLITE_TABLE = 'core_search_fts_{kind}'
+POSTGRES_TABLE = 'core_search_entry'
+
+
+def build_document(instance, text_fields, phone_fields):
+    parts = [getattr(instance, field) or '' for field in text_fields]
+    for field in phone_fields:
+        digits = re.sub(r'\D', '', getattr(instance, field) or '')
+        if digits:
+            parts += [digits, digits[-7:]]
+    return ' '.join(parts)
+
+
+def documents(apps, kind):
+    model_name, text_fields, phone_fields = SEARCH_DOCUMENTS[kind]
+    model = apps.get_model('core', model_name)
+    return [
+        (instance.pk, build_document(instance, text_fields, phone_fields))
+        for instance in model.objects.only('pk', *text_fields, *phone_fields).iterator()
+    ]
+
+
+def create_search_index(apps, schema_editor):
+    vendor = schema_editor.connection.vendor
+    with schema_editor.connection.cursor() as cursor:
+        if vendor == 'sqlite':
+            for kind in SEARCH_DOCUMENTS:
+                table = SQLITE_TABLE.format(kind=kind)
+                cursor.execute(
+                    f"CREATE VIRTUAL TABLE IF NOT EXISTS {table} USING fts5("
+                    "body, tokenize='unicode61 remove_diacritics 2', prefix='2 3')"
+                )
+                cursor.execute(f"DELETE FROM {table}")
+                cursor.executemany(
+                    f"INSERT INTO {table} (rowid, body) VALUES (%s, %s)", documents(apps, kind)
+                )
+        elif vendor == 'postgresql':
+            cursor.execute("CREATE EXTENSION IF NOT EXISTS pg_trgm")
+            cursor.execute(
+                f"CREATE TABLE IF NOT EXISTS {POSTGRES_TABLE} ("
+                "kind varchar(20) NOT NULL, object_id bigint NOT NULL, body text NOT NULL, "
+                "vector tsvector GENERATED ALWAYS AS (to_tsvector('simple', body)) STORED, "
+                "PRIMARY KEY (kind, object_id))"
+            )
+            cursor.execute(
+                f"CREATE INDEX IF NOT EXISTS {POSTGRES_TABLE}_vector_idx ON {POSTGRES_TABLE} USING gin (vector)"
+            )
+            cursor.execute(
+                f"CREATE INDEX IF NOT EXISTS {POSTGRES_TABLE}_trgm_idx ON {POSTGRES_TABLE} "
+                "USING gin (body gin_trgm_ops)"
+            )
+            cursor.execute(f"DELETE FROM {POSTGRES_TABLE}")
+            for kind in SEARCH_DOCUMENTS:
+                cursor.executemany(
+                    f"INSERT INTO {POSTGRES_TABLE} (kind, object_id, body) VALUES (%s, %s, %s)",
+                    [(kind, object_id, document) for object_id, document in documents(apps, kind)],
+                )
+
+
+def drop_search_index(apps, schema_editor):
+    vendor = schema_editor.connection.vendor
+    with schema_editor.connection.cursor() as cursor:
+        if vendor == 'sqlite':
+            for kind in SEARCH_DOCUMENTS:
+                cursor.execute(f"DROP TABLE IF EXISTS {SQLITE_TABLE.format(kind=kind)}")
+        elif vendor == 'postgresql':
+            cursor.execute(f"DROP TABLE IF EXISTS {POSTGRES_TABLE}")
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0011_attendancemonth'),
+    ]
+
+    operations = [
+        migrations.RunPython(create_search_index, drop_search_index),
+    ]
@@ -0,0 +1,24 @@
+# Generated by Django 5.2.8 on 2026-10-16 23:13
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0012_search_index'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='payment',
+            name='period',
+            field=models.DateField(blank=True, null=True, verbose_name='Hisob davri'),
+        ),
+        migrations.AddConstraint(
+            model_name='payment',
+            constraint=models.UniqueConstraint(condition=models.Q(('period__isnull', False)), fields=('student', 'period'), name='payment_unique_period'),
+        ),
+    ]
@@ -0,0 +1,55 @@
+# Generated by Django 5.2.8 on 2026-10-16 23:16
+
+from django.conf import settings
+from django.db import migrations, models
+from django.utils import timezone
+
+PAID_VALUES = {'paid', "to'langan", 'tolangan', "to'landi", 'tolandi'}
+
+
+def normalize_status(value):
+    value = (value or '').strip().lower()
+    if value in PAID_VALUES:
+        return 'paid'
+    if 'overdue' in value:
+        return 'overdue'
+    return 'pending'
+
+
+def normalize_payment_status(apps, schema_editor):
+    """
+    Erkin matndagi status'ni pending/paid/overdue'ga keltirish.
+
+    Farqli qiymatlar kam, shuning uchun har biriga bitta UPDATE. Muddati
+    o'tgan pending to'lovlar darhol overdue qilinadi (keyin buni tungi task
+    bajaradi). StudentStats hisoblagichlarini tungi reconcile tuzatadi.
+    """
+    Payment = apps.get_model('core', 'Payment')
+
+    for value in list(Payment.objects.values_list('status', flat=True).distinct()):
+        normalized = normalize_status(value)
+        if normalized != value:
+            Payment.objects.filter(status=value).update(status=normalized)
+
+    Payment.objects.filter(status='pending', deadline__lt=timezone.localdate()).update(status='overdue')
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0013_payment_period'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.RunPython(normalize_payment_status, migrations.RunPython.noop),
+        migrations.AlterField(
+            model_name='payment',
+            name='status',
+            field=models.CharField(choices=[('pending', 'Kutilmoqda'), ('paid', "To'langan"), ('overdue', "Muddati o'tgan")], default='pending', max_length=20, verbose_name="To'lov holati"),
+        ),
+        migrations.AddIndex(
+            model_name='payment',
+            index=models.Index(fields=['status', 'deadline'], name='payment_status_deadline_idx'),
+        ),
+    ]
@@ -0,0 +1,93 @@
+# Generated by Django 5.2.8 on 2026-10-17 10:12
+
+from datetime import timedelta
+
+from django.db import migrations
+from django.db.models import Count, IntegerField, OuterRef, Subquery, Sum, Value
+from django.db.models.functions import Cast, Coalesce
+from django.utils import timezone
+
+BATCH_SIZE = 1000
+
+STATS_FIELDS = (
+    'grade_sum', 'grade_count',
+    'attendance_days_30d', 'attended_lessons_30d',
+    'active_homework_count', 'inactive_homework_count',
+    'payment_count', 'paid_payment_count', 'overdue_payment_count',
+)
+
+
+def backfill_student_stats(apps, schema_editor):
+    """
+    StudentStats qatori yo'q o'quvchilar uchun statistikani xom qatorlardan
+    hisoblab yozish (Student.objects.with_statistics() bilan bir xil hisob,
+    tarixiy modellar uchun shu yerda takrorlangan).
+
+    Aks holda serializer'lar tungi reconcile'gacha nol ko'rsatadi.
+    """
+    Student = apps.get_model('core', 'Student')
+    StudentStats = apps.get_model('core', 'StudentStats')
+    Grade = apps.get_model('core', 'Grade')
+    Attendance = apps.get_model('core', 'Attendance')
+    Homework = apps.get_model('core', 'Homework')
+    Payment = apps.get_model('core', 'Payment')
+
+    grades = Grade.objects.filter(student=OuterRef('pk')).order_by().values('student')
+    attendances = Attendance.objects.filter(
+        student=OuterRef('pk'),
+        created_at__gte=timezone.now() - timedelta(days=30),
+    ).order_by().values('student')
+    homeworks = Homework.objects.filter(students=OuterRef('pk')).order_by().values('students')
+    payments = Payment.objects.filter(student=OuterRef('pk')).order_by().values('student')
+
+    attended = (
+        Cast('lesson_1', IntegerField())
+        + Cast('lesson_2', IntegerField())
+        + Cast('lesson_3', IntegerField())
+    )
+
+    def count(queryset, **filters):
+        return Coalesce(
+            Subquery(queryset.filter(**filters).annotate(value=Count('id')).values('value')),
+            Value(0),
+        )
+
+    queryset = Student.objects.filter(stats__isnull=True).order_by('pk').annotate(
+        grade_sum=Coalesce(Subquery(grades.annotate(value=Sum('score')).values('value')), Value(0)),
+        grade_count=count(grades),
+        attendance_days_30d=count(attendances),
+        attended_lessons_30d=Coalesce(
+            Subquery(attendances.annotate(value=Sum(attended)).values('value')),
+            Value(0),
+        ),
+        active_homework_count=count(homeworks, is_active=True),
+        inactive_homework_count=count(homeworks, is_active=False),
+        payment_count=count(payments),
+        paid_payment_count=count(payments, status='paid'),
+        overdue_payment_count=count(payments, status='overdue'),
+    )
+
+    last_pk = 0
+    while True:
+        rows = list(queryset.filter(pk__gt=last_pk).values('pk', *STATS_FIELDS)[:BATCH_SIZE])
+        if not rows:
+            break
+        last_pk = rows[-1]['pk']
+        StudentStats.objects.bulk_create(
+            [
+                StudentStats(student_id=row['pk'], **{field: row[field] for field in STATS_FIELDS})
+                for row in rows
+            ],
+            ignore_conflicts=True,
+        )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0014_payment_status_choices'),
+    ]
+
+    operations = [
+        migrations.RunPython(backfill_student_stats, migrations.RunPython.noop),
+    ]
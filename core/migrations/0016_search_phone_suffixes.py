@@ -0,0 +1,58 @@
+# Generated by Django 5.2.8 on 2026-10-18 09:30
+
+import re
+
+from django.db import migrations
+
+# Telefon raqamlari endi barcha raqamli suffikslari bilan indekslanadi
+# (?search=90111 raqamning o'rtasidagi qismni ham topadi). Hujjat formati
+# core.search.build_document'dan shu yerga qotirib ko'chirilgan.
+SEARCH_DOCUMENTS = {
+    'student': ('Student', ['first_name', 'last_name', 'address', 'subject'], ['phone_number']),
+    'parent': ('Parent', ['first_name', 'last_name', 'email', 'workplace'], ['phone_number']),
+}
+
+SQLITE_TABLE = 'core_search_fts_{kind}'
+POSTGRES_TABLE = 'core_search_entry'
+
+
+def build_document(instance, text_fields, phone_fields):
+    parts = [getattr(instance, field) or '' for field in text_fields]
+    for field in phone_fields:
+        digits = re.sub(r'\D', '', getattr(instance, field) or '')
+        parts += [digits[start:] for start in range(max(len(digits) - 1, 0))]
+    return ' '.join(parts)
+
+
+def reindex_phone_documents(apps, schema_editor):
+    vendor = schema_editor.connection.vendor
+    if vendor not in ('sqlite', 'postgresql'):
+        return
+    with schema_editor.connection.cursor() as cursor:
+        for kind, (model_name, text_fields, phone_fields) in SEARCH_DOCUMENTS.items():
+            model = apps.get_model('core', model_name)
+            rows = [
+                (instance.pk, build_document(instance, text_fields, phone_fields))
+                for instance in model.objects.only('pk', *text_fields, *phone_fields).iterator()
+            ]
+            if vendor == 'sqlite':
+                table = SQLITE_TABLE.format(kind=kind)
+                cursor.execute(f"DELETE FROM {table}")
+                cursor.executemany(f"INSERT INTO {table} (rowid, body) VALUES (%s, %s)", rows)
+            else:
+                cursor.execute(f"DELETE FROM {POSTGRES_TABLE} WHERE kind = %s", [kind])
+                cursor.executemany(
+                    f"INSERT INTO {POSTGRES_TABLE} (kind, object_id, body) VALUES (%s, %s, %s)",
+                    [(kind, object_id, document) for object_id, document in rows],
+                )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0015_backfill_student_stats'),
+    ]
+
+    operations = [
+        migrations.RunPython(reindex_phone_documents, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,83 @@
+# core/mixins.py
+from .pagination import KeysetPagination
+from .scoping import scope_queryset
+
+
+class QuerysetOptimizationMixin:
+    """
+    View serializer'i o'qiydigan bog'lanishlarni e'lon qilish uchun mixin.
+
+    select_related_fields / prefetch_related_fields serializer'dagi
+    *_info maydonlariga mos bo'lishi kerak. Graf filter_queryset ichida
+    qo'llanadi, shuning uchun list, custom action'lar va get_object bir xil
+    optimallashtirilgan queryset'dan foydalanadi va sahifadagi so'rovlar
+    soni qatorlar soniga bog'liq bo'lmaydi.
+    """
+    select_related_fields = ()
+    prefetch_related_fields = ()
+
+    def optimize_queryset(self, queryset):
+        if self.select_related_fields:
+            queryset = queryset.select_related(*self.select_related_fields)
+        if self.prefetch_related_fields:
+            queryset = queryset.prefetch_related(*self.prefetch_related_fields)
+        return queryset
+
+    def filter_queryset(self, queryset):
+        return self.optimize_queryset(super().filter_queryset(queryset))
+
+
+class SingleObjectMixin:
+    """
+    get_object() so'rov davomida bir marta bajariladi.
+
+    DRF'ning update/destroy'i get_object()'ni qayta chaqiradi; obyekt va
+    uning ruxsat tekshiruvi (core.permissions) birinchi chaqiruvdan olinadi.
+    """
+
+    def get_object(self):
+        if getattr(self, '_object', None) is None:
+            self._object = super().get_object()
+        return self._object
+
+
+class KeysetPaginationMixin:
+    """
+    ?pagination=cursor bilan so'rov bo'yicha keyset pagination'ni tanlash.
+
+    Standart holatda global PageNumberPagination ishlaydi. cursor_ordering
+    oxirgi maydoni unikal bo'lishi kerak (odatda id).
+    """
+    cursor_ordering = ('-created_at', '-id')
+    pagination_query_param = 'pagination'
+
+    @property
+    def paginator(self):
+        request = getattr(self, 'request', None)
+        if request is None or request.query_params.get(self.pagination_query_param) != 'cursor':
+            return super().paginator
+
+        if not isinstance(getattr(self, '_paginator', None), KeysetPagination):
+            self._paginator = KeysetPagination(self.cursor_ordering)
+        return self._paginator
+
+
+class RoleScopedQuerysetMixin:
+    """
+    get_queryset'ni core.scoping qoidalari bilan cheklash.
+
+    View queryset atributida select_related va h.k. e'lon qiladi, qaysi
+    obyektlar ko'rinishi esa SCOPES'dagi model qoidasidan olinadi.
+    """
+    scope_context = 'api'
+
+    def get_queryset(self):
+        return scope_queryset(super().get_queryset(), self.request.user, self.scope_context)
+
+
+class RoleScopedAdminMixin:
+    """ModelAdmin.get_queryset uchun RoleScopedQuerysetMixin'ning admin varianti"""
+    scope_context = 'admin'
+
+    def get_queryset(self, request):
+        return scope_queryset(super().get_queryset(request), request.user, self.scope_context)
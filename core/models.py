@@ -1,6 +1,13 @@
 # core/models.py
+import hashlib
+import mimetypes
+from datetime import timedelta
+
 from django.db import models
+from django.db.models import Count, IntegerField, OuterRef, Subquery, Sum, Value
+from django.db.models.functions import Cast, Coalesce
 from django.conf import settings
+from django.utils import timezone
 from django.core.validators import RegexValidator, MinValueValidator, MaxValueValidator, EmailValidator
 
 phone_validator = RegexValidator(r'^\+?\d{7,15}$', 'Telefon raqam noto\'g\'ri formatda')
@@ -42,6 +49,58 @@ class Parent(models.Model):
         return f"{self.first_name} {self.last_name}"
 
 
+class StudentQuerySet(models.QuerySet):
+    def with_statistics(self):
+        """
+        Baholar, oxirgi 30 kunlik davomat, uy vazifalari va to'lovlar
+        yig'indilarini xom qatorlardan SQL'da hisoblash.
+
+        StudentStats jadvali shu annotatsiyalar bilan qayta hisoblanadi
+        (core.stats.reconcile_student_stats).
+        """
+        thirty_days_ago = timezone.now() - timedelta(days=30)
+
+        grades = Grade.objects.filter(student=OuterRef('pk')).order_by().values('student')
+        attendances = Attendance.objects.filter(
+            student=OuterRef('pk'),
+            created_at__gte=thirty_days_ago,
+        ).order_by().values('student')
+        homeworks = Homework.objects.filter(students=OuterRef('pk')).order_by().values('students')
+        payments = Payment.objects.filter(student=OuterRef('pk')).order_by().values('student')
+
+        attended = (
+            Cast('lesson_1', IntegerField())
+            + Cast('lesson_2', IntegerField())
+            + Cast('lesson_3', IntegerField())
+        )
+
+        def count(queryset, **filters):
+            return Coalesce(
+                Subquery(
+                    queryset.filter(**filters).annotate(value=Count('id')).values('value')
+                ),
+                Value(0),
+            )
+
+        return self.annotate(
+            grade_sum=Coalesce(
+                Subquery(grades.annotate(value=Sum('score')).values('value')),
+                Value(0),
+            ),
+            grade_count=count(grades),
+            attendance_days_30d=count(attendances),
+            attended_lessons_30d=Coalesce(
+                Subquery(attendances.annotate(value=Sum(attended)).values('value')),
+                Value(0),
+            ),
+            active_homework_count=count(homeworks, is_active=True),
+            inactive_homework_count=count(homeworks, is_active=False),
+            payment_count=count(payments),
+            paid_payment_count=count(payments, status='paid'),
+            overdue_payment_count=count(payments, status='overdue'),
+        )
+
+
 class Student(models.Model):
     first_name = models.CharField(max_length=100, verbose_name="Ism")
     last_name = models.CharField(max_length=100, verbose_name="Familiya")
@@ -55,9 +114,21 @@ class Student(models.Model):
     created_by = models.ForeignKey(settings.AUTH_USER_MODEL, on_delete=models.SET_NULL, null=True, blank=True, related_name='created_students', verbose_name="Yaratgan admin")
     is_active = models.BooleanField(default=True, verbose_name="Faol")
 
+    objects = StudentQuerySet.as_manager()
+
     class Meta:
         verbose_name = "O'quvchi"
         verbose_name_plural = "O'quvchilar"
+        indexes = [
+            # Markaz bo'yicha ro'yxat va dashboard (is_active filtri bilan)
+            models.Index(fields=['center', 'is_active'], name='student_center_active_idx'),
+            # O'qituvchining faol o'quvchilari, StudentViewSet tartibida
+            models.Index(
+                fields=['teacher', 'last_name', 'first_name'],
+                condition=models.Q(is_active=True),
+                name='student_teacher_active_idx',
+            ),
+        ]
 
     def __str__(self):
         return f"{self.first_name} {self.last_name}"
@@ -69,15 +140,77 @@ class Attendance(models.Model):
     lesson_1 = models.BooleanField(default=False, verbose_name="Dars 1")
     lesson_2 = models.BooleanField(default=False, verbose_name="Dars 2")
     lesson_3 = models.BooleanField(default=False, verbose_name="Dars 3")
+    # Mahalliy (Asia/Tashkent) dars kuni: "bugungi" so'rovlar created_at'ni konvertatsiya qilmaydi
+    lesson_date = models.DateField(default=timezone.localdate, verbose_name="Dars sanasi")
     created_at = models.DateTimeField(auto_now_add=True, verbose_name="Yaratilgan sana")
     created_by = models.ForeignKey(settings.AUTH_USER_MODEL, on_delete=models.SET_NULL, null=True, blank=True, related_name='created_attendances', verbose_name="Yaratgan admin")
 
     class Meta:
         verbose_name = "Davomat"
         verbose_name_plural = "Davomatlar"
+        constraints = [
+            # Bir o'quvchi uchun bir o'qituvchi kuniga bitta davomat yozadi
+            models.UniqueConstraint(
+                fields=['student', 'teacher', 'lesson_date'],
+                name='attendance_unique_lesson',
+            ),
+        ]
+        indexes = [
+            models.Index(fields=['teacher', '-created_at'], name='attendance_teacher_created_idx'),
+            models.Index(fields=['student', '-created_at'], name='attendance_student_created_idx'),
+            models.Index(fields=['teacher', '-lesson_date'], name='attendance_teacher_lesson_idx'),
+        ]
 
     def __str__(self):
-        return f"{self.student} - {self.created_at.date()}"
+        return f"{self.student} - {self.lesson_date}"
+
+
+class AttendanceMonth(models.Model):
+    """
+    Arxivlangan davomat: bir o'quvchi-o'qituvchi uchun oyiga bitta qator.
+
+    Har bir maska bitlari oy kunlariga mos keladi (1-kun = 0-bit):
+    days_mask - shu kuni davomat yozilgan, lesson_N_mask - N-darsda qatnashgan.
+    Konvertatsiya va adapter core.attendance_archive modulida.
+    """
+    student = models.ForeignKey(Student, on_delete=models.CASCADE, related_name='attendance_months', verbose_name="O'quvchi")
+    teacher = models.ForeignKey(settings.AUTH_USER_MODEL, on_delete=models.CASCADE, related_name='attendance_months', verbose_name="O'qituvchi")
+    month = models.DateField(verbose_name="Oy (1-kun)")
+    days_mask = models.PositiveIntegerField(default=0, verbose_name="Kunlar")
+    lesson_1_mask = models.PositiveIntegerField(default=0, verbose_name="Dars 1")
+    lesson_2_mask = models.PositiveIntegerField(default=0, verbose_name="Dars 2")
+    lesson_3_mask = models.PositiveIntegerField(default=0, verbose_name="Dars 3")
+
+    class Meta:
+        verbose_name = "Davomat arxivi (oy)"
+        verbose_name_plural = "Davomat arxivi"
+        constraints = [
+            models.UniqueConstraint(
+                fields=['student', 'teacher', 'month'],
+                name='attendance_month_unique',
+            ),
+        ]
+        indexes = [
+            models.Index(fields=['student', '-month'], name='attendance_month_student_idx'),
+        ]
+
+    def __str__(self):
+        return f"{self.student} - {self.month:%Y-%m}"
+
+    @staticmethod
+    def day_bit(day):
+        return 1 << (day.day - 1)
+
+    def mark(self, day, lesson_1=False, lesson_2=False, lesson_3=False):
+        """Bir kunlik davomatni maskalarga qo'shish (mavjud belgilar bilan OR)"""
+        bit = self.day_bit(day)
+        self.days_mask |= bit
+        if lesson_1:
+            self.lesson_1_mask |= bit
+        if lesson_2:
+            self.lesson_2_mask |= bit
+        if lesson_3:
+            self.lesson_3_mask |= bit
 
 
 class Grade(models.Model):
@@ -92,22 +225,49 @@ class Grade(models.Model):
     class Meta:
         verbose_name = "Baholash"
         verbose_name_plural = "Baholar"
+        indexes = [
+            models.Index(fields=['student', '-date'], name='grade_student_date_idx'),
+            models.Index(fields=['teacher', '-date'], name='grade_teacher_date_idx'),
+        ]
 
     def __str__(self):
         return f"{self.student} - {self.score}"
 
 
 class Payment(models.Model):
+    STATUS_CHOICES = (
+        ("pending", "Kutilmoqda"),
+        ("paid", "To'langan"),
+        # pending to'lovlar muddati o'tgach har kecha shu holatga o'tkaziladi
+        # (core.billing.mark_overdue_payments)
+        ("overdue", "Muddati o'tgan"),
+    )
+
     student = models.ForeignKey(Student, on_delete=models.CASCADE, verbose_name="O'quvchi")
     date = models.DateField(verbose_name="Sana")
     amount = models.DecimalField(max_digits=10, decimal_places=2, verbose_name="Miqdor")
     deadline = models.DateField(verbose_name="To'lov sanasi")
-    status = models.CharField(max_length=50, verbose_name="To'lov holati")
+    status = models.CharField(max_length=20, choices=STATUS_CHOICES, default="pending", verbose_name="To'lov holati")
+    # Oylik hisob (core.billing) yaratgan to'lovlar uchun oyning 1-kuni
+    period = models.DateField(null=True, blank=True, verbose_name="Hisob davri")
     created_by = models.ForeignKey(settings.AUTH_USER_MODEL, on_delete=models.SET_NULL, null=True, blank=True, verbose_name="Yaratgan admin")
 
     class Meta:
         verbose_name = "To'lov"
         verbose_name_plural = "To'lovlar"
+        constraints = [
+            # Bir o'quvchiga bir oy uchun bitta hisob
+            models.UniqueConstraint(
+                fields=['student', 'period'],
+                condition=models.Q(period__isnull=False),
+                name='payment_unique_period',
+            ),
+        ]
+        indexes = [
+            models.Index(fields=['student', 'deadline', 'status'], name='payment_student_deadline_idx'),
+            # Muddati o'tganlar ro'yxati va tungi pending -> overdue o'tkazish
+            models.Index(fields=['status', 'deadline'], name='payment_status_deadline_idx'),
+        ]
 
     def __str__(self):
         return f"{self.student} - {self.amount}"
@@ -133,6 +293,10 @@ class Homework(models.Model):
     description = models.TextField(verbose_name="Tavsif")
     due_date = models.DateField(verbose_name="Muddati")
     homework_file = models.FileField(upload_to='homeworks/', null=True, blank=True, verbose_name="Fayl")
+    # Fayl yuklanganda bir marta hisoblanadi, list endpoint'lar storage'ga murojaat qilmaydi
+    file_size = models.PositiveBigIntegerField(null=True, blank=True, verbose_name="Fayl hajmi (bayt)")
+    file_content_type = models.CharField(max_length=100, blank=True, verbose_name="Fayl turi")
+    file_checksum = models.CharField(max_length=64, blank=True, verbose_name="Fayl checksum (SHA-256)")
     
     # Yangi field'lar
     teacher = models.ForeignKey(
@@ -174,10 +338,101 @@ class Homework(models.Model):
         verbose_name = "Uy vazifasi"
         verbose_name_plural = "Uy vazifalari"
         ordering = ['-due_date', '-created_at']
+        indexes = [
+            models.Index(fields=['center', 'is_active', '-due_date'], name='homework_center_active_idx'),
+            # Faol vazifalar (upcoming/overdue) Meta.ordering tartibida
+            models.Index(
+                fields=['center', '-due_date', '-created_at'],
+                condition=models.Q(is_active=True),
+                name='homework_center_due_idx',
+            ),
+        ]
         
     def __str__(self):
         return self.title
     
+    def save(self, *args, **kwargs):
+        # Yangi yuklangan fayl hali storage'ga yozilmagan (_committed=False)
+        if not self.homework_file or not self.homework_file._committed:
+            self.update_file_metadata()
+        super().save(*args, **kwargs)
+    
+    def update_file_metadata(self):
+        """Fayl hajmi, turi va SHA-256 checksum'ini hisoblab maydonlarga yozish"""
+        if not self.homework_file:
+            self.file_size = None
+            self.file_content_type = ''
+            self.file_checksum = ''
+            return
+        
+        homework_file = self.homework_file
+        content_type = getattr(homework_file.file, 'content_type', None) if not homework_file._committed else None
+        
+        digest = hashlib.sha256()
+        homework_file.open('rb')
+        try:
+            for chunk in homework_file.chunks():
+                digest.update(chunk)
+        finally:
+            if homework_file._committed:
+                homework_file.close()
+        
+        self.file_size = homework_file.size
+        self.file_content_type = (
+            content_type
+            or mimetypes.guess_type(homework_file.name)[0]
+            or 'application/octet-stream'
+        )[:100]
+        self.file_checksum = digest.hexdigest()
+    
     def get_student_count(self):
         return self.students.count()
-    get_student_count.short_description = "O'quvchilar soni"
\ No newline at end of file
+    get_student_count.short_description = "O'quvchilar soni"
+
+
+class StudentStats(models.Model):
+    """
+    O'quvchi statistikasi (rollup).
+
+    Signallar orqali inkremental yangilanadi (core.signals, core.stats),
+    drift esa davriy reconcile_student_stats task'i bilan tuzatiladi.
+    Davomat hisoblagichlari oxirgi 30 kunni qamraydi; eskirgan kunlar
+    tungi reconciliation'da oynadan chiqariladi.
+    """
+    student = models.OneToOneField(
+        Student,
+        on_delete=models.CASCADE,
+        primary_key=True,
+        related_name='stats',
+        verbose_name="O'quvchi"
+    )
+    grade_sum = models.PositiveIntegerField(default=0, verbose_name="Baholar yig'indisi")
+    grade_count = models.PositiveIntegerField(default=0, verbose_name="Baholar soni")
+    attendance_days_30d = models.PositiveIntegerField(default=0, verbose_name="Davomat kunlari (30 kun)")
+    attended_lessons_30d = models.PositiveIntegerField(default=0, verbose_name="Qatnashgan darslar (30 kun)")
+    active_homework_count = models.PositiveIntegerField(default=0, verbose_name="Faol uy vazifalari")
+    inactive_homework_count = models.PositiveIntegerField(default=0, verbose_name="Yakunlangan uy vazifalari")
+    payment_count = models.PositiveIntegerField(default=0, verbose_name="To'lovlar soni")
+    paid_payment_count = models.PositiveIntegerField(default=0, verbose_name="To'langan to'lovlar")
+    overdue_payment_count = models.PositiveIntegerField(default=0, verbose_name="Muddati o'tgan to'lovlar")
+    updated_at = models.DateTimeField(auto_now=True, verbose_name="Yangilangan sana")
+
+    class Meta:
+        verbose_name = "O'quvchi statistikasi"
+        verbose_name_plural = "O'quvchilar statistikasi"
+
+    def __str__(self):
+        return f"{self.student_id} - statistika"
+
+    @property
+    def average_grade(self):
+        if self.grade_count:
+            return round(self.grade_sum / self.grade_count, 2)
+        return 0
+
+    @property
+    def attendance_rate(self):
+        total_lessons = self.attendance_days_30d * 3  # Har kuni 3 dars
+        if total_lessons > 0:
+            return round((self.attended_lessons_30d / total_lessons) * 100, 2)
+        return 0
@@ -0,0 +1,156 @@
+# core/pagination.py
+"""
+Keyset (cursor) pagination.
+
+PageNumberPagination har bir sahifada butun scoped jadval bo'yicha COUNT(*)
+va OFFSET bajaradi. KeysetPagination esa (created_at, id) / (date, id)
+kaliti bo'yicha WHERE bilan keyingi sahifani oladi, chuqur sahifalar ham
+birinchi sahifa kabi tez. ?pagination=cursor bilan tanlanadi
+(core.mixins.KeysetPaginationMixin).
+"""
+import base64
+import json
+from collections import OrderedDict
+
+from django.core.exceptions import ValidationError
+from django.db import connection
+from django.db.models import Q
+from rest_framework.exceptions import NotFound
+from rest_framework.pagination import BasePagination
+from rest_framework.response import Response
+from rest_framework.utils.urls import replace_query_param
+
+# ?count=estimate bo'lsa, shundan katta jadvallar aniq sanalmaydi
+COUNT_ESTIMATE_CAP = 10000
+
+
+def estimate_count(queryset):
+    """
+    Taxminiy qatorlar soni: (count, is_estimate).
+
+    PostgreSQL'da planner bahosi (EXPLAIN), boshqa bazalarda
+    COUNT_ESTIMATE_CAP bilan cheklangan COUNT ishlatiladi.
+    """
+    if connection.vendor == 'postgresql':
+        plan = json.loads(queryset.order_by().explain(format='json'))
+        return int(plan[0]['Plan']['Plan Rows']), True
+
+    count = queryset.order_by()[:COUNT_ESTIMATE_CAP + 1].count()
+    if count > COUNT_ESTIMATE_CAP:
+        return COUNT_ESTIMATE_CAP, True
+    return count, False
+
+
+class KeysetPagination(BasePagination):
+    """
+    Faqat oldinga yuruvchi keyset pagination.
+
+    ordering - bir xil yo'nalishdagi maydonlar, oxirgisi unikal bo'lishi
+    kerak, masalan ('-created_at', '-id'). ?ordering parametri bu rejimda
+    e'tiborga olinmaydi.
+    """
+    cursor_query_param = 'cursor'
+    page_size_query_param = 'page_size'
+    count_query_param = 'count'
+    page_size = 20
+    max_page_size = 100
+    invalid_cursor_message = "Cursor noto'g'ri."
+
+    def __init__(self, ordering):
+        self.ordering = tuple(ordering)
+        self.descending = self.ordering[0].startswith('-')
+        self.fields = [field.lstrip('-') for field in self.ordering]
+
+    def paginate_queryset(self, queryset, request, view=None):
+        self.request = request
+        self.page_size = self.get_page_size(request)
+        queryset = queryset.order_by(*self.ordering)
+
+        self.count = self.count_is_estimate = None
+        if request.query_params.get(self.count_query_param) == 'estimate':
+            self.count, self.count_is_estimate = estimate_count(queryset)
+
+        position = self.decode_cursor(request)
+        if position is not None:
+            queryset = queryset.filter(self.position_filter(queryset.model, position))
+
+        results = list(queryset[:self.page_size + 1])
+        self.has_next = len(results) > self.page_size
+        self.page = results[:self.page_size]
+        return self.page
+
+    def get_page_size(self, request):
+        try:
+            page_size = int(request.query_params[self.page_size_query_param])
+        except (KeyError, ValueError):
+            return self.page_size
+        if page_size <= 0:
+            return self.page_size
+        return min(page_size, self.max_page_size)
+
+    def position_filter(self, model, position):
+        """(a, b) > (x, y) ni (a > x) OR (a = x AND b > y) ko'rinishida qurish"""
+        lookup = 'lt' if self.descending else 'gt'
+        # base64 JSON to'g'ri, lekin qiymatlari buzilgan cursor ham 404
+        try:
+            values = [
+                model._meta.get_field(field).to_python(value)
+                for field, value in zip(self.fields, position)
+            ]
+        except (ValidationError, TypeError, ValueError):
+            raise NotFound(self.invalid_cursor_message)
+        if any(value is None for value in values):
+            raise NotFound(self.invalid_cursor_message)
+
+        condition = Q()
+        for index, field in enumerate(self.fields):
+            equal = {self.fields[i]: values[i] for i in range(index)}
+            condition |= Q(**equal, **{f'{field}__{lookup}': values[index]})
+        return condition
+
+    # ========== Cursor ==========
+
+    def encode_cursor(self, instance):
+        position = [
+            value.isoformat() if hasattr(value, 'isoformat') else value
+            for value in (getattr(instance, field) for field in self.fields)
+        ]
+        return base64.urlsafe_b64encode(json.dumps(position).encode()).decode()
+
+    def decode_cursor(self, request):
+        encoded = request.query_params.get(self.cursor_query_param)
+        if not encoded:
+            return None
+        try:
+            position = json.loads(base64.urlsafe_b64decode(encoded.encode()))
+        except (TypeError, ValueError):
+            raise NotFound(self.invalid_cursor_message)
+        if not isinstance(position, list) or len(position) != len(self.fields):
+            raise NotFound(self.invalid_cursor_message)
+        return position
+
+    def get_next_link(self):
+        if not self.has_next:
+            return None
+        url = self.request.build_absolute_uri()
+        return replace_query_param(url, self.cursor_query_param, self.encode_cursor(self.page[-1]))
+
+    def get_paginated_response(self, data):
+        response = OrderedDict([('next', self.get_next_link())])
+        if self.count is not None:
+            response['count'] = self.count
+            response['count_is_estimate'] = self.count_is_estimate
+        response['results'] = data
+        return Response(response)
+
+    def get_paginated_response_schema(self, schema):
+        return {
+            'type': 'object',
+            'required': ['results'],
+            'properties': {
+                'next': {'type': 'string', 'nullable': True, 'format': 'uri'},
+                'count': {'type': 'integer'},
+                'count_is_estimate': {'type': 'boolean'},
+                'results': schema,
+            },
+        }
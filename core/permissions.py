@@ -0,0 +1,64 @@
+# core/permissions.py
+"""
+Obyekt darajasidagi ruxsatlar (update / partial_update / destroy).
+
+View object_rules'da qoidalarni e'lon qiladi, ObjectRulesPermission ularni
+get_object() ichida tekshiradi. Tekshiruvlar FK id'lari bilan ishlaydi
+(created_by_id, teacher_id, center_id), shuning uchun bog'langan
+obyektlar yuklanmaydi. core.mixins.SingleObjectMixin get_object() natijasini
+so'rov davomida saqlaydi: DRF'ning update/destroy'i obyektni qayta o'qimaydi.
+"""
+from rest_framework import permissions
+
+UPDATE_ACTIONS = ('update', 'partial_update')
+WRITE_ACTIONS = ('update', 'partial_update', 'destroy')
+
+
+# ========== Moslik tekshiruvlari ==========
+
+def created_by_user(obj, user):
+    return obj.created_by_id == user.pk
+
+
+def own_teacher(obj, user):
+    return obj.teacher_id == user.pk
+
+
+def same_center(obj, user):
+    return user.center_id is not None and obj.center_id == user.center_id
+
+
+def created_teacher(obj, user):
+    return obj.role == "teacher" and obj.created_by_id == user.pk
+
+
+class ObjectRule:
+    """
+    roles'dagi foydalanuvchi actions'ni bajarishi uchun any_of
+    tekshiruvlaridan kamida bittasi rost bo'lishi kerak.
+    """
+
+    def __init__(self, roles, any_of, message, actions=WRITE_ACTIONS):
+        self.roles = tuple(roles)
+        self.any_of = tuple(any_of)
+        self.message = message
+        self.actions = tuple(actions)
+
+    def applies(self, action, user):
+        return action in self.actions and getattr(user, 'role', None) in self.roles
+
+    def allows(self, obj, user):
+        return any(check(obj, user) for check in self.any_of)
+
+
+class ObjectRulesPermission(permissions.BasePermission):
+    """view.object_rules bo'yicha obyekt ruxsati; rad etilsa qoida xabari qaytadi"""
+
+    def has_object_permission(self, request, view, obj):
+        action = getattr(view, 'action', None)
+        for rule in getattr(view, 'object_rules', ()):
+            if rule.applies(action, request.user) and not rule.allows(obj, request.user):
+                self.message = rule.message
+                return False
+        return True
+
@@ -0,0 +1,247 @@
+# core/scoping.py
+"""
+Rolga qarab ko'rinadigan obyektlar (queryset scoping).
+
+Har bir model va rol uchun ko'rinish qoidasi SCOPES'da e'lon qilinadi va
+API ViewSet'lari (core.mixins.RoleScopedQuerysetMixin) hamda admin panel
+(RoleScopedAdminMixin) shu bitta joydan foydalanadi.
+
+Qoidalar indeksga mos filtrga kompilyatsiya qilinadi:
+
+- created_by__role="superadmin" o'rniga keshlangan superadmin id'lari
+  (User jadvaliga JOIN yo'q, created_by_id indeksi ishlaydi)
+- bir ustunga tushadigan shartlar bitta IN'ga birlashtiriladi
+  (created_by IN (superadminlar..., user))
+- qiymati yo'q shart (masalan markazsiz admin uchun center) hech narsaga
+  mos kelmaydi va tashlab yuboriladi
+"""
+from functools import lru_cache
+
+from django.apps import apps
+from django.core.cache import cache
+from django.db import transaction
+from django.db.models import Q
+
+SUPERADMIN_IDS_KEY = 'scoping:superadmin_ids'
+SUPERADMIN_IDS_TIMEOUT = 60 * 60
+
+ANONYMOUS = 'anonymous'
+DEFAULT = 'default'
+ALL = 'all'
+NOTHING = 'nothing'
+
+
+# ========== Superadminlar ==========
+
+def superadmin_ids():
+    """Superadmin foydalanuvchilar id'lari (keshda, rol o'zgarganda tozalanadi)"""
+    ids = cache.get(SUPERADMIN_IDS_KEY)
+    if ids is None:
+        User = apps.get_model('account', 'User')
+        ids = list(User.objects.filter(role="superadmin").order_by('pk').values_list('pk', flat=True))
+        cache.set(SUPERADMIN_IDS_KEY, ids, SUPERADMIN_IDS_TIMEOUT)
+    return ids
+
+
+def invalidate_superadmin_ids():
+    transaction.on_commit(lambda: cache.delete(SUPERADMIN_IDS_KEY))
+
+
+# ========== Qoidalar ==========
+
+class Ref:
+    """So'rov yuborgan foydalanuvchidan olinadigan qiymat"""
+
+    def __init__(self, resolve):
+        self.resolve = resolve
+
+
+USER = Ref(lambda user: [user.pk])
+CENTER = Ref(lambda user: [user.center_id] if user.center_id else [])
+SUPERADMINS = Ref(lambda user: superadmin_ids())
+
+
+class Rule:
+    """
+    Ko'rinish qoidasi: filters - AND qilinadigan doimiy shartlar,
+    any_of - kamida bittasi bajarilishi kerak bo'lgan (maydon, Ref) juftlari.
+    """
+
+    def __init__(self, *any_of, **filters):
+        self.any_of = any_of
+        self.filters = filters
+
+    def compile(self, user):
+        """Q qaytaradi; hech narsa ko'rinmasa None"""
+        values = {}
+        for field, ref in self.any_of:
+            values.setdefault(field, []).extend(ref.resolve(user))
+
+        condition = Q(**self.filters)
+        if not self.any_of:
+            return condition
+
+        terms = [
+            Q(**{field: ids[0]}) if len(ids) == 1 else Q(**{f'{field}__in': sorted(set(ids))})
+            for field, ids in values.items()
+            if ids
+        ]
+        if not terms:
+            return None
+
+        alternatives = terms[0]
+        for term in terms[1:]:
+            alternatives |= term
+        return condition & alternatives
+
+
+ACTIVE = Rule(is_active=True)
+
+# Bir nechta rolga umumiy qoidalar
+CENTER_OR_OWN = Rule(('created_by', SUPERADMINS), ('created_by', USER), ('center', CENTER))
+CENTER_ACTIVE = Rule(('center', CENTER), is_active=True)
+SUPERADMIN_OR_OWN = Rule(('created_by', SUPERADMINS), ('created_by', USER))
+STUDENT_CENTER = Rule(('student__center', CENTER), ('created_by', SUPERADMINS))
+OWN_TEACHER = Rule(('teacher', USER))
+
+SCOPES = {
+    'api': {
+        'core.LearningCenter': {
+            ANONYMOUS: ACTIVE,
+            'superadmin': ALL,
+            'admin': Rule(('created_by', SUPERADMINS), ('pk', CENTER)),
+            'admin_mini': Rule(('pk', CENTER)),
+            'teacher': Rule(('pk', CENTER)),
+            DEFAULT: ACTIVE,
+        },
+        'core.Parent': {
+            ANONYMOUS: ACTIVE,
+            'superadmin': ALL,
+            'admin': SUPERADMIN_OR_OWN,
+            'admin_mini': CENTER_ACTIVE,
+            'teacher': CENTER_ACTIVE,
+            DEFAULT: ACTIVE,
+        },
+        'core.Student': {
+            ANONYMOUS: ACTIVE,
+            'superadmin': ALL,
+            'admin': CENTER_OR_OWN,
+            'admin_mini': CENTER_OR_OWN,
+            'teacher': Rule(('teacher', USER), is_active=True),
+            DEFAULT: ACTIVE,
+        },
+        'core.Attendance': {
+            'superadmin': ALL,
+            'admin': STUDENT_CENTER,
+            'admin_mini': STUDENT_CENTER,
+            'teacher': OWN_TEACHER,
+        },
+        'core.Grade': {
+            'superadmin': ALL,
+            'admin': STUDENT_CENTER,
+            'admin_mini': STUDENT_CENTER,
+            'teacher': OWN_TEACHER,
+        },
+        'core.Payment': {
+            'superadmin': ALL,
+            'admin': Rule(('created_by', SUPERADMINS), ('created_by', USER), ('student__center', CENTER)),
+            'admin_mini': Rule(('created_by', SUPERADMINS), ('created_by', USER), ('student__center', CENTER)),
+        },
+        'core.News': {
+            ANONYMOUS: ACTIVE,
+            'superadmin': ALL,
+            'admin': SUPERADMIN_OR_OWN,
+            'admin_mini': CENTER_ACTIVE,
+            'teacher': CENTER_ACTIVE,
+            DEFAULT: ACTIVE,
+        },
+        'core.Homework': {
+            'superadmin': ALL,
+            'admin': Rule(('created_by', USER), ('center', CENTER)),
+            'admin_mini': Rule(('created_by', USER), ('center', CENTER)),
+            'teacher': OWN_TEACHER,
+        },
+        'account.User': {
+            'superadmin': ALL,
+            'admin': Rule(('created_by', SUPERADMINS), ('created_by', USER), role="teacher"),
+            'admin_mini': Rule(('pk', USER)),
+            'teacher': Rule(('pk', USER)),
+        },
+    },
+    'admin': {
+        'core.LearningCenter': {
+            'superadmin': ALL,
+            'admin': ALL,
+        },
+        'core.Parent': {
+            'superadmin': ALL,
+            'admin': SUPERADMIN_OR_OWN,
+        },
+        'core.Student': {
+            'superadmin': ALL,
+            'admin': CENTER_OR_OWN,
+            'admin_mini': CENTER_OR_OWN,
+            'teacher': OWN_TEACHER,
+        },
+        'core.Attendance': {
+            'superadmin': ALL,
+            'admin': STUDENT_CENTER,
+            'admin_mini': STUDENT_CENTER,
+            'teacher': OWN_TEACHER,
+        },
+        'core.Grade': {
+            'superadmin': ALL,
+            'admin': STUDENT_CENTER,
+            'admin_mini': STUDENT_CENTER,
+            'teacher': OWN_TEACHER,
+        },
+        'core.Payment': {
+            'superadmin': ALL,
+            'admin': Rule(('created_by', SUPERADMINS), ('created_by', USER), ('student__center', CENTER)),
+            'admin_mini': Rule(('created_by', SUPERADMINS), ('created_by', USER), ('student__center', CENTER)),
+        },
+        'core.News': {
+            'superadmin': ALL,
+            'admin': SUPERADMIN_OR_OWN,
+        },
+        'core.Homework': {
+            'superadmin': ALL,
+            'admin': CENTER_OR_OWN,
+            'admin_mini': CENTER_OR_OWN,
+            'teacher': OWN_TEACHER,
+        },
+        'account.User': {
+            'superadmin': ALL,
+            'admin': Rule(('created_by', SUPERADMINS), ('created_by', USER), role="teacher"),
+        },
+    },
+}
+
+
+@lru_cache(maxsize=None)
+def get_rule(model_label, context, role):
+    """(model, kontekst, rol) uchun qoida; e'lon qilinmagan bo'lsa NOTHING"""
+    rules = SCOPES[context].get(model_label)
+    if rules is None:
+        raise KeyError(f"{model_label} uchun '{context}' scoping qoidasi yo'q")
+    return rules.get(role, rules.get(DEFAULT, NOTHING))
+
+
+def user_role(user):
+    if not user.is_authenticated:
+        return ANONYMOUS
+    return getattr(user, 'role', None) or DEFAULT
+
+
+def scope_queryset(queryset, user, context='api'):
+    """queryset'ni foydalanuvchi ko'rishi mumkin bo'lgan obyektlar bilan cheklash"""
+    rule = get_rule(queryset.model._meta.label, context, user_role(user))
+    if rule == ALL:
+        return queryset
+    if rule == NOTHING:
+        return queryset.none()
+
+    condition = rule.compile(user)
+    if condition is None:
+        return queryset.none()
+    return queryset.filter(condition)
@@ -0,0 +1,270 @@
+# core/search.py
+"""
+Indekslangan to'liq matnli qidiruv.
+
+?search= SearchFilter'da bir nechta ustun bo'yicha LIKE '%...%' bo'lib,
+har bir so'rovda jadvalni to'liq ko'rib chiqadi. Bu yerda har bir obyekt
+uchun bitta matnli hujjat alohida indeksda saqlanadi:
+
+- SQLite: FTS5 virtual jadval (bm25 reyting, prefiks indekslari)
+- PostgreSQL: tsvector (GIN) + pg_trgm trigram indeksi
+
+Hujjatlar core.signals orqali sinxron yangilanadi, to'liq qayta qurish
+uchun rebuild_search_index buyrug'i bor. Backend SEARCH_BACKEND sozlamasi
+bilan tanlanadi ('auto' - baza turiga qarab, None - o'chirilgan).
+"""
+import logging
+import re
+
+from django.conf import settings
+from django.db import connection
+from django.db.models import IntegerField
+from django.db.models.expressions import RawSQL
+from django.utils.module_loading import import_string
+from rest_framework.filters import SearchFilter
+
+logger = logging.getLogger(__name__)
+
+# Reyting bo'yicha tartiblanadigan eng yaxshi natijalar soni; qolgan
+# mos kelganlar ulardan keyin view'ning odatdagi tartibida keladi
+SEARCH_RANKED_RESULTS = 100
+
+# Indekslanadigan maydonlar: tur -> (model, matn maydonlari, telefon maydonlari)
+SEARCH_DOCUMENTS = {
+    'student': ('core.Student', ['first_name', 'last_name', 'address', 'subject'], ['phone_number']),
+    'parent': ('core.Parent', ['first_name', 'last_name', 'email', 'workplace'], ['phone_number']),
+    'news': ('core.News', ['title', 'body'], []),
+}
+
+TOKEN_RE = re.compile(r'\w+')
+
+
+def build_document(instance, text_fields, phone_fields):
+    """Qidiruv hujjati: matn maydonlari + telefon raqamlari"""
+    parts = [getattr(instance, field) or '' for field in text_fields]
+    for field in phone_fields:
+        parts += phone_tokens(getattr(instance, field) or '')
+    return ' '.join(parts)
+
+
+def phone_tokens(phone_number):
+    """
+    Telefon raqamining barcha raqamli suffikslari (kamida 2 raqam).
+
+    Qidiruv so'zlari prefiks sifatida mos keladi, shuning uchun suffikslar
+    raqamning istalgan qismini topadi: ?search=90111 "+998901112233" ga mos
+    (LIKE '%90111%' bilan bir xil).
+    """
+    digits = re.sub(r'\D', '', phone_number)
+    return [digits[start:] for start in range(max(len(digits) - 1, 0))]
+
+
+def query_tokens(query):
+    return TOKEN_RE.findall(query.lower())
+
+
+# ========== Backendlar ==========
+
+class SQLiteFTSBackend:
+    # Har bir tur uchun alohida FTS5 jadval: MATCH boshqa turlarning
+    # hujjatlarini ko'rib chiqmaydi
+    table_prefix = 'core_search_fts'
+
+    def table(self, kind):
+        return f'{self.table_prefix}_{kind}'
+
+    def create_storage(self, cursor):
+        for kind in SEARCH_DOCUMENTS:
+            cursor.execute(
+                f"CREATE VIRTUAL TABLE IF NOT EXISTS {self.table(kind)} USING fts5("
+                "body, tokenize='unicode61 remove_diacritics 2', prefix='2 3')"
+            )
+
+    def drop_storage(self, cursor):
+        for kind in SEARCH_DOCUMENTS:
+            cursor.execute(f"DROP TABLE IF EXISTS {self.table(kind)}")
+
+    # rowid = obyekt id'si
+    def index(self, kind, object_id, document):
+        with connection.cursor() as cursor:
+            cursor.execute(f"DELETE FROM {self.table(kind)} WHERE rowid = %s", [object_id])
+            cursor.execute(f"INSERT INTO {self.table(kind)} (rowid, body) VALUES (%s, %s)", [object_id, document])
+
+    def index_many(self, kind, rows):
+        with connection.cursor() as cursor:
+            cursor.execute(f"DELETE FROM {self.table(kind)}")
+            cursor.executemany(f"INSERT INTO {self.table(kind)} (rowid, body) VALUES (%s, %s)", rows)
+
+    def remove(self, kind, object_id):
+        with connection.cursor() as cursor:
+            cursor.execute(f"DELETE FROM {self.table(kind)} WHERE rowid = %s", [object_id])
+
+    def match_sql(self, kind, tokens):
+        # Har bir so'z prefiks sifatida, hammasi AND bilan
+        match = ' '.join(f'"{token}"*' for token in tokens)
+        table = self.table(kind)
+        return f"SELECT rowid FROM {table} WHERE {table} MATCH %s", [match]
+
+    def ranked_ids(self, kind, tokens, limit):
+        sql, params = self.match_sql(kind, tokens)
+        with connection.cursor() as cursor:
+            cursor.execute(f"{sql} ORDER BY rank LIMIT %s", [*params, limit])
+            return [row[0] for row in cursor.fetchall()]
+
+
+class PostgresSearchBackend:
+    table = 'core_search_entry'
+
+    def create_storage(self, cursor):
+        cursor.execute("CREATE EXTENSION IF NOT EXISTS pg_trgm")
+        cursor.execute(
+            f"CREATE TABLE IF NOT EXISTS {self.table} ("
+            "kind varchar(20) NOT NULL, object_id bigint NOT NULL, body text NOT NULL, "
+            "vector tsvector GENERATED ALWAYS AS (to_tsvector('simple', body)) STORED, "
+            "PRIMARY KEY (kind, object_id))"
+        )
+        cursor.execute(f"CREATE INDEX IF NOT EXISTS {self.table}_vector_idx ON {self.table} USING gin (vector)")
+        cursor.execute(
+            f"CREATE INDEX IF NOT EXISTS {self.table}_trgm_idx ON {self.table} USING gin (body gin_trgm_ops)"
+        )
+
+    def drop_storage(self, cursor):
+        cursor.execute(f"DROP TABLE IF EXISTS {self.table}")
+
+    def index(self, kind, object_id, document):
+        with connection.cursor() as cursor:
+            cursor.execute(
+                f"INSERT INTO {self.table} (kind, object_id, body) VALUES (%s, %s, %s) "
+                "ON CONFLICT (kind, object_id) DO UPDATE SET body = EXCLUDED.body",
+                [kind, object_id, document],
+            )
+
+    def index_many(self, kind, rows):
+        with connection.cursor() as cursor:
+            cursor.execute(f"DELETE FROM {self.table} WHERE kind = %s", [kind])
+            cursor.executemany(
+                f"INSERT INTO {self.table} (kind, object_id, body) VALUES (%s, %s, %s)",
+                [(kind, object_id, document) for object_id, document in rows],
+            )
+
+    def remove(self, kind, object_id):
+        with connection.cursor() as cursor:
+            cursor.execute(f"DELETE FROM {self.table} WHERE kind = %s AND object_id = %s", [kind, object_id])
+
+    def match_sql(self, kind, tokens):
+        # tsvector prefiks mosligi, yozuv xatolari uchun trigram o'xshashligi
+        tsquery = ' & '.join(f'{token}:*' for token in tokens)
+        return (
+            f"SELECT object_id FROM {self.table} "
+            "WHERE kind = %s AND (vector @@ to_tsquery('simple', %s) OR body %% %s)",
+            [kind, tsquery, ' '.join(tokens)],
+        )
+
+    def ranked_ids(self, kind, tokens, limit):
+        sql, params = self.match_sql(kind, tokens)
+        tsquery = params[1]
+        with connection.cursor() as cursor:
+            cursor.execute(
+                f"{sql} ORDER BY ts_rank(vector, to_tsquery('simple', %s)) DESC, "
+                "similarity(body, %s) DESC LIMIT %s",
+                [*params, tsquery, params[2], limit],
+            )
+            return [row[0] for row in cursor.fetchall()]
+
+
+BACKENDS = {
+    'sqlite': SQLiteFTSBackend,
+    'postgresql': PostgresSearchBackend,
+}
+
+
+def get_search_backend(vendor=None):
+    """SEARCH_BACKEND sozlamasi bo'yicha backend (yoki None - LIKE qidiruv)"""
+    backend = getattr(settings, 'SEARCH_BACKEND', 'auto')
+    if backend is None:
+        return None
+    if backend == 'auto':
+        backend_class = BACKENDS.get(vendor or connection.vendor)
+        return backend_class() if backend_class else None
+    return import_string(backend)()
+
+
+# ========== Sinxronlash ==========
+
+def index_instance(kind, instance):
+    backend = get_search_backend()
+    if backend is None:
+        return
+    _, text_fields, phone_fields = SEARCH_DOCUMENTS[kind]
+    backend.index(kind, instance.pk, build_document(instance, text_fields, phone_fields))
+
+
+def remove_instance(kind, instance):
+    backend = get_search_backend()
+    if backend is not None:
+        backend.remove(kind, instance.pk)
+
+
+def rebuild_search_index(get_model, backend, kinds=None):
+    """
+    Berilgan turlar (standart: hammasi) indeksini noldan qurish.
+
+    get_model - django.apps.apps.get_model yoki migratsiyadagi apps.get_model.
+    {tur: hujjatlar soni} qaytaradi.
+    """
+    result = {}
+    for kind in kinds or SEARCH_DOCUMENTS:
+        model_label, text_fields, phone_fields = SEARCH_DOCUMENTS[kind]
+        model = get_model(model_label)
+        rows = [
+            (instance.pk, build_document(instance, text_fields, phone_fields))
+            for instance in model.objects.only('pk', *text_fields, *phone_fields).iterator()
+        ]
+        backend.index_many(kind, rows)
+        result[kind] = len(rows)
+    return result
+
+
+# ========== DRF filter ==========
+
+class IndexedSearchFilter(SearchFilter):
+    """
+    SearchFilter o'rnini bosuvchi filter: ?search= indeks bo'yicha.
+
+    View search_kind'ni e'lon qiladi. Barcha mos kelganlar indeks subquery'si
+    bilan filtrlanadi; ?ordering berilmagan bo'lsa eng yaxshi
+    SEARCH_RANKED_RESULTS tasi reyting bo'yicha oldinga chiqariladi.
+    OrderingFilter'dan keyin turishi kerak. Backend o'chirilgan bo'lsa
+    odatdagi SearchFilter (search_fields) ishlaydi.
+    """
+
+    def filter_queryset(self, request, queryset, view):
+        kind = getattr(view, 'search_kind', None)
+        backend = get_search_backend() if kind else None
+        if backend is None:
+            return super().filter_queryset(request, queryset, view)
+
+        tokens = query_tokens(request.query_params.get(self.search_param, ''))
+        if not tokens:
+            return queryset
+
+        queryset = queryset.filter(pk__in=RawSQL(*backend.match_sql(kind, tokens)))
+
+        if not request.query_params.get('ordering'):
+            ids = backend.ranked_ids(kind, tokens, SEARCH_RANKED_RESULTS)
+            if ids:
+                queryset = queryset.order_by(rank_expression(queryset.model, ids), *queryset.query.order_by)
+        return queryset
+
+
+def rank_expression(model, ids):
+    """
+    ids ro'yxatidagi o'rni bo'yicha tartiblash: CASE pk WHEN id THEN o'rni.
+
+    Har bir id uchun When() yasash va kompilyatsiya qilish sahifa vaqtining
+    katta qismini olgani uchun oddiy CASE bitta RawSQL sifatida quriladi.
+    """
+    column = f"{connection.ops.quote_name(model._meta.db_table)}.{connection.ops.quote_name(model._meta.pk.column)}"
+    whens = ' '.join(['WHEN %s THEN %s'] * len(ids))
+    params = [value for position, object_id in enumerate(ids) for value in (object_id, position)]
+    return RawSQL(f"CASE {column} {whens} ELSE %s END", [*params, len(ids)], output_field=IntegerField())
@@ -1,14 +1,48 @@
 # core/serializers.py
 from rest_framework import serializers
 from django.utils import timezone
-from datetime import timedelta
 from .models import (
     LearningCenter, Parent, Student, 
-    Attendance, Grade, Payment, News, Homework
+    Attendance, Grade, Payment, News, Homework, StudentStats
 )
+from .attendance import ATTENDANCE_BULK_MAX_ITEMS, LESSON_FIELDS, upsert_attendance
+from .grades import GRADE_BULK_MAX_ITEMS
+from .scoping import scope_queryset
 from account.models import User
 
 
+# ========== Student statistikasi ==========
+
+def student_stats(obj):
+    """
+    O'quvchining StudentStats qatori.
+
+    List endpoint'lar select_related('stats') bilan beradi. O'qish bazaga
+    yozmaydi: qator hali yo'q bo'lsa (migratsiya 0015 va o'quvchi yaratilishi
+    signali uni yaratadi) saqlanmagan nol statistika qaytadi, uni tungi
+    reconcile_student_stats task'i to'ldiradi.
+    """
+    try:
+        return obj.stats
+    except StudentStats.DoesNotExist:
+        return StudentStats(student_id=obj.pk)
+
+
+def student_average_grade(obj):
+    """Studentning o'rtacha bahosi"""
+    return student_stats(obj).average_grade
+
+
+def student_attendance_rate(obj):
+    """Studentning davomat foizi (oxirgi 30 kun)"""
+    return student_stats(obj).attendance_rate
+
+
+def student_homework_count(obj):
+    """Studentning faol uy vazifalari soni"""
+    return student_stats(obj).active_homework_count
+
+
 # ========== Helper Serializers ==========
 
 class UserInfoSerializer(serializers.ModelSerializer):
@@ -191,32 +225,15 @@ class StudentSerializer(serializers.ModelSerializer):
     
     def get_average_grade(self, obj):
         """Studentning o'rtacha bahosi"""
-        grades = Grade.objects.filter(student=obj)
-        if grades.exists():
-            avg = grades.aggregate(avg_score=serializers.Avg('score'))['avg_score']
-            return round(avg, 2) if avg else 0
-        return 0
+        return student_average_grade(obj)
     
     def get_attendance_rate(self, obj):
         """Studentning davomat foizi (oxirgi 30 kun)"""
-        thirty_days_ago = timezone.now() - timedelta(days=30)
-        attendances = Attendance.objects.filter(
-            student=obj, 
-            created_at__gte=thirty_days_ago
-        )
-        
-        if attendances.exists():
-            total_lessons = attendances.count() * 3  # Har kuni 3 dars
-            attended_lessons = sum([
-                1 for a in attendances 
-                if a.lesson_1 or a.lesson_2 or a.lesson_3
-            ])
-            return round((attended_lessons / total_lessons) * 100, 2) if total_lessons > 0 else 0
-        return 0
+        return student_attendance_rate(obj)
     
     def get_homework_count(self, obj):
         """Studentning uy vazifalari soni"""
-        return Homework.objects.filter(students=obj, is_active=True).count()
+        return student_homework_count(obj)
     
     def validate(self, data):
         request = self.context.get('request')
@@ -257,11 +274,13 @@ class AttendanceSerializer(serializers.ModelSerializer):
         model = Attendance
         fields = [
             'id', 'student', 'student_info', 'teacher', 'teacher_info',
-            'lesson_1', 'lesson_2', 'lesson_3', 'created_at',
+            'lesson_1', 'lesson_2', 'lesson_3', 'lesson_date', 'created_at',
             'created_at_date', 'created_at_time', 'created_by', 
             'created_by_info', 'attendance_status'
         ]
         read_only_fields = ['created_at', 'created_by']
+        # (student, teacher, lesson_date) mavjud bo'lsa create upsert qiladi
+        validators = []
     
     def get_student_info(self, obj):
         if obj.student:
@@ -279,10 +298,10 @@ class AttendanceSerializer(serializers.ModelSerializer):
         return None
     
     def get_created_at_date(self, obj):
-        return obj.created_at.date()
+        return timezone.localtime(obj.created_at).date()
     
     def get_created_at_time(self, obj):
-        return obj.created_at.time()
+        return timezone.localtime(obj.created_at).time()
     
     def get_attendance_status(self, obj):
         """Davomat holatini aniqlash"""
@@ -309,14 +328,93 @@ class AttendanceSerializer(serializers.ModelSerializer):
                             {"student": "Bu o'quvchi sizga tegishli emas"}
                         )
         
+        if self.instance is not None:
+            student = data.get('student', self.instance.student)
+            teacher = data.get('teacher', self.instance.teacher)
+            lesson_date = data.get('lesson_date', self.instance.lesson_date)
+            duplicate = Attendance.objects.filter(
+                student=student, teacher=teacher, lesson_date=lesson_date
+            ).exclude(pk=self.instance.pk)
+            if duplicate.exists():
+                raise serializers.ValidationError(
+                    {"lesson_date": "Bu kun uchun davomat allaqachon mavjud"}
+                )
+        
         return data
     
     def create(self, validated_data):
         request = self.context.get('request')
+        created_by = None
         if request and request.user.is_authenticated:
-            validated_data['created_by'] = request.user
+            created_by = request.user
         
-        return super().create(validated_data)
+        # Bir kunlik davomat bo'lsa yangisi yaratilmaydi, dars belgilari
+        # yangilanadi; view self.created bo'yicha 201 yoki 200 qaytaradi
+        attendance, self.created = upsert_attendance(
+            student_id=validated_data['student'].pk,
+            teacher_id=validated_data['teacher'].pk,
+            lesson_date=validated_data.get('lesson_date'),
+            created_by_id=created_by.pk if created_by else None,
+            **{
+                field: validated_data[field]
+                for field in LESSON_FIELDS
+                if field in validated_data
+            },
+        )
+        return attendance
+
+
+class AttendanceBulkItemSerializer(serializers.Serializer):
+    student_id = serializers.IntegerField()
+    lesson_1 = serializers.BooleanField(default=False)
+    lesson_2 = serializers.BooleanField(default=False)
+    lesson_3 = serializers.BooleanField(default=False)
+
+
+class AttendanceBulkSerializer(serializers.Serializer):
+    """
+    Bir kunlik sinf davomati: {lesson_date, items: [{student_id, lesson_1..3}]}.
+
+    Egalik bitta so'rovda tekshiriladi: o'quvchilar foydalanuvchining
+    scoping qoidasi bilan olinadi, davomat o'quvchining o'qituvchisiga yoziladi.
+    """
+    lesson_date = serializers.DateField(default=timezone.localdate)
+    items = AttendanceBulkItemSerializer(many=True, allow_empty=False, max_length=ATTENDANCE_BULK_MAX_ITEMS)
+
+    def validate_items(self, items):
+        student_ids = [item['student_id'] for item in items]
+        if len(set(student_ids)) != len(student_ids):
+            raise serializers.ValidationError("O'quvchilar takrorlanmasligi kerak")
+        return items
+
+    def validate(self, data):
+        user = self.context['request'].user
+        student_ids = [item['student_id'] for item in data['items']]
+        students = {
+            pk: (teacher_id, center_id)
+            for pk, teacher_id, center_id in scope_queryset(
+                Student.objects.filter(pk__in=student_ids), user
+            ).values_list('pk', 'teacher_id', 'center_id')
+        }
+
+        # Xatolar ListSerializer formatida: har bir element uchun alohida
+        errors = []
+        for pk in student_ids:
+            if pk not in students:
+                errors.append({'student_id': ["Bu o'quvchi sizga tegishli emas yoki topilmadi"]})
+            elif students[pk][0] is None:
+                # Davomat o'qituvchisiz yozilmaydi (teacher_id NOT NULL)
+                errors.append({'student_id': ["O'quvchiga o'qituvchi biriktirilmagan"]})
+            else:
+                errors.append({})
+        if any(errors):
+            raise serializers.ValidationError({'items': errors})
+
+        data['rows'] = [
+            {**item, 'teacher_id': students[item['student_id']][0], 'center_id': students[item['student_id']][1]}
+            for item in data['items']
+        ]
+        return data
 
 
 class GradeSerializer(serializers.ModelSerializer):
@@ -395,6 +493,79 @@ class GradeSerializer(serializers.ModelSerializer):
         return super().create(validated_data)
 
 
+class GradeBulkItemSerializer(serializers.Serializer):
+    student_id = serializers.IntegerField()
+    score = serializers.IntegerField(
+        min_value=1, max_value=100,
+        error_messages={
+            'min_value': "Baho 1 dan 100 gacha bo'lishi kerak",
+            'max_value': "Baho 1 dan 100 gacha bo'lishi kerak",
+        },
+    )
+    comment = serializers.CharField(required=False, allow_blank=True, default='')
+
+
+class GradeBulkSerializer(serializers.Serializer):
+    """
+    Imtihon baholari: {subject, date, items: [{student_id, score, comment}]}.
+
+    Umumiy maydonlar xato bo'lsa butun so'rov rad etiladi. Elementlar esa
+    validate_items() bilan alohida tekshiriladi: xato elementlar qolganlarini
+    to'xtatmaydi.
+    """
+    subject = serializers.CharField(max_length=100)
+    date = serializers.DateField(default=timezone.localdate)
+    items = serializers.ListField(
+        child=serializers.DictField(), allow_empty=False, max_length=GRADE_BULK_MAX_ITEMS
+    )
+
+    def validate_date(self, value):
+        if value > timezone.localdate():
+            raise serializers.ValidationError("Sana kelajakda bo'lishi mumkin emas")
+        return value
+
+    def validate_items(self, items):
+        """
+        (to'g'ri elementlar, xatolar) juftligiga aylantiriladi.
+
+        To'g'ri element: {index, student_id, score, comment, center_id};
+        xato: {index, student_id, errors}.
+        """
+        valid, errors, seen = [], [], set()
+        for index, item in enumerate(items):
+            serializer = GradeBulkItemSerializer(data=item)
+            if not serializer.is_valid():
+                errors.append({'index': index, 'student_id': item.get('student_id'), 'errors': serializer.errors})
+            elif serializer.validated_data['student_id'] in seen:
+                errors.append({
+                    'index': index,
+                    'student_id': serializer.validated_data['student_id'],
+                    'errors': {'student_id': ["Bu o'quvchi so'rovda takrorlangan"]},
+                })
+            else:
+                seen.add(serializer.validated_data['student_id'])
+                valid.append({'index': index, **serializer.validated_data})
+
+        # Egalik: foydalanuvchi ko'ra oladigan o'quvchilar bitta so'rovda
+        centers = dict(
+            scope_queryset(Student.objects.filter(pk__in=seen), self.context['request'].user)
+            .values_list('pk', 'center_id')
+        )
+        owned = []
+        for item in valid:
+            if item['student_id'] in centers:
+                owned.append({**item, 'center_id': centers[item['student_id']]})
+            else:
+                errors.append({
+                    'index': item['index'],
+                    'student_id': item['student_id'],
+                    'errors': {'student_id': ["Bu o'quvchi sizga tegishli emas yoki topilmadi"]},
+                })
+
+        errors.sort(key=lambda error: error['index'])
+        return owned, errors
+
+
 class PaymentSerializer(serializers.ModelSerializer):
     student_info = serializers.SerializerMethodField()
     created_by_info = serializers.SerializerMethodField()
@@ -405,10 +576,11 @@ class PaymentSerializer(serializers.ModelSerializer):
         model = Payment
         fields = [
             'id', 'student', 'student_info', 'date', 'amount',
-            'deadline', 'status', 'payment_status', 'days_overdue',
+            'deadline', 'status', 'payment_status', 'days_overdue', 'period',
             'created_by', 'created_by_info'
         ]
-        read_only_fields = ['created_by', 'payment_status', 'days_overdue']
+        # period faqat oylik hisob (billing_run) orqali yoziladi
+        read_only_fields = ['created_by', 'payment_status', 'days_overdue', 'period']
     
     def get_student_info(self, obj):
         if obj.student:
@@ -421,23 +593,15 @@ class PaymentSerializer(serializers.ModelSerializer):
         return None
     
     def get_payment_status(self, obj):
-        """To'lov holatini aniqlash"""
-        today = timezone.now().date()
-        
-        if obj.status.lower() == 'paid':
-            return 'paid'
-        elif obj.deadline < today:
-            return 'overdue'
-        elif obj.deadline == today:
+        """To'lov holati: saqlangan status, bugun muddati tugaydigan pending'lar 'due_today'"""
+        if obj.status == 'pending' and obj.deadline == timezone.localdate():
             return 'due_today'
-        else:
-            return 'pending'
+        return obj.status
     
     def get_days_overdue(self, obj):
-        """Qancha kun o'tib qolgan"""
-        today = timezone.now().date()
-        if obj.deadline < today and obj.status.lower() != 'paid':
-            return (today - obj.deadline).days
+        """Qancha kun o'tib qolgan (faqat overdue to'lovlar uchun)"""
+        if obj.status == 'overdue':
+            return max((timezone.localdate() - obj.deadline).days, 0)
         return 0
     
     def validate_amount(self, value):
@@ -464,6 +628,32 @@ class PaymentSerializer(serializers.ModelSerializer):
         return super().create(validated_data)
 
 
+class BillingRunSerializer(serializers.Serializer):
+    """Oylik hisob: {center, period: "YYYY-MM", amount, deadline, date, student_ids, teacher}"""
+    center = serializers.PrimaryKeyRelatedField(queryset=LearningCenter.objects.all(), required=False)
+    period = serializers.DateField(input_formats=['%Y-%m', 'iso-8601'])
+    amount = serializers.DecimalField(max_digits=10, decimal_places=2)
+    deadline = serializers.DateField()
+    date = serializers.DateField(required=False)
+    student_ids = serializers.ListField(child=serializers.IntegerField(), required=False, allow_empty=False)
+    teacher = serializers.IntegerField(required=False)
+
+    def validate_period(self, value):
+        return value.replace(day=1)
+
+    def validate_amount(self, value):
+        if value <= 0:
+            raise serializers.ValidationError("To'lov miqdori musbat bo'lishi kerak")
+        return value
+
+    def validate(self, data):
+        if data['deadline'] < data.get('date', data['period']):
+            raise serializers.ValidationError({
+                "deadline": "Muddat to'lov sanasidan oldin bo'lishi mumkin emas"
+            })
+        return data
+
+
 class NewsSerializer(serializers.ModelSerializer):
     center_info = LearningCenterShortSerializer(source='center', read_only=True)
     created_by_info = serializers.SerializerMethodField()
@@ -537,13 +727,14 @@ class HomeworkSerializer(serializers.ModelSerializer):
             'teacher', 'teacher_info', 'students', 'students_info',
             'center', 'center_info', 'created_at', 'created_at_formatted',
             'created_by', 'created_by_info', 'is_active', 'student_count', 
-            'file_url', 'file_name', 'file_size', 'days_remaining',
-            'is_overdue', 'is_due_today', 'status'
+            'file_url', 'file_name', 'file_size', 'file_content_type',
+            'file_checksum', 'days_remaining', 'is_overdue', 'is_due_today', 'status'
         ]
         read_only_fields = ['created_at', 'created_by', 'teacher_info', 
                            'center_info', 'student_count', 'days_remaining',
                            'is_overdue', 'is_due_today', 'status', 
-                           'created_at_formatted', 'file_name', 'file_size']
+                           'created_at_formatted', 'file_name', 'file_size',
+                           'file_content_type', 'file_checksum']
     
     def get_teacher_info(self, obj):
         if obj.teacher:
@@ -561,6 +752,8 @@ class HomeworkSerializer(serializers.ModelSerializer):
         return None
     
     def get_student_count(self, obj):
+        if hasattr(obj, 'assigned_student_count'):
+            return obj.assigned_student_count
         return obj.students.count()
     
     def get_students_info(self, obj):
@@ -583,18 +776,17 @@ class HomeworkSerializer(serializers.ModelSerializer):
         return None
     
     def get_file_size(self, obj):
-        """Fayl hajmini olish"""
+        """Fayl hajmini olish (yuklashda saqlangan qiymatdan)"""
         if obj.homework_file:
-            try:
-                size = obj.homework_file.size
-                if size < 1024:
-                    return f"{size} B"
-                elif size < 1024 * 1024:
-                    return f"{size / 1024:.1f} KB"
-                else:
-                    return f"{size / (1024 * 1024):.1f} MB"
-            except:
+            size = obj.file_size
+            if size is None:
                 return "Unknown"
+            if size < 1024:
+                return f"{size} B"
+            elif size < 1024 * 1024:
+                return f"{size / 1024:.1f} KB"
+            else:
+                return f"{size / (1024 * 1024):.1f} MB"
         return None
     
     def get_created_at_formatted(self, obj):
@@ -635,7 +827,7 @@ class HomeworkSerializer(serializers.ModelSerializer):
             elif today == obj.due_date:
                 return "due_today"
             else:
-                if obj.days_remaining <= 3:
+                if self.get_days_remaining(obj) <= 3:
                     return "urgent"
                 else:
                     return "upcoming"
@@ -664,6 +856,10 @@ class HomeworkSerializer(serializers.ModelSerializer):
     
     def validate_homework_file(self, value):
         """Fayl hajmini tekshirish (max 10MB)"""
+        # null - faylni olib tashlash
+        if value is None:
+            return value
+        
         max_size = 10 * 1024 * 1024  # 10MB
         if value.size > max_size:
             raise serializers.ValidationError("Fayl hajmi 10MB dan katta bo'lishi mumkin emas")
@@ -766,6 +962,8 @@ class HomeworkListSerializer(serializers.ModelSerializer):
         return None
     
     def get_student_count(self, obj):
+        if hasattr(obj, 'assigned_student_count'):
+            return obj.assigned_student_count
         return obj.students.count()
     
     def get_days_remaining(self, obj):
@@ -825,32 +1023,15 @@ class StudentWithGradesSerializer(serializers.ModelSerializer):
     
     def get_average_grade(self, obj):
         """Studentning o'rtacha bahosi"""
-        grades = Grade.objects.filter(student=obj)
-        if grades.exists():
-            avg = grades.aggregate(avg_score=serializers.Avg('score'))['avg_score']
-            return round(avg, 2) if avg else 0
-        return 0
+        return student_average_grade(obj)
     
     def get_attendance_rate(self, obj):
         """Studentning davomat foizi (oxirgi 30 kun)"""
-        thirty_days_ago = timezone.now() - timedelta(days=30)
-        attendances = Attendance.objects.filter(
-            student=obj, 
-            created_at__gte=thirty_days_ago
-        )
-        
-        if attendances.exists():
-            total_lessons = attendances.count() * 3  # Har kuni 3 dars
-            attended_lessons = sum([
-                1 for a in attendances 
-                if a.lesson_1 or a.lesson_2 or a.lesson_3
-            ])
-            return round((attended_lessons / total_lessons) * 100, 2) if total_lessons > 0 else 0
-        return 0
+        return student_attendance_rate(obj)
     
     def get_homework_count(self, obj):
         """Studentning uy vazifalari soni"""
-        return Homework.objects.filter(students=obj, is_active=True).count()
+        return student_homework_count(obj)
 
 
 class DashboardStatsSerializer(serializers.Serializer):
@@ -928,44 +1109,14 @@ class StudentDetailSerializer(serializers.ModelSerializer):
     
     def get_statistics(self, obj):
         """Student statistikasi"""
-        # Baholar
-        grades = Grade.objects.filter(student=obj)
-        average_grade = 0
-        if grades.exists():
-            avg = grades.aggregate(avg_score=serializers.Avg('score'))['avg_score']
-            average_grade = round(avg, 2) if avg else 0
-        
-        # Davomat
-        thirty_days_ago = timezone.now() - timedelta(days=30)
-        attendances = Attendance.objects.filter(
-            student=obj, 
-            created_at__gte=thirty_days_ago
-        ) 
-        attendance_rate = 0
-        if attendances.exists():
-            total_lessons = attendances.count() * 3
-            attended_lessons = sum([
-                1 for a in attendances 
-                if a.lesson_1 or a.lesson_2 or a.lesson_3
-            ])
-            attendance_rate = round((attended_lessons / total_lessons) * 100, 2) if total_lessons > 0 else 0
-        
-        # Uy vazifalari
-        total_homeworks = Homework.objects.filter(students=obj, is_active=True).count()
-        completed_homeworks = Homework.objects.filter(students=obj, is_active=False).count()
-        
-        # To'lovlar
-        payments = Payment.objects.filter(student=obj)
-        total_payments = payments.count()
-        paid_payments = payments.filter(status__icontains='paid').count()
-        overdue_payments = payments.filter(status__icontains='overdue').count()
+        stats = student_stats(obj)
         
         return {
-            'average_grade': average_grade,
-            'attendance_rate': attendance_rate,
-            'total_homeworks': total_homeworks,
-            'completed_homeworks': completed_homeworks,
-            'total_payments': total_payments,
-            'paid_payments': paid_payments,
-            'overdue_payments': overdue_payments 
+            'average_grade': stats.average_grade,
+            'attendance_rate': stats.attendance_rate,
+            'total_homeworks': stats.active_homework_count,
+            'completed_homeworks': stats.inactive_homework_count,
+            'total_payments': stats.payment_count,
+            'paid_payments': stats.paid_payment_count,
+            'overdue_payments': stats.overdue_payment_count
         } 
\ No newline at end of file
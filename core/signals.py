@@ -0,0 +1,167 @@
+# core/signals.py
+from django.db.models.signals import m2m_changed, post_delete, post_save, pre_delete
+from django.dispatch import receiver
+
+from . import search, stats
+from .cache import invalidate_dashboard
+from .scoping import invalidate_superadmin_ids
+from .models import Attendance, Grade, Homework, News, Parent, Payment, Student, StudentStats
+from account.authentication import invalidate_auth_state
+from account.models import User
+
+
+def _student_center_id(instance):
+    """Grade/Attendance/Payment o'quvchisining markazi (o'quvchi o'chirilgan bo'lsa None)"""
+    try:
+        return instance.student.center_id
+    except Student.DoesNotExist:
+        return None
+
+
+# ========== Dashboard keshi ==========
+
+@receiver([post_save, post_delete], sender=Student)
+@receiver([post_save, post_delete], sender=Homework)
+@receiver([post_save, post_delete], sender=News)
+def invalidate_center_dashboard(sender, instance, **kwargs):
+    invalidate_dashboard(instance.center_id)
+
+
+@receiver([post_save, post_delete], sender=Grade)
+@receiver([post_save, post_delete], sender=Attendance)
+@receiver([post_save, post_delete], sender=Payment)
+def invalidate_student_dashboard(sender, instance, **kwargs):
+    invalidate_dashboard(_student_center_id(instance))
+
+
+@receiver([post_save, post_delete], sender=User)
+def invalidate_teacher_dashboard(sender, instance, **kwargs):
+    if instance.role == "teacher":
+        invalidate_dashboard(instance.center_id)
+
+
+# ========== Scoping ==========
+
+@receiver([post_save, post_delete], sender=User)
+def invalidate_superadmins(sender, instance, update_fields=None, **kwargs):
+    # last_login kabi tor yangilanishlar rolni o'zgartirmaydi
+    if update_fields is None or 'role' in update_fields:
+        invalidate_superadmin_ids()
+
+
+# ========== JWT foydalanuvchi holati ==========
+
+AUTH_STATE_FIELDS = {'role', 'center', 'center_id', 'is_active', 'is_staff', 'is_superuser'}
+
+
+@receiver([post_save, post_delete], sender=User)
+def invalidate_user_auth_state(sender, instance, update_fields=None, **kwargs):
+    # last_login yangilanishi token claim'lariga ta'sir qilmaydi
+    if update_fields is None or not AUTH_STATE_FIELDS.isdisjoint(update_fields):
+        invalidate_auth_state(instance.pk)
+
+
+# ========== O'quvchi statistikasi ==========
+
+STATS_HANDLERS = {
+    Grade: stats.grade_added,
+    Attendance: stats.attendance_added,
+    Payment: stats.payment_added,
+}
+
+
+@receiver(post_save, sender=Student)
+def create_student_stats(sender, instance, created, raw=False, **kwargs):
+    if created and not raw:
+        StudentStats.objects.create(student=instance)
+
+
+@receiver(post_save, sender=Grade)
+@receiver(post_save, sender=Attendance)
+@receiver(post_save, sender=Payment)
+def update_student_stats(sender, instance, created, raw=False, **kwargs):
+    if raw:
+        return
+    if created:
+        STATS_HANDLERS[sender](instance)
+    else:
+        # Eski qiymat noma'lum: shu o'quvchi qayta hisoblanadi
+        stats.reconcile_student_stats([instance.student_id])
+
+
+@receiver(post_delete, sender=Grade)
+@receiver(post_delete, sender=Attendance)
+@receiver(post_delete, sender=Payment)
+def revert_student_stats(sender, instance, **kwargs):
+    # O'quvchining o'zi o'chirilayotgan bo'lsa statistikasi ham cascade bilan o'chadi
+    if StudentStats.objects.filter(student_id=instance.student_id).exists():
+        STATS_HANDLERS[sender](instance, sign=-1)
+
+
+def _homework_student_ids(homework):
+    # View students'ni prefetch qilgan bo'lsa qayta so'rov yubormaslik
+    if 'students' in getattr(homework, '_prefetched_objects_cache', {}):
+        return [student.pk for student in homework.students.all()]
+    return list(homework.students.values_list('pk', flat=True))
+
+
+@receiver(post_save, sender=Homework)
+def update_homework_student_stats(sender, instance, created, raw=False, **kwargs):
+    # Yangi uy vazifasining hali o'quvchilari yo'q; tahrirda is_active o'zgargan bo'lishi mumkin
+    if not created and not raw:
+        stats.reconcile_student_stats(_homework_student_ids(instance))
+
+
+@receiver(pre_delete, sender=Homework)
+def remember_homework_students(sender, instance, **kwargs):
+    instance._stats_student_ids = _homework_student_ids(instance)
+
+
+@receiver(post_delete, sender=Homework)
+def revert_homework_student_stats(sender, instance, **kwargs):
+    student_ids = getattr(instance, '_stats_student_ids', None)
+    if student_ids:
+        stats.reconcile_student_stats(student_ids)
+
+
+@receiver(m2m_changed, sender=Homework.students.through)
+def update_assigned_homework_stats(sender, instance, action, reverse, pk_set, **kwargs):
+    if action in ('post_add', 'post_remove') and pk_set:
+        sign = 1 if action == 'post_add' else -1
+        if reverse:
+            stats.homeworks_assigned([instance.pk], pk_set, sign=sign)
+        else:
+            stats.homeworks_assigned(pk_set, [instance.pk], sign=sign)
+
+    elif action == 'pre_clear':
+        if reverse:
+            instance._stats_student_ids = [instance.pk]
+        else:
+            instance._stats_student_ids = list(instance.students.values_list('pk', flat=True))
+
+    elif action == 'post_clear':
+        stats.reconcile_student_stats(getattr(instance, '_stats_student_ids', []))
+
+
+# ========== Qidiruv indeksi ==========
+
+SEARCH_KINDS = {
+    Student: 'student',
+    Parent: 'parent',
+    News: 'news',
+}
+
+
+@receiver(post_save, sender=Student)
+@receiver(post_save, sender=Parent)
+@receiver(post_save, sender=News)
+def index_search_document(sender, instance, raw=False, **kwargs):
+    if not raw:
+        search.index_instance(SEARCH_KINDS[sender], instance)
+
+
+@receiver(post_delete, sender=Student)
+@receiver(post_delete, sender=Parent)
+@receiver(post_delete, sender=News)
+def remove_search_document(sender, instance, **kwargs):
+    search.remove_instance(SEARCH_KINDS[sender], instance)
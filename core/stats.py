@@ -0,0 +1,211 @@
+# core/stats.py
+"""
+O'quvchi statistikasi (StudentStats) rollup'i.
+
+Yangi va o'chirilgan qatorlar hisoblagichlarga F() delta sifatida qo'shiladi;
+eski qiymati noma'lum bo'lgan o'zgarishlar (baho, davomat yoki to'lov
+tahrirlanganda) faqat shu o'quvchi uchun xom qatorlardan qayta hisoblanadi.
+reconcile_student_stats barcha qatorlarni tekshirib driftni tuzatadi.
+"""
+import logging
+from collections import Counter
+from datetime import timedelta
+
+from django.db.models import F, Value
+from django.db.models.functions import Greatest
+from django.utils import timezone
+
+from .models import Homework, Student, StudentStats
+
+logger = logging.getLogger(__name__)
+
+# Reconciliation bir so'rovda nechta o'quvchini qayta hisoblashi
+STATS_BATCH_SIZE = 1000
+
+STUDENT_STATS_FIELDS = (
+    'grade_sum', 'grade_count',
+    'attendance_days_30d', 'attended_lessons_30d',
+    'active_homework_count', 'inactive_homework_count',
+    'payment_count', 'paid_payment_count', 'overdue_payment_count',
+)
+
+
+def reconcile_student_stats(student_ids=None, batch_size=STATS_BATCH_SIZE):
+    """
+    StudentStats'ni Student.objects.with_statistics() bilan solishtirish.
+
+    Farq qilgan yoki yo'q qatorlar bulk upsert bilan yoziladi.
+    {'checked': ..., 'drifted': ...} qaytaradi.
+    """
+    queryset = Student.objects.order_by('pk')
+    if student_ids is not None:
+        queryset = queryset.filter(pk__in=student_ids)
+
+    checked = drifted = 0
+    last_pk = 0
+
+    while True:
+        rows = list(
+            queryset.filter(pk__gt=last_pk)
+            .with_statistics()
+            .values('pk', *STUDENT_STATS_FIELDS)[:batch_size]
+        )
+        if not rows:
+            break
+        last_pk = rows[-1]['pk']
+
+        current = StudentStats.objects.in_bulk([row['pk'] for row in rows])
+        changed = []
+
+        for row in rows:
+            values = {field: row[field] for field in STUDENT_STATS_FIELDS}
+            stats = current.get(row['pk'])
+            if stats is None or any(getattr(stats, field) != value for field, value in values.items()):
+                changed.append(StudentStats(student_id=row['pk'], **values))
+
+        if changed:
+            StudentStats.objects.bulk_create(
+                changed,
+                update_conflicts=True,
+                unique_fields=['student'],
+                update_fields=[*STUDENT_STATS_FIELDS, 'updated_at'],
+            )
+
+        checked += len(rows)
+        drifted += len(changed)
+        if len(rows) < batch_size:
+            break
+
+    return {'checked': checked, 'drifted': drifted}
+
+
+def apply_stats_delta(student_id, **deltas):
+    """
+    Bitta o'quvchi hisoblagichlariga delta qo'shish (bitta UPDATE).
+
+    Statistika qatori hali bo'lmasa o'quvchi xom qatorlardan hisoblanadi.
+    """
+    updated = StudentStats.objects.filter(student_id=student_id).update(**_delta_expressions(deltas))
+    if not updated:
+        reconcile_student_stats([student_id])
+
+
+def _delta_expressions(deltas):
+    # Manfiy delta hisoblagichni noldan pastga tushirmaydi (driftni reconciliation tuzatadi)
+    return {
+        field: Greatest(F(field) + Value(delta), Value(0)) if delta < 0 else F(field) + Value(delta)
+        for field, delta in deltas.items()
+        if delta
+    }
+
+
+# ========== Model hodisalari ==========
+
+def grade_added(grade, sign=1):
+    apply_stats_delta(grade.student_id, grade_sum=sign * grade.score, grade_count=sign)
+
+
+def attendance_added(attendance, sign=1):
+    # 30 kunlik oynadan tashqaridagi davomat hisoblagichlarga kirmaydi
+    if attendance.created_at < timezone.now() - timedelta(days=30):
+        return
+    attended = int(attendance.lesson_1) + int(attendance.lesson_2) + int(attendance.lesson_3)
+    apply_stats_delta(
+        attendance.student_id,
+        attendance_days_30d=sign,
+        attended_lessons_30d=sign * attended,
+    )
+
+
+def payment_added(payment, sign=1):
+    apply_stats_delta(
+        payment.student_id,
+        payment_count=sign,
+        paid_payment_count=sign * (payment.status == 'paid'),
+        overdue_payment_count=sign * (payment.status == 'overdue'),
+    )
+
+
+def homeworks_assigned(student_ids, homework_ids, sign=1):
+    """Homework.students orqali biriktirilgan/olib tashlangan uy vazifalari"""
+    active = dict(Homework.objects.filter(pk__in=homework_ids).values_list('pk', 'is_active'))
+    active_count = sum(1 for is_active in active.values() if is_active)
+    deltas = {
+        'active_homework_count': sign * active_count,
+        'inactive_homework_count': sign * (len(active) - active_count),
+    }
+    for student_id in student_ids:
+        apply_stats_delta(student_id, **deltas)
+
+
+def homeworks_bulk_assigned(students, active_count, inactive_count, already_assigned):
+    """
+    core.homeworks.assign_homeworks uchun (m2m_changed yuborilmaydi).
+
+    students'dagi har bir o'quvchiga barcha uy vazifalari bitta UPDATE bilan
+    qo'shiladi, avval biriktirilganlari (already_assigned: [(student_id,
+    faol, nofaol)]) bir xil delta'lar bo'yicha guruhlab ayiriladi. Statistika
+    qatori yo'q o'quvchilar xom qatorlardan hisoblanadi.
+    """
+    deltas = _delta_expressions({
+        'active_homework_count': active_count,
+        'inactive_homework_count': inactive_count,
+    })
+    if deltas:
+        StudentStats.objects.filter(student_id__in=students).update(**deltas)
+
+    by_delta = {}
+    for student_id, active, inactive in already_assigned:
+        by_delta.setdefault((active, inactive), []).append(student_id)
+    for (active, inactive), ids in by_delta.items():
+        StudentStats.objects.filter(student_id__in=ids).update(**_delta_expressions({
+            'active_homework_count': -active,
+            'inactive_homework_count': -inactive,
+        }))
+
+    _reconcile_missing(students)
+
+
+def _increment_counts(field, student_ids):
+    """
+    student_ids'dagi har bir takror uchun field'ga +1.
+
+    Bir xil delta'li o'quvchilar bitta UPDATE bilan yangilanadi, statistika
+    qatori yo'q o'quvchilar xom qatorlardan hisoblanadi.
+    """
+    per_student = Counter(student_ids)
+    by_delta = {}
+    for student_id, count in per_student.items():
+        by_delta.setdefault(count, []).append(student_id)
+
+    for count, ids in by_delta.items():
+        StudentStats.objects.filter(student_id__in=ids).update(**_delta_expressions({field: count}))
+
+    _reconcile_missing(list(per_student))
+
+
+def _reconcile_missing(students):
+    """
+    StudentStats qatori yo'q o'quvchilarni xom qatorlardan hisoblash.
+
+    Delta UPDATE'lar faqat mavjud qatorlarga ta'sir qiladi; students - id'lar
+    ro'yxati yoki o'quvchi id'lari subquery'si.
+    """
+    missing = list(Student.objects.filter(pk__in=students, stats__isnull=True).values_list('pk', flat=True))
+    if missing:
+        reconcile_student_stats(missing)
+
+
+def attendances_created(student_ids):
+    """bulk_create qilingan bo'sh davomatlar uchun (signal yuborilmaydi)"""
+    _increment_counts('attendance_days_30d', student_ids)
+
+
+def payments_created(student_ids):
+    """bulk_create qilingan 'pending' to'lovlar uchun (signal yuborilmaydi): har o'quvchiga bittadan"""
+    _increment_counts('payment_count', set(student_ids))
+
+
+def payments_overdue(student_ids):
+    """queryset.update() bilan overdue qilingan to'lovlar uchun: har bir to'lovga o'quvchi id'si"""
+    _increment_counts('overdue_payment_count', student_ids)
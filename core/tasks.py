@@ -1,55 +1,173 @@
 # core/tasks.py
-from django.utils import timezone
-from django.db.models import Q
-from celery import shared_task
-from .models import Attendance, Student, User
 import logging
+from datetime import date, timedelta
+from decimal import Decimal
+
+from celery import chord, shared_task
+from django.conf import settings
+from django.db import OperationalError
+from django.utils import timezone
+from .attendance import (
+    ATTENDANCE_BATCH_SIZE, attendance_idempotency_key, fetch_center_ids,
+    generate_attendance, generate_center_attendance, merge_center_results,
+)
+from .attendance_archive import ARCHIVE_MIN_AGE_DAYS, archive_attendance, month_start
+from .billing import (
+    FAILED, billing_run_id, generate_invoices, mark_overdue_payments as mark_overdue, set_billing_progress,
+)
+from .stats import reconcile_student_stats as reconcile_stats
 
 logger = logging.getLogger(__name__)
 
+
 @shared_task
-def create_weekly_attendance():
+def create_weekly_attendance(per_center=False, batch_size=ATTENDANCE_BATCH_SIZE, parallel=False):
     """
-    Har hafta dushanba kuni 00:00da har bir o'qituvchi uchun 
-    o'quvchilariga davomat yaratadi
+    Har hafta dushanba kuni 00:00da har bir o'qituvchi uchun
+    o'quvchilariga davomat yaratadi (core.attendance.generate_attendance).
+
+    Yaratilgan/o'tkazib yuborilgan sonlar, o'qituvchilar kesimi va
+    vaqt o'lchovlarini qaytaradi. parallel=True bo'lsa ish markazlar
+    bo'yicha shard'larga bo'linib chord orqali workerlar o'rtasida
+    taqsimlanadi, natija esa aggregate_weekly_attendance'da yig'iladi.
     """
     try:
-        # Faqat teacher rolidagi foydalanuvchilarni olish
-        teachers = User.objects.filter(role="teacher", is_active=True)
-        
-        created_count = 0
-        
-        for teacher in teachers:
-            # Har bir o'qituvchining o'quvchilarini olish
-            students = Student.objects.filter(
-                Q(teacher=teacher) | Q(created_by=teacher),
-                is_active=True
-            )
-            
-            for student in students:
-                # Bu hafta uchun davomat allaqachon mavjudligini tekshirish
-                today = timezone.now().date()
-                existing_attendance = Attendance.objects.filter(
-                    student=student,
-                    teacher=teacher,
-                    created_at__date=today
-                ).exists()
-                
-                if not existing_attendance:
-                    # Yangi davomat yaratish
-                    Attendance.objects.create(
-                        student=student,
-                        teacher=teacher,
-                        lesson_1=False,
-                        lesson_2=False,
-                        lesson_3=False,
-                        created_by=teacher
-                    )
-                    created_count += 1
-        
-        logger.info(f"Avtomatik davomat yaratildi: {created_count} ta")
-        return f"Yaratilgan davomatlar: {created_count} ta"
-        
+        if parallel:
+            return dispatch_weekly_attendance(batch_size=batch_size)
+
+        result = generate_attendance(per_center=per_center, batch_size=batch_size)
+
+        logger.info(
+            f"Avtomatik davomat yaratildi: {result['created']} ta "
+            f"({result['skipped']} ta o'tkazib yuborildi, {result['timings']['total']}s)"
+        )
+        if result.get('failed_centers'):
+            logger.error(f"Davomat yaratilmagan markazlar: {result['failed_centers']}")
+        return result
+
     except Exception as e:
         logger.error(f"Davomat yaratishda xatolik: {str(e)}")
-        return f"Xatolik: {str(e)}"
\ No newline at end of file
+        return {'error': str(e)}
+
+
+def dispatch_weekly_attendance(batch_size=ATTENDANCE_BATCH_SIZE):
+    """Har bir markaz uchun shard task yuborish va callback'ni chord'ga ulash"""
+    day = timezone.localdate().isoformat()
+    center_ids = fetch_center_ids()
+
+    if not center_ids:
+        logger.info("Davomat yaratish uchun faol o'qituvchilar topilmadi")
+        return {'date': day, 'shards': 0}
+
+    # task_id sifatida idempotency kaliti: qayta yuborilgan shard o'sha
+    # kalit bilan kuzatiladi, takroriy qatorlardan esa shard'ning o'zi himoyalaydi
+    header = [
+        create_center_attendance.si(center_id, day, batch_size).set(
+            task_id=attendance_idempotency_key(day, center_id)
+        )
+        for center_id in center_ids
+    ]
+    chord(header)(aggregate_weekly_attendance.s())
+
+    logger.info(f"Davomat yaratish {len(header)} ta shard'ga bo'lindi")
+    return {'date': day, 'shards': len(header)}
+
+
+@shared_task(
+    autoretry_for=(OperationalError,),
+    retry_backoff=True,
+    max_retries=3,
+)
+def create_center_attendance(center_id, day, batch_size=ATTENDANCE_BATCH_SIZE):
+    """Bitta markaz (shard) uchun davomat yaratish"""
+    return generate_center_attendance(center_id, day=day, batch_size=batch_size)
+
+
+@shared_task
+def aggregate_weekly_attendance(results):
+    """Chord callback: shard natijalarini yig'ish"""
+    result = merge_center_results(results)
+
+    logger.info(
+        f"Avtomatik davomat yaratildi: {result['created']} ta "
+        f"({result['skipped']} ta o'tkazib yuborildi, {len(results)} ta shard, "
+        f"eng sekini {result['timings']['slowest_shard']}s)"
+    )
+    return result
+
+
+@shared_task
+def reconcile_student_stats():
+    """
+    Har kecha StudentStats'ni xom qatorlar bilan solishtirib driftni tuzatadi.
+
+    30 kunlik davomat oynasi ham shu yerda suriladi.
+    """
+    result = reconcile_stats()
+
+    if result['drifted']:
+        logger.warning(
+            f"O'quvchi statistikasi tuzatildi: {result['drifted']} ta "
+            f"({result['checked']} ta tekshirildi)"
+        )
+    else:
+        logger.info(f"O'quvchi statistikasi mos: {result['checked']} ta tekshirildi")
+    return result
+
+
+@shared_task
+def mark_overdue_payments():
+    """Har kecha muddati o'tgan 'pending' to'lovlarni 'overdue' qiladi"""
+    return {'updated': mark_overdue()}
+
+
+@shared_task
+def archive_old_attendance():
+    """
+    Har oy ATTENDANCE_ARCHIVE_AFTER_DAYS kundan eski to'liq oylarni
+    AttendanceMonth arxiviga ko'chiradi (sozlama None bo'lsa o'chirilgan).
+    """
+    after_days = getattr(settings, 'ATTENDANCE_ARCHIVE_AFTER_DAYS', None)
+    if after_days is None:
+        return {'rows': 0, 'months': 0, 'disabled': True}
+
+    before = month_start(timezone.localdate() - timedelta(days=max(after_days, ARCHIVE_MIN_AGE_DAYS)))
+    result = archive_attendance(before)
+
+    logger.info(f"Davomat arxivlandi ({before} gacha): {result['rows']} ta qator, {result['months']} ta oy")
+    return result
+
+
+@shared_task(
+    bind=True,
+    autoretry_for=(OperationalError,),
+    retry_backoff=True,
+    max_retries=3,
+)
+def run_monthly_billing(self, center_id, period, amount, deadline, invoice_date=None, student_ids=None,
+                        teacher_id=None, created_by_id=None):
+    """
+    Markaz uchun oylik hisoblarni yaratish (core.billing.generate_invoices).
+
+    Sanalar ISO satr, amount satr ko'rinishida keladi (JSON serializer).
+    Holat keshda: core.billing.get_billing_progress(billing_run_id(...)).
+    OperationalError qayta uriniladi; holat faqat oxirgi urinishda yoki
+    boshqa xatoda FAILED bo'ladi.
+    """
+    period = date.fromisoformat(period)
+    try:
+        return generate_invoices(
+            center_id, period, Decimal(amount), date.fromisoformat(deadline),
+            date=date.fromisoformat(invoice_date) if invoice_date else None,
+            student_ids=student_ids, teacher_id=teacher_id, created_by_id=created_by_id,
+        )
+    except Exception as e:
+        if isinstance(e, OperationalError) and self.request.retries < self.max_retries:
+            logger.warning(
+                f"Oylik hisob qayta uriniladi ({center_id}, {period:%Y-%m}, "
+                f"{self.request.retries + 1}-urinish): {str(e)}"
+            )
+            raise
+        logger.error(f"Oylik hisob yaratishda xatolik ({center_id}, {period:%Y-%m}): {str(e)}")
+        set_billing_progress(billing_run_id(center_id, period), status=FAILED, error=str(e))
+        raise
@@ -0,0 +1,86 @@
+# core/tests/base.py
+"""Testlar uchun umumiy ma'lumotlar: ikki markaz, har birida admin va o'qituvchi"""
+from django.conf import settings
+from django.core.cache import caches
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from django.utils import timezone
+from rest_framework.test import APITestCase
+
+from account.authentication import ClaimsRefreshToken
+from account.models import User
+from core.models import LearningCenter, Student
+
+PASSWORD = 'parol-12345'
+
+
+def create_user(phone_number, role, center=None, created_by=None, **extra):
+    return User.objects.create_user(
+        phone_number, PASSWORD, role=role, center=center, created_by=created_by, **extra
+    )
+
+
+def create_center(name, created_by=None):
+    return LearningCenter.objects.create(
+        name=name, address="Toshkent", phone_number="+998901234567",
+        email="markaz@example.com", director="Direktor", created_by=created_by,
+    )
+
+
+def create_student(teacher, center, created_by=None, **extra):
+    fields = {
+        'first_name': "Ali", 'last_name': "Valiyev", 'age': 12, 'phone_number': "+998901112233",
+        'address': "Toshkent", 'subject': "Matematika", **extra,
+    }
+    return Student.objects.create(teacher=teacher, center=center, created_by=created_by, **fields)
+
+
+class APITestBase(APITestCase):
+    """
+    Ikki markaz: center (admin, teacher) va other_center (other_admin,
+    other_teacher). Har bir testdan oldin kesh tozalanadi.
+    """
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.superadmin = create_user("+998900000001", "superadmin", is_staff=True, is_superuser=True)
+        cls.center = create_center("Markaz A", cls.superadmin)
+        cls.other_center = create_center("Markaz B", cls.superadmin)
+        cls.admin = create_user("+998900000002", "admin", cls.center, cls.superadmin)
+        cls.other_admin = create_user("+998900000003", "admin", cls.other_center, cls.superadmin)
+        cls.teacher = create_user("+998900000004", "teacher", cls.center, cls.admin, first_name="Olim")
+        cls.other_teacher = create_user("+998900000005", "teacher", cls.other_center, cls.other_admin)
+        cls.today = timezone.localdate()
+
+    def setUp(self):
+        for alias in settings.CACHES:
+            caches[alias].clear()
+
+    def authenticate(self, user):
+        token = ClaimsRefreshToken.for_user(user)
+        self.client.credentials(HTTP_AUTHORIZATION=f'Bearer {token.access_token}')
+
+    def create_students(self, count, teacher=None, center=None, **extra):
+        teacher = teacher or self.teacher
+        return [
+            create_student(teacher, center or teacher.center, created_by=self.admin, last_name=f"O'quvchi {i}", **extra)
+            for i in range(count)
+        ]
+
+    def assertQueriesFlat(self, url, add_rows):
+        """
+        Ro'yxat so'rovlari soni sahifadagi qatorlar soniga bog'liq emasligini tekshirish.
+
+        Avval kesh (foydalanuvchi holati, throttle) isitiladi, keyin qatorlar
+        ko'paytirilib so'rovlar soni solishtiriladi.
+        """
+        self.assertEqual(self.client.get(url).status_code, 200)
+        with CaptureQueriesContext(connection) as context:
+            response = self.client.get(url)
+        self.assertEqual(response.status_code, 200)
+        small_page = len(response.data['results'])
+
+        add_rows()
+        with self.assertNumQueries(len(context.captured_queries)):
+            response = self.client.get(url)
+        self.assertGreater(len(response.data['results']), small_page)
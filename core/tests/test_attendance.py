@@ -0,0 +1,191 @@
+# core/tests/test_attendance.py
+"""Davomat: bir kunlik upsert, butun sinf uchun bulk va oylik arxiv"""
+from datetime import timedelta
+
+from django.utils import timezone
+
+from core.attendance_archive import (
+    archive_attendance, archived_attendance_rate, archived_attendances, month_start, next_month,
+)
+from core.models import Attendance, AttendanceMonth, StudentStats
+from core.stats import reconcile_student_stats
+
+from .base import APITestBase, create_student
+
+
+class AttendanceUpsertTests(APITestBase):
+
+    def setUp(self):
+        super().setUp()
+        self.student = self.create_students(1)[0]
+        self.authenticate(self.teacher)
+
+    def post(self, **lessons):
+        return self.client.post(
+            '/api/attendances/', {'student': self.student.pk, 'teacher': self.teacher.pk, **lessons}
+        )
+
+    def test_first_post_creates(self):
+        response = self.post(lesson_1=True)
+
+        self.assertEqual(response.status_code, 201)
+        self.assertEqual(response.data['lesson_date'], self.today.isoformat())
+        self.assertEqual(StudentStats.objects.get(pk=self.student.pk).attended_lessons_30d, 1)
+
+    def test_second_post_same_day_updates(self):
+        first = self.post(lesson_1=True)
+        response = self.post(lesson_2=True)
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.data['id'], first.data['id'])
+        attendance = Attendance.objects.get()
+        self.assertEqual((attendance.lesson_1, attendance.lesson_2), (True, True))
+        self.assertEqual(StudentStats.objects.get(pk=self.student.pk).attended_lessons_30d, 2)
+
+    def test_other_teachers_student_rejected(self):
+        self.authenticate(self.other_teacher)
+
+        response = self.post(lesson_1=True)
+
+        self.assertEqual(response.status_code, 400)
+        self.assertFalse(Attendance.objects.exists())
+
+
+class AttendanceBulkTests(APITestBase):
+    url = '/api/attendances/bulk/'
+
+    def setUp(self):
+        super().setUp()
+        self.students = self.create_students(3)
+        self.authenticate(self.teacher)
+
+    def items(self, students, **lessons):
+        return [{'student_id': student.pk, **lessons} for student in students]
+
+    def test_marks_whole_class(self):
+        Attendance.objects.create(student=self.students[0], teacher=self.teacher, lesson_1=True)
+
+        response = self.client.post(
+            self.url, {'items': self.items(self.students, lesson_1=True, lesson_2=True, lesson_3=True)},
+            format='json',
+        )
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(
+            {key: response.data[key] for key in ('count', 'created', 'updated', 'full')},
+            {'count': 3, 'created': 2, 'updated': 1, 'full': 3},
+        )
+        self.assertEqual(Attendance.objects.filter(lesson_date=self.today, lesson_3=True).count(), 3)
+        self.assertEqual(StudentStats.objects.get(pk=self.students[0].pk).attended_lessons_30d, 3)
+        self.assertEqual(reconcile_student_stats()['drifted'], 0)
+
+    def test_admin_marks_for_students_teacher(self):
+        self.authenticate(self.admin)
+
+        response = self.client.post(self.url, {'items': self.items(self.students[:1], lesson_1=True)}, format='json')
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(Attendance.objects.get().teacher, self.teacher)
+
+    def test_rejects_per_item(self):
+        teacherless = self.create_students(1, center=self.center)[0]
+        teacherless.teacher = None
+        teacherless.save()
+        self.authenticate(self.admin)
+        foreign = create_student(self.other_teacher, self.other_center, created_by=self.other_admin)
+
+        response = self.client.post(
+            self.url, {'items': self.items([self.students[0], teacherless, foreign], lesson_1=True)},
+            format='json',
+        )
+
+        self.assertEqual(response.status_code, 400)
+        errors = response.data['items']
+        self.assertEqual(errors[0], {})
+        self.assertIn('student_id', errors[1])
+        self.assertIn('student_id', errors[2])
+        self.assertFalse(Attendance.objects.exists())
+
+    def test_duplicate_students_rejected(self):
+        response = self.client.post(
+            self.url, {'items': self.items([self.students[0], self.students[0]])}, format='json'
+        )
+
+        self.assertEqual(response.status_code, 400)
+
+    def test_requires_authentication(self):
+        self.client.credentials()
+
+        response = self.client.post(self.url, {'items': self.items(self.students)}, format='json')
+
+        self.assertEqual(response.status_code, 401)
+
+
+class AttendanceArchiveTests(APITestBase):
+
+    def setUp(self):
+        super().setUp()
+        self.student = self.create_students(1)[0]
+        self.month = month_start(self.today - timedelta(days=70))
+        marks = {1: (True, True, True), 2: (True, False, False), 5: (False, False, False)}
+        Attendance.objects.bulk_create([
+            Attendance(
+                student=self.student, teacher=self.teacher, lesson_date=self.month.replace(day=day),
+                lesson_1=lesson_1, lesson_2=lesson_2, lesson_3=lesson_3,
+            )
+            for day, (lesson_1, lesson_2, lesson_3) in marks.items()
+        ])
+        # Arxivlanadigan qatorlar 30 kunlik statistika oynasidan tashqarida
+        Attendance.objects.update(created_at=timezone.now() - timedelta(days=70))
+        self.recent = Attendance.objects.create(student=self.student, teacher=self.teacher, lesson_1=True)
+        self.original = sorted(
+            Attendance.objects.exclude(pk=self.recent.pk).values_list('lesson_date', 'lesson_1', 'lesson_2', 'lesson_3')
+        )
+
+    def test_round_trip(self):
+        result = archive_attendance(next_month(self.month))
+
+        self.assertEqual(result, {'rows': 3, 'months': 1})
+        self.assertEqual(list(Attendance.objects.all()), [self.recent])
+        months = list(AttendanceMonth.objects.all())
+        restored = sorted(
+            (attendance.lesson_date, attendance.lesson_1, attendance.lesson_2, attendance.lesson_3)
+            for attendance in archived_attendances(months)
+        )
+        self.assertEqual(restored, self.original)
+        # 4 ta dars 3 kunda (9 ta darsdan)
+        self.assertEqual(archived_attendance_rate(months, self.month, next_month(self.month)), 44.44)
+        self.assertEqual(reconcile_student_stats()['drifted'], 0)
+
+    def test_rerun_is_noop(self):
+        archive_attendance(next_month(self.month))
+
+        self.assertEqual(archive_attendance(next_month(self.month)), {'rows': 0, 'months': 0})
+        self.assertEqual(AttendanceMonth.objects.count(), 1)
+
+    def test_recent_rows_cannot_be_archived(self):
+        with self.assertRaises(ValueError):
+            archive_attendance(self.today)
+
+    def test_archive_endpoint(self):
+        archive_attendance(next_month(self.month))
+        self.authenticate(self.admin)
+
+        response = self.client.get(
+            f'/api/students/{self.student.pk}/attendance/archive/?month={self.month:%Y-%m}'
+        )
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.data['attendance_rate'], 44.44)
+        self.assertEqual(
+            [row['lesson_date'] for row in response.data['results']],
+            [self.month.replace(day=day).isoformat() for day in (5, 2, 1)],
+        )
+
+    def test_archive_endpoint_scoped_to_center(self):
+        archive_attendance(next_month(self.month))
+        self.authenticate(self.other_admin)
+
+        response = self.client.get(f'/api/students/{self.student.pk}/attendance/archive/')
+
+        self.assertEqual(response.data['results'], [])
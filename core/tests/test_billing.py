@@ -0,0 +1,158 @@
+# core/tests/test_billing.py
+"""Oylik hisob: endpoint, qayta ishga tushirish, qayta urinishlar"""
+from datetime import timedelta
+from unittest import mock
+
+from django.core.cache import cache
+from django.db import OperationalError
+
+from core.billing import (
+    DONE, FAILED, PENDING, RUNNING, _insert_invoices, billing_run_id, claim_billing_run,
+    get_billing_progress, set_billing_progress,
+)
+from core.models import Payment, StudentStats
+from core.stats import reconcile_student_stats
+from core.tasks import run_monthly_billing
+
+from .base import APITestBase
+
+URL = '/api/payments/billing_run/'
+
+
+class BillingRunTests(APITestBase):
+
+    def setUp(self):
+        super().setUp()
+        self.students = self.create_students(3)
+        self.period = self.today.replace(day=1)
+        self.authenticate(self.admin)
+
+    def start(self, **data):
+        return self.client.post(URL, {
+            'period': f'{self.period:%Y-%m}', 'amount': '300000',
+            'deadline': (self.period + timedelta(days=9)).isoformat(), **data,
+        }, format='json')
+
+    def test_run_creates_invoices(self):
+        response = self.start()
+
+        self.assertEqual(response.status_code, 202)
+        self.assertEqual(response.data['run_id'], billing_run_id(self.center.pk, self.period))
+        self.assertEqual(Payment.objects.filter(period=self.period, status='pending').count(), 3)
+        self.assertEqual(StudentStats.objects.get(pk=self.students[0].pk).payment_count, 1)
+
+        status = self.client.get(URL, {'period': f'{self.period:%Y-%m}'})
+        self.assertEqual(status.data['status'], DONE)
+        self.assertEqual((status.data['created'], status.data['skipped']), (3, 0))
+
+    def test_rerun_only_invoices_new_students(self):
+        self.start()
+        self.create_students(1)
+
+        self.start()
+
+        progress = get_billing_progress(billing_run_id(self.center.pk, self.period))
+        self.assertEqual((progress['created'], progress['skipped']), (1, 3))
+        self.assertEqual(Payment.objects.filter(period=self.period).count(), 4)
+        self.assertEqual(reconcile_student_stats()['drifted'], 0)
+
+    def test_running_run_conflicts(self):
+        with mock.patch('core.views.run_monthly_billing.apply_async'):
+            self.start()
+
+        self.assertEqual(self.start().status_code, 409)
+
+    def test_conflict_does_not_enqueue(self):
+        with mock.patch('core.views.run_monthly_billing.apply_async') as apply_async:
+            self.start()
+            response = self.start()
+
+        self.assertEqual(response.status_code, 409)
+        self.assertEqual(response.data['status'], PENDING)
+        apply_async.assert_called_once()
+
+    def test_claim_is_atomic(self):
+        run_id = billing_run_id(self.center.pk, self.period)
+
+        self.assertEqual(claim_billing_run(run_id)['status'], PENDING)
+        self.assertIsNone(claim_billing_run(run_id))
+
+        set_billing_progress(run_id, status=DONE)
+        # Tugagan ish ustidan parallel qayta ishga tushirish qulf bilan
+        cache.add(f"{run_id}:claim", True)
+        self.assertIsNone(claim_billing_run(run_id))
+        cache.delete(f"{run_id}:claim")
+        self.assertEqual(claim_billing_run(run_id)['status'], PENDING)
+        self.assertIsNone(claim_billing_run(run_id))
+
+    def test_status_scoped_to_own_center(self):
+        self.start()
+        self.authenticate(self.other_admin)
+
+        response = self.client.get(URL, {'period': f'{self.period:%Y-%m}', 'center': self.center.pk})
+
+        self.assertEqual(response.status_code, 404)
+
+    def test_conflicting_rows_not_counted(self):
+        Payment.objects.create(
+            student=self.students[0], period=self.period, date=self.period, amount=100, deadline=self.period
+        )
+        payments = [
+            Payment(student=student, period=self.period, date=self.period, amount=100, deadline=self.period)
+            for student in self.students
+        ]
+
+        inserted = _insert_invoices(payments)
+
+        self.assertEqual(sorted(inserted), [student.pk for student in self.students[1:]])
+        self.assertEqual(Payment.objects.filter(period=self.period).count(), 3)
+
+
+class BillingRetryTests(APITestBase):
+
+    def setUp(self):
+        super().setUp()
+        self.period = self.today.replace(day=1)
+        self.run_id = billing_run_id(self.center.pk, self.period)
+        self.kwargs = {
+            'center_id': self.center.pk, 'period': self.period.isoformat(), 'amount': '100',
+            'deadline': self.period.isoformat(),
+        }
+
+    def run_task(self, side_effect, retries=0):
+        with mock.patch('core.tasks.generate_invoices', side_effect=side_effect) as generate:
+            result = run_monthly_billing.apply(
+                kwargs=self.kwargs, task_id=self.run_id, retries=retries, throw=False
+            )
+        return result, generate
+
+    def test_retryable_error_does_not_mark_failed(self):
+        statuses = []
+
+        def flaky(*args, **kwargs):
+            statuses.append((get_billing_progress(self.run_id) or {}).get('status'))
+            if len(statuses) == 1:
+                set_billing_progress(self.run_id, status=RUNNING)
+                raise OperationalError("database is locked")
+            return {'created': 0}
+
+        result, generate = self.run_task(flaky)
+
+        self.assertEqual(result.get(), {'created': 0})
+        self.assertEqual(generate.call_count, 2)
+        self.assertEqual(statuses[1], RUNNING)
+
+    def test_marks_failed_after_last_retry(self):
+        result, generate = self.run_task(
+            OperationalError("database is locked"), retries=run_monthly_billing.max_retries
+        )
+
+        self.assertEqual(generate.call_count, 1)
+        self.assertEqual(get_billing_progress(self.run_id)['status'], FAILED)
+        self.assertTrue(result.failed())
+
+    def test_other_errors_fail_immediately(self):
+        result, generate = self.run_task(ValueError("bad amount"))
+
+        self.assertEqual(generate.call_count, 1)
+        self.assertEqual(get_billing_progress(self.run_id)['status'], FAILED)
@@ -0,0 +1,196 @@
+# core/tests/test_dashboard.py
+"""Dashboard statistikasi: rollar bo'yicha natijalar, so'rovlar soni va markaz versiyali kesh"""
+from datetime import timedelta
+
+from django.db.models import Avg
+from django.utils import timezone
+
+from account.models import User
+from core.cache import DASHBOARD_VERSION_GLOBAL, _bump_dashboard, dashboard_center_version_key, get_version
+from core.dashboard import EMPTY_STATS, compute_dashboard_stats, dashboard_spec, get_dashboard_stats
+from core.models import Attendance, Grade, Homework, News, Payment, Student
+
+from .base import APITestBase, create_student, create_user
+
+
+def legacy_dashboard_stats(user):
+    """
+    Avvalgi DashboardStatsAPIView'dagi qo'lda yozilgan tarmoqlar (har bir
+    ko'rsatkich alohida so'rov). today_attendance lesson_date bo'yicha.
+    """
+    stats = dict(EMPTY_STATS)
+    center = user.center
+    today = timezone.localdate()
+
+    if user.role == "superadmin":
+        students, teachers = Student.objects.all(), User.objects.filter(role="teacher")
+        homeworks, payments, news = Homework.objects.all(), Payment.objects.all(), News.objects.all()
+        grades, attendances = Grade.objects.all(), Attendance.objects.all()
+    elif user.role in ["admin", "admin_mini", "teacher"] and center:
+        students = Student.objects.filter(center=center)
+        teachers = User.objects.filter(center=center, role="teacher")
+        payments = Payment.objects.filter(student__center=center)
+        news = News.objects.filter(center=center)
+        if user.role == "teacher":
+            homeworks = Homework.objects.filter(teacher=user)
+            grades = Grade.objects.filter(teacher=user)
+            attendances = Attendance.objects.filter(teacher=user)
+        else:
+            homeworks = Homework.objects.filter(center=center)
+            grades = Grade.objects.filter(student__center=center)
+            attendances = Attendance.objects.filter(student__center=center)
+    else:
+        return stats
+
+    grade_avg = grades.aggregate(Avg('score'))['score__avg']
+    stats.update({
+        'total_students': students.count(),
+        'active_students': students.filter(is_active=True).count(),
+        'total_teachers': teachers.count(),
+        'active_teachers': teachers.filter(is_active=True).count(),
+        'total_homeworks': homeworks.count(),
+        'active_homeworks': homeworks.filter(is_active=True).count(),
+        'upcoming_homeworks': homeworks.filter(due_date__gte=today, is_active=True).count(),
+        'overdue_homeworks': homeworks.filter(due_date__lt=today, is_active=True).count(),
+        'total_payments': payments.count(),
+        'pending_payments': payments.filter(status='pending').count(),
+        'total_news': news.count(),
+        'total_grades': grades.count(),
+        'average_grade': round(grade_avg, 2) if grade_avg else 0,
+        'total_attendance': attendances.count(),
+        'today_attendance': attendances.filter(lesson_date=today).count(),
+    })
+    return stats
+
+
+class DashboardTestBase(APITestBase):
+
+    @classmethod
+    def setUpTestData(cls):
+        super().setUpTestData()
+        cls.admin_mini = create_user("+998900000007", "admin_mini", cls.center, cls.admin)
+        cls.second_teacher = create_user("+998900000008", "teacher", cls.center, cls.admin, is_active=False)
+        today = timezone.localdate()
+
+        for teacher, center, admin in (
+            (cls.teacher, cls.center, cls.admin),
+            (cls.second_teacher, cls.center, cls.admin),
+            (cls.other_teacher, cls.other_center, cls.other_admin),
+        ):
+            students = [
+                create_student(teacher, center, created_by=admin, is_active=i != 0) for i in range(3)
+            ]
+            for i, student in enumerate(students):
+                Grade.objects.create(
+                    student=student, teacher=teacher, subject="Matematika", score=60 + 7 * i,
+                    date=today - timedelta(days=i),
+                )
+                Attendance.objects.create(
+                    student=student, teacher=teacher, lesson_date=today - timedelta(days=i), lesson_1=True,
+                )
+                Payment.objects.create(
+                    student=student, date=today, amount=100, deadline=today,
+                    status='paid' if i == 0 else 'pending',
+                )
+            for due, is_active in ((3, True), (-3, True), (1, False)):
+                Homework.objects.create(
+                    title="Vazifa", description="-", due_date=today + timedelta(days=due),
+                    teacher=teacher, center=center, is_active=is_active,
+                )
+            News.objects.create(title="Yangilik", body="-", center=center, created_by=admin)
+
+
+class DashboardStatsTests(DashboardTestBase):
+
+    def test_matches_legacy_branches_for_each_role(self):
+        centerless = create_user("+998900000009", "admin", created_by=self.superadmin)
+
+        for user in (
+            self.superadmin, self.admin, self.admin_mini, self.teacher,
+            self.second_teacher, self.other_admin, self.other_teacher, centerless,
+        ):
+            with self.subTest(role=user.role, user=user.phone_number):
+                self.assertEqual(compute_dashboard_stats(user), legacy_dashboard_stats(user))
+
+    def test_spot_values(self):
+        stats = compute_dashboard_stats(self.teacher)
+
+        self.assertEqual((stats['total_students'], stats['active_students']), (6, 4))
+        self.assertEqual((stats['total_teachers'], stats['active_teachers']), (2, 1))
+        self.assertEqual((stats['total_homeworks'], stats['upcoming_homeworks'], stats['overdue_homeworks']), (3, 1, 1))
+        self.assertEqual((stats['total_grades'], stats['average_grade']), (3, 67))
+        self.assertEqual((stats['total_attendance'], stats['today_attendance']), (3, 1))
+
+    def test_one_query_per_model(self):
+        self.authenticate(self.teacher)
+        # Foydalanuvchi holati va throttle keshini isitish
+        self.assertEqual(self.client.get('/api/dashboard/stats/').status_code, 200)
+        _bump_dashboard(self.center.pk)
+
+        with self.assertNumQueries(len(dashboard_spec(timezone.localdate()))):
+            response = self.client.get('/api/dashboard/stats/')
+
+        self.assertEqual(response.data, legacy_dashboard_stats(self.teacher))
+
+
+class DashboardCacheTests(DashboardTestBase):
+
+    def versions(self):
+        return {
+            center: get_version(dashboard_center_version_key(center.pk))
+            for center in (self.center, self.other_center)
+        }
+
+    def assertBumpsOnly(self, center, change):
+        before, global_before = self.versions(), get_version(DASHBOARD_VERSION_GLOBAL)
+
+        with self.captureOnCommitCallbacks(execute=True):
+            change()
+
+        after = self.versions()
+        for other in after:
+            if other == center:
+                self.assertGreater(after[other], before[other])
+            else:
+                self.assertEqual(after[other], before[other])
+        self.assertGreater(get_version(DASHBOARD_VERSION_GLOBAL), global_before)
+
+    def test_second_call_served_from_cache(self):
+        first = get_dashboard_stats(self.admin)
+
+        with self.assertNumQueries(0):
+            self.assertEqual(get_dashboard_stats(self.admin), first)
+
+    def test_save_and_delete_bump_only_own_center(self):
+        student = Student.objects.filter(center=self.center).first()
+        grade = Grade.objects.filter(student__center=self.center).first()
+        attendance = Attendance.objects.filter(student__center=self.center).first()
+        payment = Payment.objects.filter(student__center=self.center).first()
+        homework = Homework.objects.filter(center=self.center).first()
+        news = News.objects.filter(center=self.center).first()
+
+        for instance in (grade, attendance, payment, homework, news, student):
+            with self.subTest(model=type(instance).__name__):
+                self.assertBumpsOnly(self.center, instance.save)
+                self.assertBumpsOnly(self.center, instance.delete)
+
+    def test_other_center_edit_keeps_cached_stats(self):
+        get_dashboard_stats(self.admin)
+        other = Student.objects.filter(center=self.other_center).first()
+
+        with self.captureOnCommitCallbacks(execute=True):
+            other.is_active = not other.is_active
+            other.save()
+
+        with self.assertNumQueries(0):
+            get_dashboard_stats(self.admin)
+
+    def test_own_center_edit_recomputes(self):
+        before = get_dashboard_stats(self.admin)
+        student = Student.objects.filter(center=self.center, is_active=True).first()
+
+        with self.captureOnCommitCallbacks(execute=True):
+            student.is_active = False
+            student.save()
+
+        self.assertEqual(get_dashboard_stats(self.admin)['active_students'], before['active_students'] - 1)
@@ -0,0 +1,108 @@
+# core/tests/test_grades.py
+"""Baholar: imtihon natijalarini ommaviy kiritish"""
+from datetime import timedelta
+
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+
+from core.models import Grade, StudentStats
+from core.stats import reconcile_student_stats
+
+from .base import APITestBase, create_student
+
+
+class GradeBulkTests(APITestBase):
+    url = '/api/grades/bulk/'
+
+    def setUp(self):
+        super().setUp()
+        self.students = self.create_students(3)
+        self.authenticate(self.teacher)
+
+    def post(self, items, **data):
+        return self.client.post(
+            self.url, {'subject': "Matematika", 'date': self.today.isoformat(), 'items': items, **data},
+            format='json',
+        )
+
+    def test_creates_then_updates(self):
+        first = self.post([{'student_id': student.pk, 'score': 70} for student in self.students])
+        response = self.post([
+            {'student_id': self.students[0].pk, 'score': 95, 'comment': "Qayta topshirdi"},
+            {'student_id': self.students[1].pk, 'score': 80},
+        ])
+
+        self.assertEqual((first.data['created'], first.data['updated']), (3, 0))
+        self.assertEqual((response.data['created'], response.data['updated']), (0, 2))
+        self.assertEqual(response.data['results'][0]['id'], first.data['results'][0]['id'])
+        self.assertEqual(Grade.objects.count(), 3)
+        grade = Grade.objects.get(student=self.students[0])
+        self.assertEqual((grade.score, grade.comment), (95, "Qayta topshirdi"))
+        self.assertEqual(StudentStats.objects.get(pk=self.students[0].pk).grade_sum, 95)
+        self.assertEqual(reconcile_student_stats()['drifted'], 0)
+
+    def test_invalid_items_do_not_block_valid(self):
+        foreign = create_student(self.other_teacher, self.other_center, created_by=self.other_admin)
+
+        response = self.post([
+            {'student_id': self.students[0].pk, 'score': 90},
+            {'student_id': self.students[1].pk, 'score': 150},
+            {'student_id': foreign.pk, 'score': 90},
+            {'student_id': self.students[0].pk, 'score': 60},
+        ])
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.data['created'], 1)
+        self.assertEqual([error['index'] for error in response.data['errors']], [1, 2, 3])
+        self.assertEqual(list(Grade.objects.values_list('student', 'score')), [(self.students[0].pk, 90)])
+
+    def test_all_invalid_is_bad_request(self):
+        response = self.post([{'student_id': self.students[0].pk, 'score': 0}])
+
+        self.assertEqual(response.status_code, 400)
+        self.assertFalse(Grade.objects.exists())
+
+    def test_query_count_does_not_grow_with_items(self):
+        def count_queries(students):
+            with CaptureQueriesContext(connection) as context:
+                self.post([{'student_id': student.pk, 'score': 80} for student in students])
+            return len(context.captured_queries)
+
+        # Birinchi so'rov keshni (foydalanuvchi holati, throttle) isitadi
+        count_queries(self.students[:1])
+        self.assertEqual(count_queries(self.students[1:2]), count_queries(self.create_students(10)))
+
+
+class GradeSameDayTests(APITestBase):
+
+    def setUp(self):
+        super().setUp()
+        # GradeSerializer.validate_date UTC sanasi bilan solishtiradi
+        self.yesterday = self.today - timedelta(days=1)
+        self.student = self.create_students(1)[0]
+        self.authenticate(self.teacher)
+
+    def post(self, **data):
+        return self.client.post('/api/grades/', {
+            'student': self.student.pk, 'subject': "Matematika", 'score': 80,
+            'date': self.yesterday.isoformat(), **data,
+        })
+
+    def test_second_grade_same_day_allowed(self):
+        # Masalan og'zaki va yozma ish
+        self.assertEqual(self.post().status_code, 201)
+
+        self.assertEqual(self.post(score=90).status_code, 201)
+        self.assertEqual(Grade.objects.count(), 2)
+
+    def test_bulk_updates_latest_of_duplicates(self):
+        self.post()
+        latest = self.post(score=90).data['id']
+
+        response = self.client.post('/api/grades/bulk/', {
+            'subject': "Matematika", 'date': self.yesterday.isoformat(),
+            'items': [{'student_id': self.student.pk, 'score': 100}],
+        }, format='json')
+
+        self.assertEqual(response.data['results'][0]['id'], latest)
+        self.assertEqual(sorted(Grade.objects.values_list('score', flat=True)), [80, 100])
@@ -0,0 +1,242 @@
+# core/tests/test_homeworks.py
+"""Uy vazifalari: fayl metadata'si, qisqa ro'yxat serializer'i, ommaviy biriktirish va o'quvchi statistikasi"""
+import hashlib
+import shutil
+import tempfile
+from datetime import timedelta
+from io import StringIO
+from unittest import mock
+
+from django.core.files.base import ContentFile
+from django.core.files.storage import FileSystemStorage
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.core.management import call_command
+from django.db import connection
+from django.test import override_settings
+from django.test.utils import CaptureQueriesContext
+
+from core.homeworks import assign_homeworks
+from core.models import Homework, Student, StudentStats
+from core.serializers import HomeworkListSerializer
+from core.stats import reconcile_student_stats
+
+from .base import APITestBase, create_student
+
+MEDIA_ROOT = tempfile.mkdtemp()
+CONTENT = b'%PDF-1.4 vazifa'
+
+
+@override_settings(MEDIA_ROOT=MEDIA_ROOT)
+class HomeworkFileTests(APITestBase):
+
+    @classmethod
+    def tearDownClass(cls):
+        super().tearDownClass()
+        shutil.rmtree(MEDIA_ROOT, ignore_errors=True)
+
+    def add_homework(self, content=CONTENT, name='vazifa.pdf'):
+        homework = Homework(
+            title="Vazifa", description="-", due_date=self.today, teacher=self.teacher, center=self.center,
+            created_by=self.teacher, homework_file=ContentFile(content, name=name),
+        )
+        homework.save()
+        return homework
+
+    def test_upload_stores_metadata(self):
+        self.authenticate(self.teacher)
+
+        response = self.client.post('/api/homeworks/', {
+            'title': "Vazifa", 'description': "1-10 misollarni yechish", 'due_date': self.today.isoformat(),
+            'homework_file': SimpleUploadedFile('vazifa.pdf', CONTENT, content_type='application/pdf'),
+        }, format='multipart')
+
+        self.assertEqual(response.status_code, 201)
+        homework = Homework.objects.get()
+        self.assertEqual(
+            (homework.file_size, homework.file_content_type, homework.file_checksum),
+            (len(CONTENT), 'application/pdf', hashlib.sha256(CONTENT).hexdigest()),
+        )
+        self.assertEqual(response.data['file_checksum'], homework.file_checksum)
+
+    def test_clearing_file_resets_metadata(self):
+        homework = self.add_homework()
+        self.authenticate(self.teacher)
+
+        response = self.client.patch(f'/api/homeworks/{homework.pk}/', {'homework_file': None}, format='json')
+
+        self.assertEqual(response.status_code, 200)
+        homework.refresh_from_db()
+        self.assertEqual((homework.file_size, homework.file_content_type, homework.file_checksum), (None, '', ''))
+
+    def test_reads_do_not_touch_storage(self):
+        homework = self.add_homework()
+        self.authenticate(self.teacher)
+
+        with mock.patch.multiple(
+            FileSystemStorage, open=mock.DEFAULT, size=mock.DEFAULT, exists=mock.DEFAULT
+        ) as storage:
+            self.assertEqual(self.client.get('/api/homeworks/').status_code, 200)
+            response = self.client.get(f'/api/homeworks/{homework.pk}/')
+
+        self.assertEqual(response.data['file_size'], f"{len(CONTENT)} B")
+        for method in storage.values():
+            method.assert_not_called()
+
+    def test_backfill_fills_empty_checksums(self):
+        homework = self.add_homework()
+        Homework.objects.update(file_size=None, file_content_type='', file_checksum='')
+        missing = self.add_homework(name='yoq.pdf')
+        missing.homework_file.storage.delete(missing.homework_file.name)
+        Homework.objects.filter(pk=missing.pk).update(file_checksum='')
+        out = StringIO()
+
+        call_command('backfill_homework_files', stdout=out)
+
+        homework.refresh_from_db()
+        self.assertEqual(
+            (homework.file_size, homework.file_content_type, homework.file_checksum),
+            (len(CONTENT), 'application/pdf', hashlib.sha256(CONTENT).hexdigest()),
+        )
+        self.assertIn("Jami: 1 ta", out.getvalue())
+        self.assertIn(f"#{missing.pk}", out.getvalue())
+        self.assertIn("1 ta fayl topilmadi", out.getvalue())
+
+    def test_backfill_all_recomputes_existing(self):
+        homework = self.add_homework()
+        Homework.objects.update(file_size=1)
+
+        call_command('backfill_homework_files', stdout=StringIO())
+        homework.refresh_from_db()
+        self.assertEqual(homework.file_size, 1)
+
+        call_command('backfill_homework_files', '--all', stdout=StringIO())
+        homework.refresh_from_db()
+        self.assertEqual(homework.file_size, len(CONTENT))
+
+
+class HomeworkListTests(APITestBase):
+
+    def setUp(self):
+        super().setUp()
+        self.students = self.create_students(3)
+        self.homework = self.add_homework(self.students)
+        self.authenticate(self.teacher)
+
+    def add_homework(self, students, **extra):
+        homework = Homework.objects.create(
+            title="Vazifa", description="-", due_date=self.today + timedelta(days=3), teacher=self.teacher,
+            center=self.center, created_by=self.teacher, **extra,
+        )
+        homework.students.add(*students)
+        return homework
+
+    def test_list_actions_use_short_serializer(self):
+        for url in (
+            '/api/homeworks/',
+            '/api/homeworks/active/',
+            '/api/homeworks/upcoming/',
+            '/api/homeworks/by_teacher/',
+            f'/api/homeworks/by_student/?student_id={self.students[0].pk}',
+        ):
+            with self.subTest(url=url):
+                response = self.client.get(url)
+
+                self.assertEqual(response.status_code, 200)
+                row = response.data['results'][0]
+                self.assertEqual(set(row), set(HomeworkListSerializer.Meta.fields))
+                self.assertEqual(row['student_count'], 3)
+
+    def test_retrieve_includes_students(self):
+        response = self.client.get(f'/api/homeworks/{self.homework.pk}/')
+
+        self.assertEqual(response.data['student_count'], 3)
+        self.assertEqual(
+            sorted(student['id'] for student in response.data['students_info']),
+            [student.pk for student in self.students],
+        )
+
+    def test_expand_students_on_list(self):
+        response = self.client.get('/api/homeworks/?expand=students')
+
+        row = response.data['results'][0]
+        self.assertEqual(len(row['students_info']), 3)
+        self.assertEqual(row['student_count'], 3)
+
+    def test_list_queries_do_not_grow_with_students(self):
+        def count_queries(url):
+            with CaptureQueriesContext(connection) as context:
+                self.assertEqual(self.client.get(url).status_code, 200)
+            return len(context.captured_queries)
+
+        for url in ('/api/homeworks/', '/api/homeworks/?expand=students'):
+            with self.subTest(url=url):
+                # Birinchi so'rov keshni (foydalanuvchi holati, throttle) isitadi
+                count_queries(url)
+                before = count_queries(url)
+                self.homework.students.add(*self.create_students(10))
+                self.add_homework(self.create_students(5))
+
+                self.assertEqual(count_queries(url), before)
+
+
+class AssignHomeworkTests(APITestBase):
+
+    def setUp(self):
+        super().setUp()
+        self.students = self.create_students(3)
+        self.homework = self.add_homework()
+
+    def add_homework(self, is_active=True):
+        return Homework.objects.create(
+            title="Vazifa", description="-", due_date=self.today, teacher=self.teacher, center=self.center,
+            created_by=self.teacher, is_active=is_active,
+        )
+
+    def assign(self, student_ids):
+        return self.client.post(
+            f'/api/homeworks/{self.homework.pk}/assign_students/', {'student_ids': student_ids}, format='json'
+        )
+
+    def test_assign_endpoint(self):
+        self.authenticate(self.teacher)
+
+        response = self.assign([student.pk for student in self.students])
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual((response.data['students'], response.data['assigned']), (3, 3))
+        self.assertEqual(self.homework.students.count(), 3)
+        self.assertEqual(StudentStats.objects.get(pk=self.students[0].pk).active_homework_count, 1)
+
+    def test_reassign_does_not_double_count(self):
+        self.authenticate(self.teacher)
+        self.assign([self.students[0].pk])
+
+        response = self.assign([student.pk for student in self.students])
+
+        self.assertEqual(response.data['assigned'], 2)
+        self.assertEqual(StudentStats.objects.get(pk=self.students[0].pk).active_homework_count, 1)
+        self.assertEqual(reconcile_student_stats()['drifted'], 0)
+
+    def test_teacher_cannot_assign_foreign_students(self):
+        foreign = create_student(self.other_teacher, self.other_center, created_by=self.other_admin)
+        self.authenticate(self.teacher)
+
+        response = self.assign([foreign.pk])
+
+        self.assertEqual(response.data['assigned'], 0)
+        self.assertFalse(self.homework.students.exists())
+
+    def test_students_without_stats_rows(self):
+        StudentStats.objects.filter(pk__in=[student.pk for student in self.students[:2]]).delete()
+        inactive = self.add_homework(is_active=False)
+
+        result = assign_homeworks(
+            Homework.objects.filter(pk__in=[self.homework.pk, inactive.pk]),
+            Student.objects.filter(pk__in=[student.pk for student in self.students]),
+        )
+
+        self.assertEqual(result['assigned'], 6)
+        for student in self.students:
+            stats = StudentStats.objects.get(pk=student.pk)
+            self.assertEqual((stats.active_homework_count, stats.inactive_homework_count), (1, 1))
+        self.assertEqual(reconcile_student_stats()['drifted'], 0)
@@ -0,0 +1,67 @@
+# core/tests/test_indexes.py
+"""Hot path indekslari: migratsiyada yaratilgani va EXPLAIN rejasida tanlanishi"""
+from io import StringIO
+from unittest import skipUnless
+
+from django.core.management import call_command
+from django.db import connection
+
+from core.management.commands.explain_hot_queries import (
+    HOT_PATH_MODELS, INDEX_PATTERNS, Command, hot_queries,
+)
+from core.models import Student
+
+from .base import APITestBase
+
+# hot_queries() tartibida: so'rov -> rejada bo'lishi kerak bo'lgan indeks
+EXPECTED_INDEXES = {
+    "Davomat: o'qituvchi, -created_at": 'attendance_teacher_created_idx',
+    "Davomat: o'quvchi, -created_at": 'attendance_student_created_idx',
+    "Davomat: o'qituvchi, bugun": 'attendance_teacher_lesson_idx',
+    "Davomat: o'quvchi, 30 kun": 'attendance_student_created_idx',
+    "Baho: o'quvchi, -date": 'grade_student_date_idx',
+    "Baho: o'qituvchi, -date": 'grade_teacher_date_idx',
+    "To'lov: muddati o'tganlar (tungi task)": 'payment_status_deadline_idx',
+    "Uy vazifasi: markaz, faol": 'homework_center_due_idx',
+    "Uy vazifasi: markaz, upcoming": 'homework_center_due_idx',
+    "Uy vazifasi: markaz, barchasi": 'homework_center_active_idx',
+    "O'quvchi: markaz, faollar soni": 'student_center_active_idx',
+    "O'quvchi: o'qituvchi, faol": 'student_teacher_active_idx',
+    "Foydalanuvchi: markaz o'qituvchilari": 'user_role_center_active_idx',
+}
+
+
+class HotPathIndexTests(APITestBase):
+
+    def test_indexes_created_by_migrations(self):
+        with connection.cursor() as cursor:
+            for model in HOT_PATH_MODELS:
+                constraints = connection.introspection.get_constraints(cursor, model._meta.db_table)
+                for index in model._meta.indexes:
+                    with self.subTest(index=index.name):
+                        self.assertIn(index.name, constraints)
+
+    @skipUnless(connection.vendor == 'sqlite', "Rejalar SQLite planner'i uchun yozilgan")
+    def test_hot_queries_use_indexes(self):
+        Command(stdout=StringIO()).seed(200, 10)
+        sample = (
+            Student.objects.filter(is_active=True, teacher__isnull=False)
+            .values('center_id', 'teacher_id', 'id')
+            .order_by('pk')
+            .first()
+        )
+
+        queries = dict(hot_queries(sample['center_id'], sample['teacher_id'], sample['id']))
+
+        for label, index in EXPECTED_INDEXES.items():
+            with self.subTest(query=label):
+                plan = queries[label]().explain()
+                self.assertIn(index, {name for pattern in INDEX_PATTERNS for name in pattern.findall(plan)})
+
+    def test_command_rolls_back_seed(self):
+        out = StringIO()
+
+        call_command('explain_hot_queries', seed_students=20, days=3, repeat=1, stdout=out)
+
+        self.assertIn('Jami:', out.getvalue())
+        self.assertEqual(Student.objects.count(), 0)
@@ -0,0 +1,75 @@
+# core/tests/test_list_queries.py
+"""Ro'yxat endpoint'lari: sahifadagi qatorlar ko'payganda SQL so'rovlar soni o'zgarmaydi"""
+from datetime import timedelta
+
+from core.models import Attendance, Grade, Payment
+
+from .base import APITestBase
+
+
+class ListQueryCountTests(APITestBase):
+
+    def setUp(self):
+        super().setUp()
+        self.students = self.create_students(2)
+
+    def add_attendances(self, students):
+        # (student, teacher, lesson_date) unikal - har bir o'quvchiga bir necha kun
+        Attendance.objects.bulk_create([
+            Attendance(
+                student=student, teacher=self.teacher, created_by=self.admin,
+                lesson_date=self.today - timedelta(days=day),
+            )
+            for student in students
+            for day in range(3)
+        ])
+
+    def add_grades(self, students):
+        for student in students:
+            Grade.objects.create(
+                student=student, teacher=self.teacher, subject="Matematika", score=80,
+                date=self.today, created_by=self.admin,
+            )
+
+    def add_payments(self, students):
+        for student in students:
+            Payment.objects.create(
+                student=student, date=self.today, amount=100, deadline=self.today + timedelta(days=5),
+                created_by=self.admin,
+            )
+
+    def test_students_list(self):
+        self.authenticate(self.admin)
+        self.assertQueriesFlat('/api/students/', lambda: self.create_students(8))
+
+    def test_teacher_students_list(self):
+        self.authenticate(self.teacher)
+        self.assertQueriesFlat('/api/students/by_teacher/', lambda: self.create_students(8))
+
+    def test_attendances_list(self):
+        self.add_attendances(self.students)
+        self.authenticate(self.teacher)
+        self.assertQueriesFlat('/api/attendances/', lambda: self.add_attendances(self.create_students(3)))
+
+    def test_attendances_cursor_list(self):
+        self.add_attendances(self.students)
+        self.authenticate(self.teacher)
+        self.assertQueriesFlat(
+            '/api/attendances/?pagination=cursor', lambda: self.add_attendances(self.create_students(3))
+        )
+
+    def test_grades_list(self):
+        self.add_grades(self.students)
+        self.authenticate(self.teacher)
+        self.assertQueriesFlat('/api/grades/', lambda: self.add_grades(self.create_students(8)))
+
+    def test_payments_list(self):
+        self.add_payments(self.students)
+        self.authenticate(self.admin)
+        self.assertQueriesFlat('/api/payments/', lambda: self.add_payments(self.create_students(8)))
+
+    def test_student_payments_list(self):
+        student = self.students[0]
+        self.add_payments([student])
+        self.authenticate(self.admin)
+        self.assertQueriesFlat(f'/api/students/{student.pk}/payments/', lambda: self.add_payments([student] * 5))
@@ -0,0 +1,89 @@
+# core/tests/test_pagination.py
+"""?pagination=cursor: keyset sahifalar, taxminiy count va buzilgan cursor"""
+import base64
+import json
+from datetime import timedelta
+from unittest import mock
+
+from django.utils import timezone
+
+from core.models import Attendance, Grade
+
+from .base import APITestBase
+
+
+def cursor(position):
+    return base64.urlsafe_b64encode(json.dumps(position).encode()).decode()
+
+
+class KeysetPaginationTests(APITestBase):
+    url = '/api/grades/?pagination=cursor&page_size=2'
+
+    def setUp(self):
+        super().setUp()
+        self.students = self.create_students(2)
+        # Sanalar teng: tartib id bo'yicha ajratiladi
+        Grade.objects.bulk_create([
+            Grade(student=student, teacher=self.teacher, subject="Matematika", score=70 + i, date=self.today)
+            for student in self.students
+            for i in range(3)
+        ])
+        self.authenticate(self.teacher)
+
+    def walk(self, url):
+        ids, pages = [], 0
+        while url:
+            response = self.client.get(url)
+            self.assertEqual(response.status_code, 200)
+            ids += [row['id'] for row in response.data['results']]
+            url = response.data['next']
+            pages += 1
+        return ids, pages
+
+    def test_walks_all_rows_once_when_dates_tie(self):
+        ids, pages = self.walk(self.url)
+
+        self.assertEqual(ids, list(Grade.objects.order_by('-date', '-id').values_list('pk', flat=True)))
+        self.assertEqual(pages, 3)
+
+    def test_walks_ties_on_created_at(self):
+        Attendance.objects.bulk_create([
+            Attendance(student=student, teacher=self.teacher, lesson_date=self.today - timedelta(days=day))
+            for student in self.students
+            for day in range(2)
+        ])
+        Attendance.objects.update(created_at=timezone.now())
+
+        ids, _ = self.walk('/api/attendances/?pagination=cursor&page_size=1')
+
+        self.assertEqual(ids, list(Attendance.objects.order_by('-id').values_list('pk', flat=True)))
+
+    def test_last_page_has_no_next(self):
+        response = self.client.get('/api/grades/?pagination=cursor&page_size=6')
+
+        self.assertEqual(len(response.data['results']), 6)
+        self.assertIsNone(response.data['next'])
+        self.assertNotIn('count', response.data)
+
+    def test_count_estimate(self):
+        response = self.client.get(self.url + '&count=estimate')
+
+        self.assertEqual((response.data['count'], response.data['count_is_estimate']), (6, False))
+
+        with mock.patch('core.pagination.COUNT_ESTIMATE_CAP', 4):
+            response = self.client.get(self.url + '&count=estimate')
+
+        self.assertEqual((response.data['count'], response.data['count_is_estimate']), (4, True))
+
+    def test_tampered_cursor_is_404(self):
+        for value in (
+            'bm90LWpzb24',
+            cursor([1]),
+            cursor(["not-a-date", 1]),
+            cursor(["2025-01-01", "x"]),
+            cursor([{"a": 1}, 1]),
+            cursor([None, 1]),
+        ):
+            with self.subTest(cursor=value):
+                response = self.client.get(f'{self.url}&cursor={value}')
+                self.assertEqual(response.status_code, 404)
@@ -0,0 +1,89 @@
+# core/tests/test_payments.py
+"""To'lov holati: tungi pending -> overdue o'tkazish va status qiymatlari"""
+from datetime import timedelta
+from importlib import import_module
+
+from core.billing import mark_overdue_payments
+from core.models import Payment, StudentStats
+from core.stats import reconcile_student_stats
+from core.tasks import mark_overdue_payments as mark_overdue_payments_task
+
+from .base import APITestBase
+
+status_migration = import_module('core.migrations.0014_payment_status_choices')
+
+
+class OverduePaymentTests(APITestBase):
+
+    def setUp(self):
+        super().setUp()
+        self.students = self.create_students(2)
+        self.late = self.add_payment(self.students[0], deadline=self.today - timedelta(days=3))
+        self.other_late = self.add_payment(self.students[1], deadline=self.today - timedelta(days=1))
+        self.paid = self.add_payment(self.students[0], deadline=self.today - timedelta(days=3), status='paid')
+        self.due_today = self.add_payment(self.students[1], deadline=self.today)
+
+    def add_payment(self, student, deadline, status='pending'):
+        return Payment.objects.create(
+            student=student, date=deadline - timedelta(days=10), amount=100, deadline=deadline,
+            status=status, created_by=self.admin,
+        )
+
+    def test_flips_only_late_pending(self):
+        self.assertEqual(mark_overdue_payments(), 2)
+
+        self.assertEqual(
+            set(Payment.objects.filter(status='overdue').values_list('pk', flat=True)),
+            {self.late.pk, self.other_late.pk},
+        )
+        self.assertEqual(Payment.objects.get(pk=self.paid.pk).status, 'paid')
+        self.assertEqual(Payment.objects.get(pk=self.due_today.pk).status, 'pending')
+        self.assertEqual(StudentStats.objects.get(pk=self.students[0].pk).overdue_payment_count, 1)
+        self.assertEqual(reconcile_student_stats()['drifted'], 0)
+
+    def test_rerun_is_noop(self):
+        mark_overdue_payments()
+
+        self.assertEqual(mark_overdue_payments(), 0)
+        self.assertEqual(StudentStats.objects.get(pk=self.students[0].pk).overdue_payment_count, 1)
+
+    def test_creates_missing_stats_rows(self):
+        StudentStats.objects.filter(pk=self.students[1].pk).delete()
+
+        mark_overdue_payments()
+
+        self.assertEqual(StudentStats.objects.get(pk=self.students[1].pk).overdue_payment_count, 1)
+        self.assertEqual(reconcile_student_stats()['drifted'], 0)
+
+    def test_task(self):
+        self.assertEqual(mark_overdue_payments_task.delay().get(), {'updated': 2})
+
+    def test_overdue_endpoint(self):
+        mark_overdue_payments()
+        self.authenticate(self.admin)
+
+        response = self.client.get('/api/payments/overdue/')
+
+        rows = {row['id']: row for row in response.data['results']}
+        self.assertEqual(set(rows), {self.late.pk, self.other_late.pk})
+        self.assertEqual(rows[self.late.pk]['days_overdue'], 3)
+
+    def test_due_today_status(self):
+        self.authenticate(self.admin)
+
+        response = self.client.get(f'/api/payments/{self.due_today.pk}/')
+
+        self.assertEqual((response.data['payment_status'], response.data['days_overdue']), ('due_today', 0))
+
+    def test_unknown_status_rejected(self):
+        self.authenticate(self.admin)
+
+        response = self.client.patch(f'/api/payments/{self.late.pk}/', {'status': "to'langan"})
+
+        self.assertEqual(response.status_code, 400)
+
+    def test_migration_normalizes_free_text(self):
+        self.assertEqual(
+            [status_migration.normalize_status(value) for value in ("To'langan", " PAID ", "overdue!", "kutilmoqda", None)],
+            ['paid', 'paid', 'overdue', 'pending', 'pending'],
+        )
@@ -0,0 +1,114 @@
+# core/tests/test_scoping.py
+"""Rolga qarab ko'rinish: core.scoping qoidalari va ViewSet'lardagi 404"""
+from django.contrib.auth.models import AnonymousUser
+
+from core.models import Grade, LearningCenter, News, Payment, Student
+from core.scoping import scope_queryset, superadmin_ids
+
+from .base import APITestBase, create_student, create_user
+
+
+class ScopeQuerysetTests(APITestBase):
+
+    @classmethod
+    def setUpTestData(cls):
+        super().setUpTestData()
+        cls.admin_mini = create_user("+998900000007", "admin_mini", cls.center, cls.admin)
+        cls.own = create_student(cls.teacher, cls.center, created_by=cls.admin, last_name="Markaz")
+        cls.inactive = create_student(cls.teacher, cls.center, created_by=cls.admin, is_active=False)
+        cls.by_superadmin = create_student(cls.other_teacher, cls.other_center, created_by=cls.superadmin)
+        cls.foreign = create_student(cls.other_teacher, cls.other_center, created_by=cls.other_admin)
+
+    def visible(self, user, model=Student, context='api'):
+        return set(scope_queryset(model.objects.all(), user, context))
+
+    def test_superadmin_sees_everything(self):
+        self.assertEqual(self.visible(self.superadmin), set(Student.objects.all()))
+
+    def test_admin_sees_center_own_and_superadmin_rows(self):
+        expected = {self.own, self.inactive, self.by_superadmin}
+
+        self.assertEqual(self.visible(self.admin), expected)
+        self.assertEqual(self.visible(self.admin_mini), expected)
+        self.assertEqual(self.visible(self.other_admin), {self.by_superadmin, self.foreign})
+
+    def test_teacher_sees_own_active_students(self):
+        self.assertEqual(self.visible(self.teacher), {self.own})
+        # Admin panelda nofaollar ham ko'rinadi
+        self.assertEqual(self.visible(self.teacher, context='admin'), {self.own, self.inactive})
+
+    def test_anonymous_sees_active_only(self):
+        self.assertEqual(
+            self.visible(AnonymousUser()), set(Student.objects.filter(is_active=True))
+        )
+
+    def test_undeclared_role_sees_nothing(self):
+        Payment.objects.create(student=self.own, date=self.today, amount=100, deadline=self.today)
+
+        self.assertEqual(self.visible(self.teacher, Payment), set())
+
+    def test_admin_without_center_drops_center_term(self):
+        admin = create_user("+998900000008", "admin", created_by=self.superadmin)
+
+        self.assertEqual(self.visible(admin), {self.by_superadmin})
+        self.assertEqual(self.visible(admin, LearningCenter), {self.center, self.other_center})
+        self.assertEqual(self.visible(create_user("+998900000009", "teacher"), LearningCenter), set())
+
+    def test_filters_without_user_join(self):
+        sql = str(scope_queryset(Student.objects.all(), self.admin).query)
+
+        self.assertNotIn('account_user', sql)
+
+    def test_superadmin_ids_follow_role_changes(self):
+        self.assertEqual(superadmin_ids(), [self.superadmin.pk])
+
+        with self.captureOnCommitCallbacks(execute=True):
+            self.other_admin.role = "superadmin"
+            self.other_admin.save()
+
+        self.assertEqual(superadmin_ids(), sorted([self.superadmin.pk, self.other_admin.pk]))
+
+    def test_unknown_model_raises(self):
+        with self.assertRaises(KeyError):
+            scope_queryset(News.objects.all(), self.admin, context='missing')
+
+
+class ScopedViewSetTests(APITestBase):
+
+    def setUp(self):
+        super().setUp()
+        self.student = self.create_students(1)[0]
+        self.foreign = create_student(self.other_teacher, self.other_center, created_by=self.other_admin)
+        self.grade = Grade.objects.create(
+            student=self.foreign, teacher=self.other_teacher, subject="Matematika", score=80, date=self.today
+        )
+        self.payment = Payment.objects.create(
+            student=self.foreign, date=self.today, amount=100, deadline=self.today, created_by=self.other_admin
+        )
+
+    def test_list_is_scoped(self):
+        self.authenticate(self.admin)
+
+        response = self.client.get('/api/students/')
+
+        self.assertEqual([row['id'] for row in response.data['results']], [self.student.pk])
+
+    def test_other_center_objects_are_404(self):
+        self.authenticate(self.admin)
+
+        for url in (
+            f'/api/students/{self.foreign.pk}/',
+            f'/api/grades/{self.grade.pk}/',
+            f'/api/payments/{self.payment.pk}/',
+        ):
+            with self.subTest(url=url):
+                self.assertEqual(self.client.get(url).status_code, 404)
+                self.assertEqual(self.client.delete(url).status_code, 404)
+
+        self.assertTrue(Student.objects.filter(pk=self.foreign.pk).exists())
+
+    def test_teacher_cannot_reach_other_teachers_student(self):
+        self.authenticate(self.teacher)
+
+        self.assertEqual(self.client.get(f'/api/students/{self.foreign.pk}/').status_code, 404)
+        self.assertEqual(self.client.get(f'/api/students/{self.student.pk}/').status_code, 200)
@@ -0,0 +1,52 @@
+# core/tests/test_search.py
+"""?search= indeks bo'yicha: ism prefiksi, telefon raqamining istalgan qismi"""
+from django.test import override_settings
+
+from core.search import phone_tokens
+
+from .base import APITestBase
+
+
+class StudentSearchTests(APITestBase):
+
+    def setUp(self):
+        super().setUp()
+        self.ali, self.vali = self.create_students(2)
+        self.vali.first_name = "Valijon"
+        self.vali.phone_number = "+998935556677"
+        self.vali.save()
+        self.authenticate(self.admin)
+
+    def search(self, query):
+        response = self.client.get('/api/students/', {'search': query})
+        self.assertEqual(response.status_code, 200)
+        return {row['id'] for row in response.data['results']}
+
+    def test_name_prefix(self):
+        self.assertEqual(self.search("vali"), {self.vali.pk})
+
+    def test_phone_fragment(self):
+        # "+998901112233" ning o'rtasidagi qism
+        self.assertEqual(self.search("90111"), {self.ali.pk})
+        self.assertEqual(self.search("+99893"), {self.vali.pk})
+        self.assertEqual(self.search("6677"), {self.vali.pk})
+
+    def test_index_follows_updates(self):
+        self.ali.phone_number = "+998977770000"
+        self.ali.save()
+
+        self.assertEqual(self.search("90111"), set())
+        self.assertEqual(self.search("7777"), {self.ali.pk})
+
+    def test_deleted_student_not_found(self):
+        self.vali.delete()
+
+        self.assertEqual(self.search("valijon"), set())
+
+    @override_settings(SEARCH_BACKEND=None)
+    def test_like_fallback(self):
+        self.assertEqual(self.search("90111"), {self.ali.pk})
+
+    def test_phone_tokens(self):
+        self.assertEqual(phone_tokens("+998 90 111"), ['99890111', '9890111', '890111', '90111', '0111', '111', '11'])
+        self.assertEqual(phone_tokens(""), [])
@@ -0,0 +1,140 @@
+# core/tests/test_stats.py
+"""StudentStats rollup: signallar, o'qish yo'li va migratsiyadagi backfill"""
+from datetime import timedelta
+from importlib import import_module
+
+from django.apps import apps
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from django.utils import timezone
+
+from core.models import Attendance, Grade, Homework, Payment, Student, StudentStats
+from core.stats import reconcile_student_stats
+
+from .base import APITestBase
+
+backfill = import_module('core.migrations.0015_backfill_student_stats')
+
+
+class WithStatisticsTests(APITestBase):
+
+    def setUp(self):
+        super().setUp()
+        self.student, self.empty = self.create_students(2)
+        Grade.objects.create(
+            student=self.student, teacher=self.teacher, subject="Matematika", score=90, date=self.today
+        )
+        Grade.objects.create(
+            student=self.student, teacher=self.teacher, subject="Fizika", score=75, date=self.today
+        )
+        old = Attendance.objects.create(
+            student=self.student, teacher=self.teacher, lesson_date=self.today - timedelta(days=40),
+            lesson_1=True, lesson_2=True, lesson_3=True,
+        )
+        Attendance.objects.filter(pk=old.pk).update(created_at=timezone.now() - timedelta(days=40))
+        Attendance.objects.create(student=self.student, teacher=self.teacher, lesson_1=True, lesson_3=True)
+        for is_active in (True, True, False):
+            homework = Homework.objects.create(
+                title="Vazifa", description="-", due_date=self.today, teacher=self.teacher,
+                center=self.center, is_active=is_active,
+            )
+            homework.students.add(self.student)
+        for status in ('paid', 'overdue', 'pending'):
+            Payment.objects.create(
+                student=self.student, date=self.today, amount=100, deadline=self.today, status=status
+            )
+
+    def test_annotations(self):
+        student = Student.objects.with_statistics().get(pk=self.student.pk)
+
+        self.assertEqual((student.grade_sum, student.grade_count), (165, 2))
+        # 40 kun oldingi davomat oynadan tashqarida
+        self.assertEqual((student.attendance_days_30d, student.attended_lessons_30d), (1, 2))
+        self.assertEqual((student.active_homework_count, student.inactive_homework_count), (2, 1))
+        self.assertEqual(
+            (student.payment_count, student.paid_payment_count, student.overdue_payment_count), (3, 1, 1)
+        )
+
+    def test_student_without_rows_gets_zeros(self):
+        student = Student.objects.with_statistics().get(pk=self.empty.pk)
+
+        self.assertEqual(
+            [getattr(student, field) for field in backfill.STATS_FIELDS], [0] * len(backfill.STATS_FIELDS)
+        )
+
+    def test_single_query_for_many_students(self):
+        self.create_students(5)
+
+        with self.assertNumQueries(1):
+            rows = list(Student.objects.with_statistics())
+
+        self.assertEqual(len(rows), 7)
+
+    def test_reconcile_matches_annotations(self):
+        StudentStats.objects.update(grade_sum=0, grade_count=0, attended_lessons_30d=0)
+
+        self.assertEqual(reconcile_student_stats()['drifted'], 1)
+
+        stats = StudentStats.objects.get(pk=self.student.pk)
+        self.assertEqual((stats.grade_sum, stats.grade_count, stats.attended_lessons_30d), (165, 2, 2))
+        self.assertEqual(stats.average_grade, 82.5)
+        # 1 kunda 3 darsdan 2 tasi
+        self.assertEqual(stats.attendance_rate, 66.67)
+
+
+class StudentStatsTests(APITestBase):
+
+    def setUp(self):
+        super().setUp()
+        self.student = self.create_students(1)[0]
+
+    def add_rows(self):
+        Grade.objects.create(
+            student=self.student, teacher=self.teacher, subject="Matematika", score=90, date=self.today
+        )
+        Grade.objects.create(
+            student=self.student, teacher=self.teacher, subject="Matematika", score=70,
+            date=self.today - timedelta(days=1),
+        )
+        Attendance.objects.create(student=self.student, teacher=self.teacher, lesson_1=True, lesson_2=True)
+        Payment.objects.create(
+            student=self.student, date=self.today, amount=100, deadline=self.today, status='paid'
+        )
+        homework = Homework.objects.create(
+            title="Vazifa", description="-", due_date=self.today, teacher=self.teacher, center=self.center
+        )
+        homework.students.add(self.student)
+
+    def test_signals_keep_stats_in_sync(self):
+        self.add_rows()
+
+        stats = StudentStats.objects.get(pk=self.student.pk)
+        self.assertEqual((stats.grade_sum, stats.grade_count), (160, 2))
+        self.assertEqual((stats.attendance_days_30d, stats.attended_lessons_30d), (1, 2))
+        self.assertEqual((stats.payment_count, stats.paid_payment_count), (1, 1))
+        self.assertEqual(stats.active_homework_count, 1)
+        self.assertEqual(reconcile_student_stats()['drifted'], 0)
+
+    def test_list_without_stats_row_does_not_write(self):
+        self.add_rows()
+        StudentStats.objects.all().delete()
+        self.authenticate(self.admin)
+
+        with CaptureQueriesContext(connection) as context:
+            response = self.client.get('/api/students/')
+
+        self.assertEqual(response.status_code, 200)
+        row = response.data['results'][0]
+        self.assertEqual((row['average_grade'], row['homework_count']), (0, 0))
+        writes = [q['sql'] for q in context.captured_queries if not q['sql'].startswith('SELECT')]
+        self.assertEqual(writes, [])
+
+    def test_backfill_creates_missing_rows(self):
+        self.add_rows()
+        StudentStats.objects.all().delete()
+
+        backfill.backfill_student_stats(apps, None)
+
+        stats = StudentStats.objects.get(pk=self.student.pk)
+        self.assertEqual((stats.grade_sum, stats.grade_count, stats.paid_payment_count), (160, 2, 1))
+        self.assertEqual(reconcile_student_stats()['drifted'], 0)
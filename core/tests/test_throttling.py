@@ -0,0 +1,95 @@
+# core/tests/test_throttling.py
+"""Sliding window throttle'lar va X-RateLimit-* sarlavhalari"""
+from unittest import mock
+
+from django.contrib.auth.models import AnonymousUser
+from rest_framework.request import Request
+from rest_framework.test import APIRequestFactory
+
+from core.throttling import AnonSlidingRateThrottle, SlidingWindowRateThrottle
+
+from .base import APITestBase
+
+# Daqiqalik oynaning o'rtasi: oldingi oyna og'irligi 0.5
+NOW = 6_000_000 * 60 + 30.0
+
+
+@mock.patch.object(SlidingWindowRateThrottle, 'timer', lambda self: NOW)
+class RateLimitHeadersTests(APITestBase):
+
+    def rates(self, **rates):
+        return mock.patch.dict(SlidingWindowRateThrottle.THROTTLE_RATES, rates)
+
+    def test_headers_count_down_to_429(self):
+        self.authenticate(self.admin)
+
+        with self.rates(user='3/min'):
+            responses = [self.client.get('/api/students/') for _ in range(4)]
+
+        self.assertEqual([response.status_code for response in responses], [200, 200, 200, 429])
+        self.assertEqual([response['X-RateLimit-Remaining'] for response in responses], ['2', '1', '0', '0'])
+        self.assertEqual(responses[0]['X-RateLimit-Limit'], '3')
+        self.assertEqual(responses[0]['X-RateLimit-Reset'], '30')
+        self.assertEqual(responses[-1]['Retry-After'], '30')
+
+    def test_users_counted_separately(self):
+        with self.rates(user='1/min'):
+            self.authenticate(self.admin)
+            self.client.get('/api/students/')
+            self.authenticate(self.teacher)
+            response = self.client.get('/api/students/')
+
+        self.assertEqual(response.status_code, 200)
+
+    def test_scoped_limit_reported_when_lower(self):
+        credentials = {'phone_number': self.admin.phone_number, 'password': 'noto-g-ri'}
+
+        with self.rates(anon='100/min', token='2/min'):
+            responses = [self.client.post('/api/token/', credentials) for _ in range(3)]
+
+        self.assertEqual([response.status_code for response in responses], [401, 401, 429])
+        self.assertEqual(responses[0]['X-RateLimit-Limit'], '2')
+        self.assertEqual(responses[1]['X-RateLimit-Remaining'], '0')
+
+    def test_counter_failure_does_not_block(self):
+        self.authenticate(self.admin)
+
+        with self.rates(user='1/min'), mock.patch.object(
+            SlidingWindowRateThrottle, 'hit', side_effect=ConnectionError
+        ), self.assertLogs('core.throttling', 'WARNING'):
+            responses = [self.client.get('/api/students/') for _ in range(2)]
+
+        self.assertEqual([response.status_code for response in responses], [200, 200])
+        self.assertNotIn('X-RateLimit-Limit', responses[0])
+
+
+@mock.patch.dict(SlidingWindowRateThrottle.THROTTLE_RATES, {'anon': '10/min'})
+class SlidingWindowTests(APITestBase):
+
+    def allow(self, now):
+        request = Request(APIRequestFactory().get('/api/news/'))
+        request.user = AnonymousUser()
+        throttle = AnonSlidingRateThrottle()
+        throttle.timer = lambda: now
+        return throttle.allow_request(request, None), throttle
+
+    def test_previous_window_is_weighted(self):
+        for _ in range(10):
+            self.allow(NOW - 60)
+
+        # Oldingi oynaning yarmi (5) hisobga olinadi
+        allowed = [self.allow(NOW)[0] for _ in range(6)]
+
+        self.assertEqual(allowed, [True] * 5 + [False])
+
+    def test_wait_until_previous_window_decays(self):
+        for _ in range(10):
+            self.allow(NOW - 60)
+        for _ in range(5):
+            self.allow(NOW)
+
+        allowed, throttle = self.allow(NOW)
+
+        self.assertFalse(allowed)
+        # Yana bitta so'rov uchun oldingi oyna og'irligi 0.4 ga tushishi kerak: 6 soniya
+        self.assertEqual(throttle.wait(), 6)
@@ -0,0 +1,115 @@
+# core/tests/test_weekly_attendance.py
+"""Haftalik avtomatik davomat: umumiy generator, markaz shard'lari va chord"""
+from io import StringIO
+
+from django.core.management import call_command
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+
+from core.attendance import generate_attendance, generate_center_attendance, merge_center_results
+from core.models import Attendance, StudentStats
+from core.stats import reconcile_student_stats
+from core.tasks import create_weekly_attendance
+
+from .base import APITestBase
+
+
+class GenerateAttendanceTests(APITestBase):
+
+    def setUp(self):
+        super().setUp()
+        self.students = self.create_students(3)
+        self.other_students = self.create_students(2, teacher=self.other_teacher)
+
+    def test_creates_one_row_per_student(self):
+        result = generate_attendance()
+
+        self.assertEqual((result['created'], result['skipped']), (5, 0))
+        self.assertEqual(result['teachers'][str(self.teacher.pk)], {'created': 3, 'skipped': 0})
+        self.assertEqual(Attendance.objects.filter(lesson_date=self.today).count(), 5)
+        self.assertEqual(StudentStats.objects.get(pk=self.students[0].pk).attendance_days_30d, 1)
+        self.assertEqual(reconcile_student_stats()['drifted'], 0)
+
+    def test_rerun_skips_existing(self):
+        generate_attendance()
+
+        for force in (False, True):
+            result = generate_attendance(force=force)
+            self.assertEqual((result['created'], result['skipped']), (0, 5))
+        self.assertEqual(Attendance.objects.count(), 5)
+        self.assertEqual(StudentStats.objects.get(pk=self.students[0].pk).attendance_days_30d, 1)
+
+    def test_dry_run_writes_nothing(self):
+        result = generate_attendance(dry_run=True)
+
+        self.assertEqual(result['created'], 5)
+        self.assertFalse(Attendance.objects.exists())
+
+    def test_per_center(self):
+        result = generate_attendance(per_center=True)
+
+        self.assertEqual(
+            result['centers'],
+            {str(self.center.pk): {'created': 3, 'skipped': 0}, str(self.other_center.pk): {'created': 2, 'skipped': 0}},
+        )
+        self.assertEqual(result['failed_centers'], [])
+
+    def test_query_count_does_not_grow_with_students(self):
+        def count_queries():
+            Attendance.objects.all().delete()
+            with CaptureQueriesContext(connection) as context:
+                generate_attendance(batch_size=1000)
+            return len(context.captured_queries)
+
+        small = count_queries()
+        self.create_students(20)
+
+        self.assertEqual(count_queries(), small)
+
+    def test_command(self):
+        out = StringIO()
+
+        call_command('create_weekly_attendance', center_id=self.center.pk, stdout=out)
+
+        self.assertEqual(Attendance.objects.count(), 3)
+
+
+class CenterShardTests(APITestBase):
+
+    def setUp(self):
+        super().setUp()
+        self.create_students(3)
+        self.create_students(2, teacher=self.other_teacher)
+
+    def test_shard_only_writes_its_center(self):
+        result = generate_center_attendance(self.center.pk, day=self.today.isoformat())
+
+        self.assertEqual(result['key'], f'weekly-attendance:{self.today}:{self.center.pk}')
+        self.assertEqual((result['created'], result['skipped']), (3, 0))
+        self.assertEqual(Attendance.objects.count(), 3)
+
+    def test_retried_shard_is_idempotent(self):
+        generate_center_attendance(self.center.pk, day=self.today)
+
+        result = generate_center_attendance(self.center.pk, day=self.today)
+
+        self.assertEqual((result['created'], result['skipped']), (0, 3))
+
+    def test_merge_results(self):
+        results = [generate_center_attendance(center.pk, day=self.today) for center in (self.center, self.other_center)]
+
+        merged = merge_center_results(results)
+
+        self.assertEqual((merged['created'], merged['skipped']), (5, 0))
+        self.assertEqual(set(merged['centers']), {str(self.center.pk), str(self.other_center.pk)})
+
+    def test_task(self):
+        result = create_weekly_attendance.delay().get()
+
+        self.assertEqual(result['created'], 5)
+
+    def test_parallel_task_dispatches_chord(self):
+        result = create_weekly_attendance.delay(parallel=True).get()
+
+        self.assertEqual(result, {'date': self.today.isoformat(), 'shards': 2})
+        self.assertEqual(Attendance.objects.count(), 5)
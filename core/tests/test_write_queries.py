@@ -0,0 +1,163 @@
+# core/tests/test_write_queries.py
+"""
+Yozish endpoint'lari (PATCH/DELETE): SQL so'rovlar soni qotirilgan.
+
+Signallar (statistika, qidiruv indeksi) bajaradigan so'rovlar ham kiradi.
+Ruxsat berilmagan so'rovlar bitta so'rovda (obyektni o'qish) rad etiladi.
+"""
+from datetime import timedelta
+
+from account.models import User
+from core.models import Attendance, Grade, Homework, LearningCenter, News, Parent, Payment
+from core.scoping import superadmin_ids
+
+from .base import APITestBase, create_student, create_user
+
+
+class WriteQueryCountTests(APITestBase):
+
+    @classmethod
+    def setUpTestData(cls):
+        super().setUpTestData()
+        today = cls.today
+
+        def parent(created_by):
+            return Parent.objects.create(
+                first_name="Ota", last_name="Valiyev", phone_number="+998900000010", email="p@example.com",
+                address="-", workplace="-", relationship="ota", center=cls.center, created_by=created_by,
+            )
+
+        def payment(created_by):
+            return Payment.objects.create(
+                student=cls.student, date=today, amount=100, deadline=today + timedelta(days=10),
+                status="pending", created_by=created_by,
+            )
+
+        def homework(teacher):
+            return Homework.objects.create(
+                title="Vazifa", description="-", due_date=today, teacher=teacher, center=teacher.center,
+                created_by=teacher,
+            )
+
+        # Markazni admin o'zgartira olishi uchun
+        LearningCenter.objects.filter(pk=cls.center.pk).update(created_by=cls.admin)
+        # Markazdagi, lekin boshqa foydalanuvchi yaratgan o'qituvchi
+        cls.superadmin_teacher = create_user("+998900000006", "teacher", cls.center, cls.superadmin)
+        # UserSerializer o'qituvchi uchun bu maydonlarni talab qiladi
+        User.objects.filter(role="teacher").update(
+            age=30, pinfl="12345678901234", subject="Matematika",
+            teacher_email="t@example.com", teacher_phone_number="+998900000009",
+        )
+        cls.student = create_student(cls.teacher, cls.center, created_by=cls.admin)
+        cls.other_student = create_student(cls.other_teacher, cls.other_center, created_by=cls.other_admin)
+        cls.parent = parent(cls.admin)
+        cls.superadmin_parent = parent(cls.superadmin)
+        cls.attendance = Attendance.objects.create(student=cls.student, teacher=cls.teacher, created_by=cls.teacher)
+        cls.other_attendance = Attendance.objects.create(
+            student=cls.other_student, teacher=cls.other_teacher, created_by=cls.other_teacher
+        )
+        cls.grade = Grade.objects.create(
+            student=cls.student, teacher=cls.teacher, subject="Matematika", score=80, date=today,
+            created_by=cls.teacher,
+        )
+        cls.other_grade = Grade.objects.create(
+            student=cls.other_student, teacher=cls.other_teacher, subject="Matematika", score=80, date=today,
+            created_by=cls.other_teacher,
+        )
+        cls.payment = payment(cls.admin)
+        cls.superadmin_payment = payment(cls.superadmin)
+        cls.news = News.objects.create(title="Yangilik", body="-", center=cls.center, created_by=cls.admin)
+        cls.superadmin_news = News.objects.create(
+            title="Yangilik", body="-", center=cls.center, created_by=cls.superadmin
+        )
+        cls.homework = homework(cls.teacher)
+        cls.homework.students.add(cls.student)
+        cls.other_homework = homework(cls.other_teacher)
+
+    def setUp(self):
+        super().setUp()
+        # Kesh sovuq bo'lsa birinchi so'rov superadmin id'larini o'qiydi
+        superadmin_ids()
+
+    def assertWriteQueries(self, user, method, url, expected_status, queries, data=None):
+        self.client.force_authenticate(User.objects.get(pk=user.pk))
+        with self.assertNumQueries(queries):
+            response = getattr(self.client, method)(url, data, format='json')
+        self.assertEqual(response.status_code, expected_status, response.data)
+
+    # ========== PATCH ==========
+
+    def test_patch_learning_center(self):
+        self.assertWriteQueries(
+            self.admin, 'patch', f'/api/learning-centers/{self.center.pk}/', 200, 4, {'director': "Yangi"}
+        )
+
+    def test_patch_parent(self):
+        self.assertWriteQueries(self.admin, 'patch', f'/api/parents/{self.parent.pk}/', 200, 5, {'workplace': "Yangi"})
+        self.assertWriteQueries(
+            self.admin, 'patch', f'/api/parents/{self.superadmin_parent.pk}/', 403, 1, {'workplace': "Yangi"}
+        )
+
+    def test_patch_student(self):
+        self.assertWriteQueries(self.admin, 'patch', f'/api/students/{self.student.pk}/', 200, 4, {'address': "Yangi"})
+        self.assertWriteQueries(
+            self.teacher, 'patch', f'/api/students/{self.other_student.pk}/', 404, 1, {'address': "Yangi"}
+        )
+
+    def test_patch_attendance(self):
+        self.assertWriteQueries(
+            self.teacher, 'patch', f'/api/attendances/{self.attendance.pk}/', 200, 6, {'lesson_1': True}
+        )
+        self.assertWriteQueries(
+            self.teacher, 'patch', f'/api/attendances/{self.other_attendance.pk}/', 404, 1, {'lesson_1': True}
+        )
+
+    def test_patch_grade(self):
+        self.assertWriteQueries(self.teacher, 'patch', f'/api/grades/{self.grade.pk}/', 200, 5, {'score': 90})
+        self.assertWriteQueries(self.teacher, 'patch', f'/api/grades/{self.other_grade.pk}/', 404, 1, {'score': 90})
+
+    def test_patch_payment(self):
+        self.assertWriteQueries(self.admin, 'patch', f'/api/payments/{self.payment.pk}/', 200, 4, {'amount': '150.00'})
+        self.assertWriteQueries(
+            self.admin, 'patch', f'/api/payments/{self.superadmin_payment.pk}/', 403, 1, {'amount': '150.00'}
+        )
+
+    def test_patch_news(self):
+        self.assertWriteQueries(self.admin, 'patch', f'/api/news/{self.news.pk}/', 200, 4, {'title': "Yangi"})
+        self.assertWriteQueries(self.admin, 'patch', f'/api/news/{self.superadmin_news.pk}/', 403, 1, {'title': "Yangi"})
+
+    def test_patch_homework(self):
+        self.assertWriteQueries(self.teacher, 'patch', f'/api/homeworks/{self.homework.pk}/', 200, 8, {'title': "Yangi"})
+        self.assertWriteQueries(
+            self.teacher, 'patch', f'/api/homeworks/{self.other_homework.pk}/', 404, 1, {'title': "Yangi"}
+        )
+
+    def test_patch_user(self):
+        data = {'first_name': "Yangi", 'center': self.center.pk}
+        self.assertWriteQueries(self.admin, 'patch', f'/api/users/{self.teacher.pk}/', 200, 3, data)
+        self.assertWriteQueries(self.admin, 'patch', f'/api/users/{self.superadmin_teacher.pk}/', 403, 1, data)
+
+    # ========== DELETE ==========
+
+    def test_delete_parent(self):
+        self.assertWriteQueries(self.admin, 'delete', f'/api/parents/{self.parent.pk}/', 204, 4)
+
+    def test_delete_attendance(self):
+        self.assertWriteQueries(self.teacher, 'delete', f'/api/attendances/{self.attendance.pk}/', 204, 4)
+
+    def test_delete_grade(self):
+        self.assertWriteQueries(self.teacher, 'delete', f'/api/grades/{self.grade.pk}/', 204, 4)
+
+    def test_delete_payment(self):
+        self.assertWriteQueries(self.admin, 'delete', f'/api/payments/{self.payment.pk}/', 204, 4)
+
+    def test_delete_news(self):
+        self.assertWriteQueries(self.admin, 'delete', f'/api/news/{self.news.pk}/', 204, 3)
+
+    def test_delete_homework(self):
+        self.assertWriteQueries(self.teacher, 'delete', f'/api/homeworks/{self.homework.pk}/', 204, 7)
+
+    def test_delete_student(self):
+        # Kaskad: davomat, baho va 2 ta to'lovning har biri uchun statistika
+        # signali (o'quvchi + StudentStats tekshiruvi)
+        self.assertWriteQueries(self.admin, 'delete', f'/api/students/{self.student.pk}/', 204, 20)
@@ -0,0 +1,175 @@
+# core/throttling.py
+"""
+Sliding window throttle'lar (barcha worker'lar uchun umumiy).
+
+DRF'ning SimpleRateThrottle'i har bir so'rovda butun vaqt belgilari
+ro'yxatini keshdan o'qib, qayta pickle qilib yozadi - ro'yxat kunlik
+limitda minglab elementgacha o'sadi. Bu yerda har bir kalit uchun faqat
+ikkita hisoblagich bor: joriy va oldingi oyna. Oldingi oyna joriy oynaning
+o'tgan qismiga proporsional og'irlik bilan qo'shiladi (sliding window
+counter), shuning uchun tekshiruv narxi oyna uzunligiga bog'liq emas.
+
+Redis (django-redis) bo'lsa hisob bitta Lua skript bilan atomar bajariladi.
+Boshqa kesh backendlarida (lokal ishlab chiqish) xuddi shu hisob cache API
+bilan qilinadi. Redis ishlamay qolsa so'rov cheklanmaydi.
+
+Qolgan limit X-RateLimit-* sarlavhalarida qaytadi
+(core.middleware.RateLimitHeadersMiddleware).
+"""
+import logging
+
+from rest_framework.throttling import SimpleRateThrottle
+
+logger = logging.getLogger(__name__)
+
+# KEYS: joriy oyna, oldingi oyna; ARGV: limit, oldingi oyna og'irligi, TTL.
+# {ruxsat, joriy, oldingi} qaytaradi
+SLIDING_WINDOW_SCRIPT = """
+local current = tonumber(redis.call('GET', KEYS[1]) or '0')
+local previous = tonumber(redis.call('GET', KEYS[2]) or '0')
+if math.floor(previous * tonumber(ARGV[2])) + current >= tonumber(ARGV[1]) then
+    return {0, current, previous}
+end
+current = redis.call('INCR', KEYS[1])
+if current == 1 then
+    redis.call('EXPIRE', KEYS[1], ARGV[3])
+end
+return {1, current, previous}
+"""
+
+_scripts = {}
+
+
+def redis_client():
+    """django-redis ulanishi yoki boshqa kesh backendi bo'lsa None"""
+    try:
+        from django_redis import get_redis_connection
+    except ImportError:
+        return None
+    try:
+        return get_redis_connection('default')
+    except NotImplementedError:
+        return None
+
+
+def sliding_window_script(client):
+    script = _scripts.get(id(client))
+    if script is None:
+        script = _scripts[id(client)] = client.register_script(SLIDING_WINDOW_SCRIPT)
+    return script
+
+
+def record_quota(request, limit, remaining, reset):
+    """Eng kam qolgan limit javob sarlavhalari uchun so'rovda saqlanadi"""
+    django_request = getattr(request, '_request', request)
+    quota = getattr(django_request, 'throttle_quota', None)
+    if quota is None or remaining < quota['remaining']:
+        django_request.throttle_quota = {'limit': limit, 'remaining': remaining, 'reset': reset}
+
+
+class SlidingWindowRateThrottle(SimpleRateThrottle):
+    """SimpleRateThrottle bilan bir xil rate/scope sozlamalari, sliding window hisob bilan"""
+    cache_format = 'throttle:%(scope)s:%(ident)s'
+
+    def allow_request(self, request, view):
+        if self.rate is None:
+            return True
+
+        self.key = self.get_cache_key(request, view)
+        if self.key is None:
+            return True
+
+        self.now = self.timer()
+        window_index, self.offset = divmod(self.now, self.duration)
+        weight = 1 - self.offset / self.duration
+        keys = [f'{self.key}:{int(window_index)}', f'{self.key}:{int(window_index) - 1}']
+
+        try:
+            allowed, self.current, self.previous = self.hit(keys, weight)
+        except Exception:
+            logger.warning("Throttle hisoblagichi ishlamadi, so'rov cheklanmadi", exc_info=True)
+            return True
+
+        used = int(self.previous * weight) + self.current
+        record_quota(request, self.num_requests, max(self.num_requests - used, 0), int(self.duration - self.offset))
+        return bool(allowed)
+
+    def hit(self, keys, weight):
+        """(ruxsat, joriy oyna, oldingi oyna) - limitdan oshmasa joriy oyna oshiriladi"""
+        ttl = int(self.duration) * 2
+        client = redis_client()
+        if client is not None:
+            return sliding_window_script(client)(
+                keys=[self.cache.make_and_validate_key(key) for key in keys],
+                args=[self.num_requests, weight, ttl],
+            )
+
+        values = self.cache.get_many(keys)
+        current, previous = values.get(keys[0], 0), values.get(keys[1], 0)
+        if int(previous * weight) + current >= self.num_requests:
+            return 0, current, previous
+        self.cache.add(keys[0], 0, ttl)
+        return 1, self.cache.incr(keys[0]), previous
+
+    def wait(self):
+        remaining_window = self.duration - self.offset
+        if self.current >= self.num_requests or not self.previous:
+            return remaining_window
+        # Oldingi oyna og'irligi limit ostiga tushguncha
+        excess = int(self.previous * (1 - self.offset / self.duration)) + self.current - self.num_requests + 1
+        return min(excess * self.duration / self.previous, remaining_window)
+
+    def get_ident_key(self, request):
+        if request.user and request.user.is_authenticated:
+            return f'user:{request.user.pk}'
+        return f'ip:{self.get_ident(request)}'
+
+
+# ========== Throttle'lar ==========
+
+class AnonSlidingRateThrottle(SlidingWindowRateThrottle):
+    scope = 'anon'
+
+    def get_cache_key(self, request, view):
+        if request.user and request.user.is_authenticated:
+            return None
+        return self.cache_format % {'scope': self.scope, 'ident': self.get_ident(request)}
+
+
+class UserSlidingRateThrottle(SlidingWindowRateThrottle):
+    scope = 'user'
+
+    def get_cache_key(self, request, view):
+        if not (request.user and request.user.is_authenticated):
+            return None
+        return self.cache_format % {'scope': self.scope, 'ident': request.user.pk}
+
+
+class ScopedSlidingRateThrottle(SlidingWindowRateThrottle):
+    """View'dagi throttle_scope bo'yicha alohida limit (token, reports)"""
+    scope_attr = 'throttle_scope'
+
+    def __init__(self):
+        # Scope view'dan olinadi, rate allow_request'da aniqlanadi
+        pass
+
+    def allow_request(self, request, view):
+        self.scope = getattr(view, self.scope_attr, None)
+        if not self.scope:
+            return True
+        self.rate = self.get_rate()
+        self.num_requests, self.duration = self.parse_rate(self.rate)
+        return super().allow_request(request, view)
+
+    def get_cache_key(self, request, view):
+        return self.cache_format % {'scope': self.scope, 'ident': self.get_ident_key(request)}
+
+
+class SearchSlidingRateThrottle(SlidingWindowRateThrottle):
+    """?search= bilan kelgan ro'yxat so'rovlari uchun qo'shimcha limit"""
+    scope = 'search'
+
+    def get_cache_key(self, request, view):
+        if not request.query_params.get('search'):
+            return None
+        return self.cache_format % {'scope': self.scope, 'ident': self.get_ident_key(request)}
@@ -20,6 +20,7 @@ urlpatterns = [
     path('dashboard/stats/', views.DashboardStatsAPIView.as_view(), name='dashboard-stats'),
     path('students/<int:student_id>/grades/', views.StudentGradesAPIView.as_view(), name='student-grades'),
     path('students/<int:student_id>/attendance/', views.StudentAttendanceAPIView.as_view(), name='student-attendance'),
+    path('students/<int:student_id>/attendance/archive/', views.StudentAttendanceArchiveAPIView.as_view(), name='student-attendance-archive'),
     path('students/<int:student_id>/payments/', views.StudentPaymentsAPIView.as_view(), name='student-payments'),
     
     # Teacher endpoints
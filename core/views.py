@@ -1,62 +1,67 @@
 # core/views.py
+import logging
+
 from rest_framework import viewsets, status, permissions, filters
 from rest_framework.decorators import action
 from rest_framework.response import Response
 from rest_framework.views import APIView
 from rest_framework.generics import ListAPIView, RetrieveUpdateDestroyAPIView
 from django_filters.rest_framework import DjangoFilterBackend
-from django.db.models import Q, Count, Avg, Sum
+from django.db.models import Count, Avg, Sum, OuterRef, Prefetch, Subquery, Value
+from django.db.models.functions import Coalesce
 from django.utils import timezone
 from datetime import datetime, timedelta
 
 from .models import (
     LearningCenter, Parent, Student, 
-    Attendance, Grade, Payment, News, Homework
+    Attendance, AttendanceMonth, Grade, Payment, News, Homework
+)
+from .attendance import bulk_mark_attendance
+from .attendance_archive import (
+    archived_attendance_rate, archived_attendances, month_start, next_month
+)
+from .billing import FAILED, billing_run_id, claim_billing_run, get_billing_progress, set_billing_progress
+from .dashboard import get_dashboard_stats
+from .grades import bulk_upsert_grades
+from .homeworks import assign_homeworks
+from .mixins import (
+    KeysetPaginationMixin, QuerysetOptimizationMixin, RoleScopedQuerysetMixin, SingleObjectMixin
 )
+from .permissions import (
+    UPDATE_ACTIONS, ObjectRule, ObjectRulesPermission, created_by_user, own_teacher, same_center
+)
+from .search import IndexedSearchFilter
 from .serializers import (
     LearningCenterSerializer, ParentSerializer,
-    StudentSerializer, AttendanceSerializer,
-    GradeSerializer, PaymentSerializer, 
-    NewsSerializer, HomeworkSerializer
+    StudentSerializer, AttendanceSerializer, AttendanceBulkSerializer,
+    GradeSerializer, GradeBulkSerializer, PaymentSerializer, BillingRunSerializer,
+    NewsSerializer, HomeworkSerializer, HomeworkListSerializer
 )
+from .tasks import run_monthly_billing
+
+logger = logging.getLogger(__name__)
 
 
 # ========== LearningCenterViewSet ==========
-class LearningCenterViewSet(viewsets.ModelViewSet):
+class LearningCenterViewSet(RoleScopedQuerysetMixin, SingleObjectMixin, QuerysetOptimizationMixin, viewsets.ModelViewSet):
     queryset = LearningCenter.objects.all()
     serializer_class = LearningCenterSerializer
+    # LearningCenterSerializer: created_by_info
+    select_related_fields = ('created_by',)
     filter_backends = [DjangoFilterBackend, filters.SearchFilter, filters.OrderingFilter]
     filterset_fields = ['is_active']
     search_fields = ['name', 'address', 'director', 'phone_number']
     ordering_fields = ['id', 'name']
     ordering = ['name']
+    object_rules = [
+        ObjectRule(["admin"], [created_by_user], "You can only update centers created by you.", UPDATE_ACTIONS),
+    ]
     
     def get_permissions(self):
         if self.action in ['create', 'destroy', 'update', 'partial_update']:
-            return [permissions.IsAuthenticated()]
+            return [permissions.IsAuthenticated(), ObjectRulesPermission()]
         return [permissions.AllowAny()]
     
-    def get_queryset(self):
-        user = self.request.user
-        
-        if not user.is_authenticated:
-            return LearningCenter.objects.filter(is_active=True)
-        
-        if user.role == "superadmin":
-            return LearningCenter.objects.all()
-        
-        elif user.role == "admin":
-            return LearningCenter.objects.filter(
-                Q(created_by__role="superadmin") | Q(id=user.center.id)
-            )
-        
-        elif user.role in ["admin_mini", "teacher"]:
-            if user.center:
-                return LearningCenter.objects.filter(id=user.center.id)
-            return LearningCenter.objects.none()
-        
-        return LearningCenter.objects.filter(is_active=True)
-    
     def create(self, request, *args, **kwargs):
         if request.user.role != "superadmin":
             return Response(
@@ -66,30 +71,6 @@ class LearningCenterViewSet(viewsets.ModelViewSet):
         
         return super().create(request, *args, **kwargs)
     
-    def update(self, request, *args, **kwargs):
-        instance = self.get_object()
-        user = request.user
-        
-        if user.role == "admin" and instance.created_by != user:
-            return Response(
-                {"detail": "You can only update centers created by you."},
-                status=status.HTTP_403_FORBIDDEN
-            )
-        
-        return super().update(request, *args, **kwargs)
-    
-    def partial_update(self, request, *args, **kwargs):
-        instance = self.get_object()
-        user = request.user
-        
-        if user.role == "admin" and instance.created_by != user:
-            return Response(
-                {"detail": "You can only update centers created by you."},
-                status=status.HTTP_403_FORBIDDEN
-            )
-        
-        return super().partial_update(request, *args, **kwargs)
-    
     def destroy(self, request, *args, **kwargs):
         if request.user.role != "superadmin":
             return Response(
@@ -115,41 +96,28 @@ class LearningCenterViewSet(viewsets.ModelViewSet):
 
 
 # ========== ParentViewSet ==========
-class ParentViewSet(viewsets.ModelViewSet):
+class ParentViewSet(RoleScopedQuerysetMixin, SingleObjectMixin, QuerysetOptimizationMixin, viewsets.ModelViewSet):
     queryset = Parent.objects.all()
     serializer_class = ParentSerializer
-    filter_backends = [DjangoFilterBackend, filters.SearchFilter, filters.OrderingFilter]
+    # ParentSerializer: center_info, created_by_info
+    select_related_fields = ('center', 'created_by')
+    # Qidiruv indeksi reytingi OrderingFilter'dan keyin qo'llanadi
+    filter_backends = [DjangoFilterBackend, filters.OrderingFilter, IndexedSearchFilter]
     filterset_fields = ['center', 'is_active']
+    search_kind = 'parent'
     search_fields = ['first_name', 'last_name', 'phone_number', 'email', 'workplace']
     ordering_fields = ['id', 'first_name', 'last_name']
     ordering = ['last_name', 'first_name']
+    object_rules = [
+        ObjectRule(["admin"], [created_by_user], "You can only update parents created by you.", UPDATE_ACTIONS),
+        ObjectRule(["admin"], [created_by_user], "You can only delete parents created by you.", ['destroy']),
+    ]
     
     def get_permissions(self):
         if self.action in ['create', 'destroy', 'update', 'partial_update']:
-            return [permissions.IsAuthenticated()]
+            return [permissions.IsAuthenticated(), ObjectRulesPermission()]
         return [permissions.AllowAny()]
     
-    def get_queryset(self):
-        user = self.request.user
-        
-        if not user.is_authenticated:
-            return Parent.objects.filter(is_active=True)
-        
-        if user.role == "superadmin":
-            return Parent.objects.all()
-        
-        elif user.role == "admin":
-            return Parent.objects.filter(
-                Q(created_by__role="superadmin") | Q(created_by=user)
-            )
-        
-        elif user.role in ["admin_mini", "teacher"]:
-            if user.center:
-                return Parent.objects.filter(center=user.center, is_active=True)
-            return Parent.objects.none()
-        
-        return Parent.objects.filter(is_active=True)
-    
     def create(self, request, *args, **kwargs):
         if request.user.role not in ["superadmin", "admin"]:
             return Response(
@@ -159,42 +127,6 @@ class ParentViewSet(viewsets.ModelViewSet):
         
         return super().create(request, *args, **kwargs)
     
-    def update(self, request, *args, **kwargs):
-        instance = self.get_object()
-        user = request.user
-        
-        if user.role == "admin" and instance.created_by != user:
-            return Response(
-                {"detail": "You can only update parents created by you."},
-                status=status.HTTP_403_FORBIDDEN
-            )
-        
-        return super().update(request, *args, **kwargs)
-    
-    def partial_update(self, request, *args, **kwargs):
-        instance = self.get_object()
-        user = request.user
-        
-        if user.role == "admin" and instance.created_by != user:
-            return Response(
-                {"detail": "You can only update parents created by you."},
-                status=status.HTTP_403_FORBIDDEN
-            )
-        
-        return super().partial_update(request, *args, **kwargs)
-    
-    def destroy(self, request, *args, **kwargs):
-        instance = self.get_object()
-        user = request.user
-        
-        if user.role == "admin" and instance.created_by != user:
-            return Response(
-                {"detail": "You can only delete parents created by you."},
-                status=status.HTTP_403_FORBIDDEN
-            )
-        
-        return super().destroy(request, *args, **kwargs)
-    
     @action(detail=False, methods=['get'])
     def active(self, request):
         queryset = self.filter_queryset(
@@ -211,41 +143,30 @@ class ParentViewSet(viewsets.ModelViewSet):
 
 
 # ========== StudentViewSet ==========
-class StudentViewSet(viewsets.ModelViewSet):
-    queryset = Student.objects.all()
+class StudentViewSet(RoleScopedQuerysetMixin, SingleObjectMixin, viewsets.ModelViewSet):
+    # StudentSerializer uchun bog'langan obyektlar va statistika bitta so'rovda
+    queryset = Student.objects.select_related('teacher', 'center', 'parent', 'created_by', 'stats')
     serializer_class = StudentSerializer
-    filter_backends = [DjangoFilterBackend, filters.SearchFilter, filters.OrderingFilter]
+    filter_backends = [DjangoFilterBackend, filters.OrderingFilter, IndexedSearchFilter]
     filterset_fields = ['center', 'teacher', 'subject', 'is_active']
+    search_kind = 'student'
     search_fields = ['first_name', 'last_name', 'phone_number', 'address', 'subject']
     ordering_fields = ['id', 'first_name', 'last_name', 'age']
     ordering = ['last_name', 'first_name']
+    object_rules = [
+        ObjectRule(
+            ["admin", "admin_mini"], [created_by_user, same_center],
+            "You can only update your own students or students in your center.", UPDATE_ACTIONS,
+        ),
+        ObjectRule(["teacher"], [own_teacher], "You can only update your own students.", UPDATE_ACTIONS),
+        ObjectRule(["admin"], [created_by_user], "You can only delete students created by you.", ['destroy']),
+    ]
     
     def get_permissions(self):
         if self.action in ['create', 'destroy', 'update', 'partial_update']:
-            return [permissions.IsAuthenticated()]
+            return [permissions.IsAuthenticated(), ObjectRulesPermission()]
         return [permissions.AllowAny()]
     
-    def get_queryset(self):
-        user = self.request.user
-        
-        if not user.is_authenticated:
-            return Student.objects.filter(is_active=True)
-        
-        if user.role == "superadmin":
-            return Student.objects.all()
-        
-        elif user.role in ["admin", "admin_mini"]:
-            return Student.objects.filter(
-                Q(created_by__role="superadmin") | 
-                Q(created_by=user) |
-                Q(center=user.center)
-            )
-        
-        elif user.role == "teacher":
-            return Student.objects.filter(teacher=user, is_active=True)
-        
-        return Student.objects.filter(is_active=True)
-    
     def create(self, request, *args, **kwargs):
         if request.user.role not in ["superadmin", "admin", "teacher"]:
             return Response(
@@ -255,58 +176,6 @@ class StudentViewSet(viewsets.ModelViewSet):
         
         return super().create(request, *args, **kwargs)
     
-    def update(self, request, *args, **kwargs):
-        instance = self.get_object()
-        user = request.user
-        
-        if user.role in ["admin", "admin_mini"]:
-            if instance.created_by != user and instance.center != user.center:
-                return Response(
-                    {"detail": "You can only update your own students or students in your center."},
-                    status=status.HTTP_403_FORBIDDEN
-                )
-        
-        elif user.role == "teacher":
-            if instance.teacher != user:
-                return Response(
-                    {"detail": "You can only update your own students."},
-                    status=status.HTTP_403_FORBIDDEN
-                )
-        
-        return super().update(request, *args, **kwargs)
-    
-    def partial_update(self, request, *args, **kwargs):
-        instance = self.get_object()
-        user = request.user
-        
-        if user.role in ["admin", "admin_mini"]:
-            if instance.created_by != user and instance.center != user.center:
-                return Response(
-                    {"detail": "You can only update your own students or students in your center."},
-                    status=status.HTTP_403_FORBIDDEN
-                )
-        
-        elif user.role == "teacher":
-            if instance.teacher != user:
-                return Response(
-                    {"detail": "You can only update your own students."},
-                    status=status.HTTP_403_FORBIDDEN
-                )
-        
-        return super().partial_update(request, *args, **kwargs)
-    
-    def destroy(self, request, *args, **kwargs):
-        instance = self.get_object()
-        user = request.user
-        
-        if user.role == "admin" and instance.created_by != user:
-            return Response(
-                {"detail": "You can only delete students created by you."},
-                status=status.HTTP_403_FORBIDDEN
-            )
-        
-        return super().destroy(request, *args, **kwargs)
-    
     @action(detail=False, methods=['get'])
     def active(self, request):
         queryset = self.filter_queryset(
@@ -357,9 +226,9 @@ class StudentViewSet(viewsets.ModelViewSet):
             queryset = self.filter_queryset(
                 self.get_queryset().filter(center_id=center_id, is_active=True)
             )
-        elif user.center:
+        elif user.center_id:
             queryset = self.filter_queryset(
-                self.get_queryset().filter(center=user.center, is_active=True)
+                self.get_queryset().filter(center_id=user.center_id, is_active=True)
             )
         else:
             return Response(
@@ -377,40 +246,33 @@ class StudentViewSet(viewsets.ModelViewSet):
 
 
 # ========== AttendanceViewSet ==========
-class AttendanceViewSet(viewsets.ModelViewSet):
+class AttendanceViewSet(RoleScopedQuerysetMixin, SingleObjectMixin, KeysetPaginationMixin, QuerysetOptimizationMixin, viewsets.ModelViewSet):
     queryset = Attendance.objects.all()
     serializer_class = AttendanceSerializer
+    # AttendanceSerializer: student_info (teacher_name bilan), teacher_info, created_by_info
+    select_related_fields = ('student__teacher', 'teacher', 'created_by')
     filter_backends = [DjangoFilterBackend, filters.SearchFilter, filters.OrderingFilter]
-    filterset_fields = ['teacher', 'lesson_1', 'lesson_2', 'lesson_3']
+    filterset_fields = ['teacher', 'lesson_date', 'lesson_1', 'lesson_2', 'lesson_3']
     search_fields = ['student__first_name', 'student__last_name', 'teacher__first_name', 'teacher__last_name']
-    ordering_fields = ['id', 'created_at']
+    ordering_fields = ['id', 'lesson_date', 'created_at']
     ordering = ['-created_at']
+    object_rules = [
+        ObjectRule(["teacher"], [own_teacher], "You can only update your own attendance records.", UPDATE_ACTIONS),
+        ObjectRule(
+            ["admin", "admin_mini"], [created_by_user],
+            "You can only delete attendance records created by you.", ['destroy'],
+        ),
+        ObjectRule(["teacher"], [own_teacher], "You can only delete your own attendance records.", ['destroy']),
+    ]
     
     def get_permissions(self):
         if self.action in ['create', 'destroy', 'update', 'partial_update']:
+            return [permissions.IsAuthenticated(), ObjectRulesPermission()]
+        if self.action == 'bulk':
+            # Egalik AttendanceBulkSerializer'da o'quvchilar bo'yicha tekshiriladi
             return [permissions.IsAuthenticated()]
         return [permissions.AllowAny()]
     
-    def get_queryset(self):
-        user = self.request.user
-        
-        if not user.is_authenticated:
-            return Attendance.objects.none()
-        
-        if user.role == "superadmin":
-            return Attendance.objects.all()
-        
-        elif user.role in ["admin", "admin_mini"]:
-            return Attendance.objects.filter(
-                Q(student__center=user.center) |
-                Q(created_by__role="superadmin")
-            )
-        
-        elif user.role == "teacher":
-            return Attendance.objects.filter(teacher=user)
-        
-        return Attendance.objects.none()
-    
     def create(self, request, *args, **kwargs):
         if not request.user.is_authenticated:
             return Response(
@@ -418,57 +280,21 @@ class AttendanceViewSet(viewsets.ModelViewSet):
                 status=status.HTTP_401_UNAUTHORIZED
             )
         
-        return super().create(request, *args, **kwargs)
-    
-    def update(self, request, *args, **kwargs):
-        instance = self.get_object()
-        user = request.user
-        
-        if user.role == "teacher" and instance.teacher != user:
-            return Response(
-                {"detail": "You can only update your own attendance records."},
-                status=status.HTTP_403_FORBIDDEN
-            )
-        
-        return super().update(request, *args, **kwargs)
-    
-    def partial_update(self, request, *args, **kwargs):
-        instance = self.get_object()
-        user = request.user
-        
-        if user.role == "teacher" and instance.teacher != user:
-            return Response(
-                {"detail": "You can only update your own attendance records."},
-                status=status.HTTP_403_FORBIDDEN
-            )
-        
-        return super().partial_update(request, *args, **kwargs)
-    
-    def destroy(self, request, *args, **kwargs):
-        instance = self.get_object()
-        user = request.user
-        
-        if user.role in ["admin", "admin_mini"]:
-            if instance.created_by != user:
-                return Response(
-                    {"detail": "You can only delete attendance records created by you."},
-                    status=status.HTTP_403_FORBIDDEN
-                )
-        
-        elif user.role == "teacher":
-            if instance.teacher != user:
-                return Response(
-                    {"detail": "You can only delete your own attendance records."},
-                    status=status.HTTP_403_FORBIDDEN
-                )
-        
-        return super().destroy(request, *args, **kwargs)
+        # Shu kunga davomat bo'lsa serializer uni yangilaydi: 201 emas, 200
+        serializer = self.get_serializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+        self.perform_create(serializer)
+        headers = self.get_success_headers(serializer.data)
+        return Response(
+            serializer.data,
+            status=status.HTTP_201_CREATED if serializer.created else status.HTTP_200_OK,
+            headers=headers,
+        )
     
     @action(detail=False, methods=['get'])
     def today(self, request):
-        today = timezone.now().date()
         queryset = self.filter_queryset(
-            self.get_queryset().filter(created_at__date=today)
+            self.get_queryset().filter(lesson_date=timezone.localdate())
         )
         
         page = self.paginate_queryset(queryset)
@@ -479,6 +305,23 @@ class AttendanceViewSet(viewsets.ModelViewSet):
         serializer = self.get_serializer(queryset, many=True)
         return Response(serializer.data)
     
+    @action(detail=False, methods=['post'])
+    def bulk(self, request):
+        """
+        Butun sinf davomatini bitta so'rovda belgilash.
+
+        {"lesson_date": "2025-01-15", "items": [{"student_id": 1, "lesson_1": true, ...}]}
+        Hammasi bitta tranzaksiyada yoziladi, javobda qisqa xulosa qaytadi.
+        """
+        serializer = AttendanceBulkSerializer(data=request.data, context={'request': request})
+        serializer.is_valid(raise_exception=True)
+        summary = bulk_mark_attendance(
+            serializer.validated_data['rows'],
+            serializer.validated_data['lesson_date'],
+            created_by_id=request.user.pk,
+        )
+        return Response(summary)
+    
     @action(detail=False, methods=['get'])
     def by_student(self, request):
         student_id = request.query_params.get('student_id')
@@ -502,40 +345,32 @@ class AttendanceViewSet(viewsets.ModelViewSet):
 
 
 # ========== GradeViewSet ==========
-class GradeViewSet(viewsets.ModelViewSet):
+class GradeViewSet(RoleScopedQuerysetMixin, SingleObjectMixin, KeysetPaginationMixin, QuerysetOptimizationMixin, viewsets.ModelViewSet):
     queryset = Grade.objects.all()
     serializer_class = GradeSerializer
+    # GradeSerializer: student_info (teacher_name bilan), teacher_info, created_by_info
+    select_related_fields = ('student__teacher', 'teacher', 'created_by')
+    cursor_ordering = ('-date', '-id')
     filter_backends = [DjangoFilterBackend, filters.SearchFilter, filters.OrderingFilter]
     filterset_fields = ['teacher', 'subject', 'date']
     search_fields = ['student__first_name', 'student__last_name', 'subject', 'comment']
     ordering_fields = ['id', 'date', 'score']
     ordering = ['-date']
+    object_rules = [
+        ObjectRule(["admin", "admin_mini"], [created_by_user], "You can only update grades created by you.", UPDATE_ACTIONS),
+        ObjectRule(["teacher"], [own_teacher], "You can only update your own grades.", UPDATE_ACTIONS),
+        ObjectRule(["admin", "admin_mini"], [created_by_user], "You can only delete grades created by you.", ['destroy']),
+        ObjectRule(["teacher"], [own_teacher], "You can only delete your own grades.", ['destroy']),
+    ]
     
     def get_permissions(self):
         if self.action in ['create', 'destroy', 'update', 'partial_update']:
+            return [permissions.IsAuthenticated(), ObjectRulesPermission()]
+        if self.action == 'bulk':
+            # Egalik GradeBulkSerializer'da o'quvchilar bo'yicha tekshiriladi
             return [permissions.IsAuthenticated()]
         return [permissions.AllowAny()]
     
-    def get_queryset(self):
-        user = self.request.user
-        
-        if not user.is_authenticated:
-            return Grade.objects.none()
-        
-        if user.role == "superadmin":
-            return Grade.objects.all()
-        
-        elif user.role in ["admin", "admin_mini"]:
-            return Grade.objects.filter(
-                Q(student__center=user.center) |
-                Q(created_by__role="superadmin")
-            )
-        
-        elif user.role == "teacher":
-            return Grade.objects.filter(teacher=user)
-        
-        return Grade.objects.none()
-    
     def create(self, request, *args, **kwargs):
         if request.user.role not in ["superadmin", "admin", "teacher"]:
             return Response(
@@ -545,65 +380,37 @@ class GradeViewSet(viewsets.ModelViewSet):
         
         return super().create(request, *args, **kwargs)
     
-    def update(self, request, *args, **kwargs):
-        instance = self.get_object()
-        user = request.user
-        
-        if user.role in ["admin", "admin_mini"]:
-            if instance.created_by != user:
-                return Response(
-                    {"detail": "You can only update grades created by you."},
-                    status=status.HTTP_403_FORBIDDEN
-                )
-        
-        elif user.role == "teacher":
-            if instance.teacher != user:
-                return Response(
-                    {"detail": "You can only update your own grades."},
-                    status=status.HTTP_403_FORBIDDEN
-                )
-        
-        return super().update(request, *args, **kwargs)
-    
-    def partial_update(self, request, *args, **kwargs):
-        instance = self.get_object()
-        user = request.user
-        
-        if user.role in ["admin", "admin_mini"]:
-            if instance.created_by != user:
-                return Response(
-                    {"detail": "You can only update grades created by you."},
-                    status=status.HTTP_403_FORBIDDEN
-                )
-        
-        elif user.role == "teacher":
-            if instance.teacher != user:
-                return Response(
-                    {"detail": "You can only update your own grades."},
-                    status=status.HTTP_403_FORBIDDEN
-                )
-        
-        return super().partial_update(request, *args, **kwargs)
-    
-    def destroy(self, request, *args, **kwargs):
-        instance = self.get_object()
-        user = request.user
-        
-        if user.role in ["admin", "admin_mini"]:
-            if instance.created_by != user:
-                return Response(
-                    {"detail": "You can only delete grades created by you."},
-                    status=status.HTTP_403_FORBIDDEN
-                )
+    @action(detail=False, methods=['post'])
+    def bulk(self, request):
+        """
+        Imtihon baholarini bitta so'rovda kiritish.
+
+        {"subject": "Matematika", "date": "2025-01-15", "items": [{"student_id": 1, "score": 85}]}
+        Xato elementlar errors'da indeksi bilan qaytadi, to'g'rilari saqlanadi.
+        """
+        if request.user.role not in ["superadmin", "admin", "teacher"]:
+            return Response(
+                {"detail": "You do not have permission to create grades."},
+                status=status.HTTP_403_FORBIDDEN
+            )
         
-        elif user.role == "teacher":
-            if instance.teacher != user:
-                return Response(
-                    {"detail": "You can only delete your own grades."},
-                    status=status.HTTP_403_FORBIDDEN
-                )
+        serializer = GradeBulkSerializer(data=request.data, context={'request': request})
+        serializer.is_valid(raise_exception=True)
+        items, errors = serializer.validated_data['items']
+        results = bulk_upsert_grades(
+            items, serializer.validated_data['subject'], serializer.validated_data['date'], request.user
+        )
         
-        return super().destroy(request, *args, **kwargs)
+        statuses = [result['status'] for result in results]
+        return Response(
+            {
+                'created': statuses.count('created'),
+                'updated': statuses.count('updated'),
+                'results': results,
+                'errors': errors,
+            },
+            status=status.HTTP_200_OK if results else status.HTTP_400_BAD_REQUEST
+        )
     
     @action(detail=False, methods=['get'])
     def by_student(self, request):
@@ -628,38 +435,27 @@ class GradeViewSet(viewsets.ModelViewSet):
 
 
 # ========== PaymentViewSet ==========
-class PaymentViewSet(viewsets.ModelViewSet):
+class PaymentViewSet(RoleScopedQuerysetMixin, SingleObjectMixin, KeysetPaginationMixin, QuerysetOptimizationMixin, viewsets.ModelViewSet):
     queryset = Payment.objects.all()
     serializer_class = PaymentSerializer
+    # PaymentSerializer: student_info (teacher_name bilan), created_by_info
+    select_related_fields = ('student__teacher', 'created_by')
+    cursor_ordering = ('-date', '-id')
     filter_backends = [DjangoFilterBackend, filters.SearchFilter, filters.OrderingFilter]
     filterset_fields = ['status', 'student__center']
     search_fields = ['student__first_name', 'student__last_name', 'status']
     ordering_fields = ['id', 'date', 'deadline', 'amount']
     ordering = ['-date']
+    object_rules = [
+        ObjectRule(["admin", "admin_mini"], [created_by_user], "You can only update payments created by you.", UPDATE_ACTIONS),
+        ObjectRule(["admin", "admin_mini"], [created_by_user], "You can only delete payments created by you.", ['destroy']),
+    ]
     
     def get_permissions(self):
-        if self.action in ['create', 'destroy', 'update', 'partial_update']:
-            return [permissions.IsAuthenticated()]
+        if self.action in ['create', 'destroy', 'update', 'partial_update', 'billing_run']:
+            return [permissions.IsAuthenticated(), ObjectRulesPermission()]
         return [permissions.AllowAny()]
     
-    def get_queryset(self):
-        user = self.request.user
-        
-        if not user.is_authenticated:
-            return Payment.objects.none()
-        
-        if user.role == "superadmin":
-            return Payment.objects.all()
-        
-        elif user.role in ["admin", "admin_mini"]:
-            return Payment.objects.filter(
-                Q(created_by__role="superadmin") | 
-                Q(created_by=user) |
-                Q(student__center=user.center)
-            )
-        
-        return Payment.objects.none()
-    
     def create(self, request, *args, **kwargs):
         if request.user.role not in ["superadmin", "admin", "admin_mini"]:
             return Response(
@@ -669,56 +465,107 @@ class PaymentViewSet(viewsets.ModelViewSet):
         
         return super().create(request, *args, **kwargs)
     
-    def update(self, request, *args, **kwargs):
-        instance = self.get_object()
-        user = request.user
+    @action(detail=False, methods=['get'])
+    def overdue(self, request):
+        # pending -> overdue har kecha core.tasks.mark_overdue_payments'da
+        queryset = self.filter_queryset(self.get_queryset().filter(status='overdue'))
+        
+        page = self.paginate_queryset(queryset)
+        if page is not None:
+            serializer = self.get_serializer(page, many=True)
+            return self.get_paginated_response(serializer.data)
         
-        if user.role in ["admin", "admin_mini"] and instance.created_by != user:
+        serializer = self.get_serializer(queryset, many=True)
+        return Response(serializer.data)
+    
+    @action(detail=False, methods=['get', 'post'])
+    def billing_run(self, request):
+        """
+        Oylik hisob: markazning faol o'quvchilariga bir oy uchun to'lov yaratish.
+
+        POST {"center": 1, "period": "2025-01", "amount": "300000", "deadline": "2025-01-10"}
+        ixtiyoriy: date, student_ids, teacher. Ish Celery'da bajariladi (202).
+        GET ?period=2025-01[&center=1] - ish holati (total, processed, created, skipped).
+        Admin va admin_mini faqat o'z markazi uchun ishga tushiradi.
+        """
+        if request.user.role not in ["superadmin", "admin", "admin_mini"]:
             return Response(
-                {"detail": "You can only update payments created by you."},
+                {"detail": "You do not have permission to create payments."},
                 status=status.HTTP_403_FORBIDDEN
             )
         
-        return super().update(request, *args, **kwargs)
-    
-    def partial_update(self, request, *args, **kwargs):
-        instance = self.get_object()
-        user = request.user
+        if request.method == 'GET':
+            return self.billing_run_status(request)
+        
+        serializer = BillingRunSerializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+        data = serializer.validated_data
         
-        if user.role in ["admin", "admin_mini"] and instance.created_by != user:
+        center_id = self.billing_center_id(request, data.get('center'))
+        if center_id is None:
             return Response(
-                {"detail": "You can only update payments created by you."},
-                status=status.HTTP_403_FORBIDDEN
+                {"detail": "center is required."},
+                status=status.HTTP_400_BAD_REQUEST
             )
         
-        return super().partial_update(request, *args, **kwargs)
-    
-    def destroy(self, request, *args, **kwargs):
-        instance = self.get_object()
-        user = request.user
+        run_id = billing_run_id(center_id, data['period'])
+        # Tekshirish va band qilish bitta atomar qadam: parallel POST'lar
+        # bir xil task_id'ni ikki marta navbatga qo'ymaydi
+        progress = claim_billing_run(run_id)
+        if progress is None:
+            return Response(
+                {
+                    "detail": "Bu oy uchun hisob allaqachon ishlamoqda.", "run_id": run_id,
+                    **(get_billing_progress(run_id) or {}),
+                },
+                status=status.HTTP_409_CONFLICT
+            )
         
-        if user.role in ["admin", "admin_mini"] and instance.created_by != user:
+        try:
+            run_monthly_billing.apply_async(
+                kwargs={
+                    'center_id': center_id,
+                    'period': data['period'].isoformat(),
+                    'amount': str(data['amount']),
+                    'deadline': data['deadline'].isoformat(),
+                    'invoice_date': data['date'].isoformat() if data.get('date') else None,
+                    'student_ids': data.get('student_ids'),
+                    'teacher_id': data.get('teacher'),
+                    'created_by_id': request.user.pk,
+                },
+                task_id=run_id,
+            )
+        except Exception as e:
+            logger.error(f"Oylik hisob task'ini yuborib bo'lmadi ({run_id}): {str(e)}")
+            set_billing_progress(run_id, status=FAILED, error=str(e))
             return Response(
-                {"detail": "You can only delete payments created by you."},
-                status=status.HTTP_403_FORBIDDEN
+                {"detail": "Hisobni hozir ishga tushirib bo'lmadi, keyinroq urinib ko'ring."},
+                status=status.HTTP_503_SERVICE_UNAVAILABLE
             )
         
-        return super().destroy(request, *args, **kwargs)
+        return Response({"run_id": run_id, **progress}, status=status.HTTP_202_ACCEPTED)
     
-    @action(detail=False, methods=['get'])
-    def overdue(self, request):
-        today = timezone.now().date()
-        queryset = self.filter_queryset(
-            self.get_queryset().filter(deadline__lt=today, status__in=['pending', 'overdue'])
-        )
-        
-        page = self.paginate_queryset(queryset)
-        if page is not None:
-            serializer = self.get_serializer(page, many=True)
-            return self.get_paginated_response(serializer.data)
+    def billing_run_status(self, request):
+        try:
+            period = datetime.strptime(request.query_params.get('period', ''), '%Y-%m').date()
+        except ValueError:
+            return Response(
+                {"detail": "period parameter is required (YYYY-MM)."},
+                status=status.HTTP_400_BAD_REQUEST
+            )
         
-        serializer = self.get_serializer(queryset, many=True)
-        return Response(serializer.data)
+        center_id = self.billing_center_id(request, request.query_params.get('center'))
+        run_id = billing_run_id(center_id, period)
+        progress = get_billing_progress(run_id) if center_id is not None else None
+        if progress is None:
+            return Response({"detail": "Not found."}, status=status.HTTP_404_NOT_FOUND)
+        return Response({"run_id": run_id, **progress})
+    
+    def billing_center_id(self, request, center):
+        """Superadmin istalgan markazni tanlaydi, qolganlar o'z markazi bilan cheklanadi"""
+        if request.user.role == "superadmin":
+            return getattr(center, 'pk', center)
+        return request.user.center_id
     
     @action(detail=False, methods=['get'])
     def by_student(self, request):
@@ -743,41 +590,27 @@ class PaymentViewSet(viewsets.ModelViewSet):
 
 
 # ========== NewsViewSet ==========
-class NewsViewSet(viewsets.ModelViewSet):
+class NewsViewSet(RoleScopedQuerysetMixin, SingleObjectMixin, KeysetPaginationMixin, QuerysetOptimizationMixin, viewsets.ModelViewSet):
     queryset = News.objects.all()
     serializer_class = NewsSerializer
-    filter_backends = [DjangoFilterBackend, filters.SearchFilter, filters.OrderingFilter]
+    # NewsSerializer: center_info, created_by_info
+    select_related_fields = ('center', 'created_by')
+    filter_backends = [DjangoFilterBackend, filters.OrderingFilter, IndexedSearchFilter]
     filterset_fields = ['center', 'is_active']
+    search_kind = 'news'
     search_fields = ['title', 'body']
     ordering_fields = ['id', 'created_at', 'title']
     ordering = ['-created_at']
+    object_rules = [
+        ObjectRule(["admin"], [created_by_user], "You can only update news created by you.", UPDATE_ACTIONS),
+        ObjectRule(["admin"], [created_by_user], "You can only delete news created by you.", ['destroy']),
+    ]
     
     def get_permissions(self):
         if self.action in ['create', 'destroy', 'update', 'partial_update']:
-            return [permissions.IsAuthenticated()]
+            return [permissions.IsAuthenticated(), ObjectRulesPermission()]
         return [permissions.AllowAny()]
     
-    def get_queryset(self):
-        user = self.request.user
-        
-        if not user.is_authenticated:
-            return News.objects.filter(is_active=True)
-        
-        if user.role == "superadmin":
-            return News.objects.all()
-        
-        elif user.role == "admin":
-            return News.objects.filter(
-                Q(created_by__role="superadmin") | Q(created_by=user)
-            )
-        
-        elif user.role in ["admin_mini", "teacher"]:
-            if user.center:
-                return News.objects.filter(center=user.center, is_active=True)
-            return News.objects.none()
-        
-        return News.objects.filter(is_active=True)
-    
     def create(self, request, *args, **kwargs):
         if request.user.role not in ["superadmin", "admin"]:
             return Response(
@@ -787,42 +620,6 @@ class NewsViewSet(viewsets.ModelViewSet):
         
         return super().create(request, *args, **kwargs)
     
-    def update(self, request, *args, **kwargs):
-        instance = self.get_object()
-        user = request.user
-        
-        if user.role == "admin" and instance.created_by != user:
-            return Response(
-                {"detail": "You can only update news created by you."},
-                status=status.HTTP_403_FORBIDDEN
-            )
-        
-        return super().update(request, *args, **kwargs)
-    
-    def partial_update(self, request, *args, **kwargs):
-        instance = self.get_object()
-        user = request.user
-        
-        if user.role == "admin" and instance.created_by != user:
-            return Response(
-                {"detail": "You can only update news created by you."},
-                status=status.HTTP_403_FORBIDDEN
-            )
-        
-        return super().partial_update(request, *args, **kwargs)
-    
-    def destroy(self, request, *args, **kwargs):
-        instance = self.get_object()
-        user = request.user
-        
-        if user.role == "admin" and instance.created_by != user:
-            return Response(
-                {"detail": "You can only delete news created by you."},
-                status=status.HTTP_403_FORBIDDEN
-            )
-        
-        return super().destroy(request, *args, **kwargs)
-    
     @action(detail=False, methods=['get'])
     def active(self, request):
         queryset = self.filter_queryset(
@@ -839,7 +636,51 @@ class NewsViewSet(viewsets.ModelViewSet):
 
 
 # ========== HomeworkViewSet ==========
-class HomeworkViewSet(viewsets.ModelViewSet):
+class HomeworkQuerysetMixin(QuerysetOptimizationMixin):
+    """
+    Uy vazifalari ro'yxatlari HomeworkListSerializer bilan qaytariladi.
+
+    O'quvchilar soni SQL'da hisoblanadi; to'liq o'quvchilar ro'yxati
+    (students_info) faqat retrieve'da yoki ?expand=students berilganda
+    prefetch qilinadi.
+    """
+    select_related_fields = ('teacher', 'center', 'created_by')
+    list_actions = ('list', 'active', 'upcoming', 'overdue', 'by_teacher', 'by_student')
+    
+    def is_list_request(self):
+        return getattr(self, 'action', None) in self.list_actions
+    
+    def expand_students(self):
+        if not self.is_list_request():
+            return True
+        expand = getattr(self.request, 'query_params', {}).get('expand', '')
+        return 'students' in expand.split(',')
+    
+    def get_serializer_class(self):
+        if self.expand_students():
+            return HomeworkSerializer
+        return HomeworkListSerializer
+    
+    def optimize_queryset(self, queryset):
+        assigned = Homework.students.through.objects.filter(
+            homework_id=OuterRef('pk')
+        ).order_by().values('homework_id')
+        queryset = super().optimize_queryset(queryset).annotate(
+            assigned_student_count=Coalesce(
+                Subquery(assigned.annotate(value=Count('id')).values('value')),
+                Value(0),
+            )
+        )
+        
+        # destroy serializer ishlatmaydi
+        if self.expand_students() and getattr(self, 'action', None) != 'destroy':
+            queryset = queryset.prefetch_related(
+                Prefetch('students', queryset=Student.objects.select_related('teacher'))
+            )
+        return queryset
+
+
+class HomeworkViewSet(RoleScopedQuerysetMixin, SingleObjectMixin, HomeworkQuerysetMixin, viewsets.ModelViewSet):
     """
     Uy vazifalari uchun ViewSet
     """
@@ -850,31 +691,18 @@ class HomeworkViewSet(viewsets.ModelViewSet):
     search_fields = ['title', 'description', 'teacher__first_name', 'teacher__last_name']
     ordering_fields = ['id', 'title', 'due_date', 'created_at']
     ordering = ['-due_date', '-created_at']
+    object_rules = [
+        ObjectRule(["admin", "admin_mini"], [created_by_user], "You can only update homeworks created by you.", UPDATE_ACTIONS),
+        ObjectRule(["teacher"], [own_teacher], "You can only update your own homeworks.", UPDATE_ACTIONS),
+        ObjectRule(["admin", "admin_mini"], [created_by_user], "You can only delete homeworks created by you.", ['destroy']),
+        ObjectRule(["teacher"], [own_teacher], "You can only delete your own homeworks.", ['destroy']),
+    ]
     
     def get_permissions(self):
         if self.action in ['create', 'destroy', 'update', 'partial_update']:
-            return [permissions.IsAuthenticated()]
+            return [permissions.IsAuthenticated(), ObjectRulesPermission()]
         return [permissions.AllowAny()]
     
-    def get_queryset(self):
-        user = self.request.user
-        
-        if not user.is_authenticated:
-            return Homework.objects.none()
-        
-        if user.role == "superadmin":
-            return Homework.objects.all()
-        
-        elif user.role in ["admin", "admin_mini"]:
-            return Homework.objects.filter(
-                Q(created_by=user) | Q(center=user.center)
-            )
-        
-        elif user.role == "teacher":
-            return Homework.objects.filter(teacher=user)
-        
-        return Homework.objects.none()
-    
     def create(self, request, *args, **kwargs):
         if request.user.role not in ["superadmin", "admin", "admin_mini", "teacher"]:
             return Response(
@@ -884,60 +712,6 @@ class HomeworkViewSet(viewsets.ModelViewSet):
         
         return super().create(request, *args, **kwargs)
     
-    def update(self, request, *args, **kwargs):
-        instance = self.get_object()
-        user = request.user
-        
-        if user.role in ["admin", "admin_mini"] and instance.created_by != user:
-            return Response(
-                {"detail": "You can only update homeworks created by you."},
-                status=status.HTTP_403_FORBIDDEN
-            )
-        
-        elif user.role == "teacher" and instance.teacher != user:
-            return Response(
-                {"detail": "You can only update your own homeworks."},
-                status=status.HTTP_403_FORBIDDEN
-            )
-        
-        return super().update(request, *args, **kwargs)
-    
-    def partial_update(self, request, *args, **kwargs):
-        instance = self.get_object()
-        user = request.user
-        
-        if user.role in ["admin", "admin_mini"] and instance.created_by != user:
-            return Response(
-                {"detail": "You can only update homeworks created by you."},
-                status=status.HTTP_403_FORBIDDEN
-            )
-        
-        elif user.role == "teacher" and instance.teacher != user:
-            return Response(
-                {"detail": "You can only update your own homeworks."},
-                status=status.HTTP_403_FORBIDDEN
-            )
-        
-        return super().partial_update(request, *args, **kwargs)
-    
-    def destroy(self, request, *args, **kwargs):
-        instance = self.get_object()
-        user = request.user
-        
-        if user.role in ["admin", "admin_mini"] and instance.created_by != user:
-            return Response(
-                {"detail": "You can only delete homeworks created by you."},
-                status=status.HTTP_403_FORBIDDEN
-            )
-        
-        elif user.role == "teacher" and instance.teacher != user:
-            return Response(
-                {"detail": "You can only delete your own homeworks."},
-                status=status.HTTP_403_FORBIDDEN
-            )
-        
-        return super().destroy(request, *args, **kwargs)
-    
     def perform_create(self, serializer):
         user = self.request.user
         homework = serializer.save(created_by=user)
@@ -947,8 +721,8 @@ class HomeworkViewSet(viewsets.ModelViewSet):
             homework.teacher = user
         
         # Agar center o'rnatilmagan bo'lsa, teacher'ning center'ini olish
-        if not homework.center and user.center:
-            homework.center = user.center
+        if not homework.center_id and user.center_id:
+            homework.center_id = user.center_id
         
         homework.save()
     
@@ -971,7 +745,7 @@ class HomeworkViewSet(viewsets.ModelViewSet):
         elif user.role in ["admin", "admin_mini"]:
             students = Student.objects.filter(
                 id__in=student_ids,
-                center=user.center,
+                center_id=user.center_id,
                 is_active=True
             )
         elif user.role == "teacher":
@@ -983,18 +757,22 @@ class HomeworkViewSet(viewsets.ModelViewSet):
         else:
             students = Student.objects.none()
         
-        homework.students.add(*students)
+        # Bitta INSERT ... SELECT, o'quvchilar yuklanmaydi
+        result = assign_homeworks(Homework.objects.filter(pk=homework.pk), students)
         
         return Response({
-            'message': f'{students.count()} ta o\'quvchi biriktirildi',
-            'assigned_students': StudentSerializer(students, many=True).data
+            'message': f"{result['students']} ta o'quvchi biriktirildi",
+            'students': result['students'],
+            'assigned': result['assigned'],
         })
     
     @action(detail=True, methods=['get'])
     def students(self, request, pk=None):
         """Uy vazifasiga biriktirilgan o'quvchilar ro'yxati"""
         homework = self.get_object()
-        students = homework.students.all()
+        students = homework.students.select_related(
+            'teacher', 'center', 'parent', 'created_by', 'stats'
+        )
         serializer = StudentSerializer(students, many=True)
         return Response(serializer.data)
     
@@ -1098,13 +876,16 @@ class HomeworkViewSet(viewsets.ModelViewSet):
 
 # ========== Custom API Views ==========
 
-class TeacherHomeworkListAPIView(ListAPIView):
+class TeacherHomeworkListAPIView(HomeworkQuerysetMixin, ListAPIView):
     """
     Teacher uchun uy vazifalari ro'yxati
     """
-    serializer_class = HomeworkSerializer
+    serializer_class = HomeworkListSerializer
     permission_classes = [permissions.IsAuthenticated]
     
+    def is_list_request(self):
+        return True
+    
     def get_queryset(self):
         user = self.request.user
         if user.role != "teacher":
@@ -1156,7 +937,7 @@ class TeacherHomeworkListAPIView(ListAPIView):
         return response
 
 
-class TeacherHomeworkDetailAPIView(RetrieveUpdateDestroyAPIView):
+class TeacherHomeworkDetailAPIView(HomeworkQuerysetMixin, RetrieveUpdateDestroyAPIView):
     """
     Teacher uchun uy vazifasi detail view
     """
@@ -1176,149 +957,20 @@ class DashboardStatsAPIView(APIView):
     Dashboard statistikasi
     """
     permission_classes = [permissions.IsAuthenticated]
+    throttle_scope = 'reports'
     
     def get(self, request):
-        user = request.user
-        center = user.center
-        
-        stats = {
-            'total_students': 0,
-            'active_students': 0,
-            'total_teachers': 0,
-            'active_teachers': 0,
-            'total_homeworks': 0,
-            'active_homeworks': 0,
-            'upcoming_homeworks': 0,
-            'overdue_homeworks': 0,
-            'total_payments': 0,
-            'pending_payments': 0,
-            'total_news': 0,
-            'total_grades': 0,
-            'average_grade': 0,
-            'total_attendance': 0,
-            'today_attendance': 0,
-        }
-        
-        # Superadmin uchun global statistikalar
-        if user.role == "superadmin":
-            from account.models import User
-            
-            stats['total_students'] = Student.objects.count()
-            stats['active_students'] = Student.objects.filter(is_active=True).count()
-            stats['total_teachers'] = User.objects.filter(role="teacher").count()
-            stats['active_teachers'] = User.objects.filter(role="teacher", is_active=True).count()
-            stats['total_homeworks'] = Homework.objects.count()
-            stats['active_homeworks'] = Homework.objects.filter(is_active=True).count()
-            
-            today = timezone.now().date()
-            stats['upcoming_homeworks'] = Homework.objects.filter(
-                due_date__gte=today,
-                is_active=True
-            ).count()
-            stats['overdue_homeworks'] = Homework.objects.filter(
-                due_date__lt=today,
-                is_active=True
-            ).count()
-            
-            stats['total_payments'] = Payment.objects.count()
-            stats['pending_payments'] = Payment.objects.filter(status='pending').count()
-            stats['total_news'] = News.objects.count()
-            
-            # Baholar statistikasi
-            grade_avg = Grade.objects.aggregate(Avg('score'))['score__avg']
-            stats['total_grades'] = Grade.objects.count()
-            stats['average_grade'] = round(grade_avg, 2) if grade_avg else 0
-            
-            # Davomat statistikasi
-            stats['total_attendance'] = Attendance.objects.count()
-            stats['today_attendance'] = Attendance.objects.filter(
-                created_at__date=today
-            ).count()
-        
-        # Admin, admin_mini va Teacher uchun o'z markazi statistikasi
-        elif user.role in ["admin", "admin_mini", "teacher"] and center:
-            from account.models import User
-            
-            stats['total_students'] = Student.objects.filter(center=center).count()
-            stats['active_students'] = Student.objects.filter(center=center, is_active=True).count()
-            stats['total_teachers'] = User.objects.filter(center=center, role="teacher").count()
-            stats['active_teachers'] = User.objects.filter(center=center, role="teacher", is_active=True).count()
-            
-            # Uy vazifalari statistikasi
-            if user.role == "teacher":
-                stats['total_homeworks'] = Homework.objects.filter(teacher=user).count()
-                stats['active_homeworks'] = Homework.objects.filter(teacher=user, is_active=True).count()
-                
-                today = timezone.now().date()
-                stats['upcoming_homeworks'] = Homework.objects.filter(
-                    teacher=user,
-                    due_date__gte=today,
-                    is_active=True
-                ).count()
-                stats['overdue_homeworks'] = Homework.objects.filter(
-                    teacher=user,
-                    due_date__lt=today,
-                    is_active=True
-                ).count()
-            else:
-                stats['total_homeworks'] = Homework.objects.filter(center=center).count()
-                stats['active_homeworks'] = Homework.objects.filter(center=center, is_active=True).count()
-                
-                today = timezone.now().date()
-                stats['upcoming_homeworks'] = Homework.objects.filter(
-                    center=center,
-                    due_date__gte=today,
-                    is_active=True
-                ).count()
-                stats['overdue_homeworks'] = Homework.objects.filter(
-                    center=center,
-                    due_date__lt=today,
-                    is_active=True
-                ).count()
-            
-            # To'lovlar statistikasi
-            stats['total_payments'] = Payment.objects.filter(student__center=center).count()
-            stats['pending_payments'] = Payment.objects.filter(
-                student__center=center,
-                status='pending'
-            ).count()
-            
-            # Yangiliklar statistikasi
-            stats['total_news'] = News.objects.filter(center=center).count()
-            
-            # Baholar statistikasi
-            if user.role == "teacher":
-                stats['total_grades'] = Grade.objects.filter(teacher=user).count()
-                grade_avg = Grade.objects.filter(teacher=user).aggregate(Avg('score'))['score__avg']
-            else:
-                stats['total_grades'] = Grade.objects.filter(student__center=center).count()
-                grade_avg = Grade.objects.filter(student__center=center).aggregate(Avg('score'))['score__avg']
-            
-            stats['average_grade'] = round(grade_avg, 2) if grade_avg else 0
-            
-            # Davomat statistikasi
-            if user.role == "teacher":
-                stats['total_attendance'] = Attendance.objects.filter(teacher=user).count()
-                stats['today_attendance'] = Attendance.objects.filter(
-                    teacher=user,
-                    created_at__date=timezone.now().date()
-                ).count()
-            else:
-                stats['total_attendance'] = Attendance.objects.filter(student__center=center).count()
-                stats['today_attendance'] = Attendance.objects.filter(
-                    student__center=center,
-                    created_at__date=timezone.now().date()
-                ).count()
-        
-        return Response(stats)
+        return Response(get_dashboard_stats(request.user))
 
 
-class StudentGradesAPIView(ListAPIView):
+class StudentGradesAPIView(KeysetPaginationMixin, QuerysetOptimizationMixin, ListAPIView):
     """
     O'quvchining baholari
     """
     serializer_class = GradeSerializer
     permission_classes = [permissions.IsAuthenticated]
+    select_related_fields = ('student__teacher', 'teacher', 'created_by')
+    cursor_ordering = ('-date', '-id')
     
     def get_queryset(self):
         student_id = self.kwargs.get('student_id')
@@ -1329,17 +981,18 @@ class StudentGradesAPIView(ListAPIView):
         if user.role == "teacher":
             queryset = queryset.filter(teacher=user)
         elif user.role in ["admin", "admin_mini"]:
-            queryset = queryset.filter(student__center=user.center)
+            queryset = queryset.filter(student__center_id=user.center_id)
         
         return queryset
 
 
-class StudentAttendanceAPIView(ListAPIView):
+class StudentAttendanceAPIView(KeysetPaginationMixin, QuerysetOptimizationMixin, ListAPIView):
     """
     O'quvchining davomatlari
     """
     serializer_class = AttendanceSerializer
     permission_classes = [permissions.IsAuthenticated]
+    select_related_fields = ('student__teacher', 'teacher', 'created_by')
     
     def get_queryset(self):
         student_id = self.kwargs.get('student_id')
@@ -1350,17 +1003,63 @@ class StudentAttendanceAPIView(ListAPIView):
         if user.role == "teacher":
             queryset = queryset.filter(teacher=user)
         elif user.role in ["admin", "admin_mini"]:
-            queryset = queryset.filter(student__center=user.center)
+            queryset = queryset.filter(student__center_id=user.center_id)
         
         return queryset
 
 
-class StudentPaymentsAPIView(ListAPIView):
+class StudentAttendanceArchiveAPIView(APIView):
+    """
+    O'quvchining arxivlangan (AttendanceMonth) davomatlari.
+    ?month=YYYY-MM bilan bitta oy; davomat foizi bit amallari bilan hisoblanadi.
+    """
+    permission_classes = [permissions.IsAuthenticated]
+    throttle_scope = 'reports'
+    
+    def get(self, request, student_id):
+        user = request.user
+        months = AttendanceMonth.objects.filter(student_id=student_id).select_related(
+            'student__teacher', 'teacher'
+        ).order_by('-month')
+        
+        if user.role == "teacher":
+            months = months.filter(teacher=user)
+        elif user.role in ["admin", "admin_mini"]:
+            months = months.filter(student__center_id=user.center_id)
+        
+        month = request.query_params.get('month')
+        if month:
+            try:
+                month = datetime.strptime(month, '%Y-%m').date()
+            except ValueError:
+                return Response(
+                    {"detail": "month parametri YYYY-MM formatida bo'lishi kerak."},
+                    status=status.HTTP_400_BAD_REQUEST
+                )
+            months = months.filter(month=month)
+        
+        months = list(months)
+        attendance_rate = 0
+        if months:
+            start = month_start(months[-1].month)
+            end = next_month(months[0].month)
+            attendance_rate = archived_attendance_rate(months, start, end)
+        
+        serializer = AttendanceSerializer(archived_attendances(months), many=True)
+        return Response({
+            'attendance_rate': attendance_rate,
+            'results': serializer.data,
+        })
+
+
+class StudentPaymentsAPIView(KeysetPaginationMixin, QuerysetOptimizationMixin, ListAPIView):
     """
     O'quvchining to'lovlari
     """
     serializer_class = PaymentSerializer
     permission_classes = [permissions.IsAuthenticated]
+    select_related_fields = ('student__teacher', 'created_by')
+    cursor_ordering = ('-date', '-id')
     
     def get_queryset(self):
         student_id = self.kwargs.get('student_id')
@@ -1388,15 +1087,18 @@ class TeacherStudentListAPIView(ListAPIView):
         if user.role != "teacher":
             return Student.objects.none()
         
-        return Student.objects.filter(teacher=user, is_active=True)
+        return Student.objects.filter(teacher=user, is_active=True).select_related(
+            'teacher', 'center', 'parent', 'created_by', 'stats'
+        )
 
 
-class TeacherAttendanceListAPIView(ListAPIView):
+class TeacherAttendanceListAPIView(KeysetPaginationMixin, QuerysetOptimizationMixin, ListAPIView):
     """
     Teacher'ning davomatlari ro'yxati
     """
     serializer_class = AttendanceSerializer
     permission_classes = [permissions.IsAuthenticated]
+    select_related_fields = ('student__teacher', 'teacher', 'created_by')
     
     def get_queryset(self):
         user = self.request.user
@@ -1406,12 +1108,14 @@ class TeacherAttendanceListAPIView(ListAPIView):
         return Attendance.objects.filter(teacher=user)
 
 
-class TeacherGradeListAPIView(ListAPIView):
+class TeacherGradeListAPIView(KeysetPaginationMixin, QuerysetOptimizationMixin, ListAPIView):
     """
     Teacher'ning baholari ro'yxati
     """
     serializer_class = GradeSerializer
     permission_classes = [permissions.IsAuthenticated]
+    select_related_fields = ('student__teacher', 'teacher', 'created_by')
+    cursor_ordering = ('-date', '-id')
     
     def get_queryset(self):
         user = self.request.user